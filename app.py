@@ -9,21 +9,38 @@ import sys
 import os
 sys.path.append('.')
 sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
+from candle_frame import CandleFrame, as_frame
 try:
     from iq_trading_robot import IQTradingRobot
 except ImportError:
     IQTradingRobot = None
 try:
-    from strategy_scalper import AtvScalperM1, fetch_candles_range
+    from strategy_scalper import (AtvScalperM1, closed_range, fetch_candles_range,
+                                  has_stored_m1, iter_candle_chunks)
 except ImportError:
     AtvScalperM1 = None
     fetch_candles_range = None
+try:
+    from stream_backtest import ScalperStream
+except ImportError:
+    ScalperStream = None
+try:
+    from batch_backtest import run_batch, ScalperTask, StrategyTask
+except ImportError:
+    run_batch = None
+try:
+    from portfolio import OVERLAP_MODES, PortfolioStrategy, portfolio_backtest
+except ImportError:
+    portfolio_backtest = None
+from result_cache import default_cache, dataset_fingerprint, result_key
+from sessions import SESSIONS
 
 try:
     from strategy_generator import (
         StrategyGenerator, TradingConfig as GenTradingConfig,
         INDICATOR_CATALOG, backtest_strategy,
-        IndicatorConfig, get_signal_at
+        IndicatorConfig, StrategyConfig, get_signal_at, build_dataset,
+        entry_signals, strategy_lookback, trading_grid
     )
     _SG_AVAILABLE = True
 except ImportError:
@@ -32,11 +49,21 @@ except ImportError:
     INDICATOR_CATALOG = {}
     backtest_strategy = None
     IndicatorConfig = None
+    StrategyConfig = None
     get_signal_at = None
+    build_dataset = None
+    entry_signals = None
+    strategy_lookback = None
+    trading_grid = None
     _SG_AVAILABLE = False
 import threading
 import json
+import logging
+import math
 import time
+from dataclasses import asdict, replace
+
+logger = logging.getLogger(__name__)
 
 class Base(DeclarativeBase):
     pass
@@ -762,30 +789,16 @@ def strategy_signals_for_chart():
 
     min_agr = max(1, settings.min_agreement or 1)
     try:
-        c   = [float(x.get('close', 0))  for x in candles]
-        hi  = [float(x.get('high',  x.get('close', 0))) for x in candles]
-        lo  = [float(x.get('low',   x.get('close', 0))) for x in candles]
-        op  = [float(x.get('open',  x.get('close', 0))) for x in candles]
-        vol = [float(x.get('volume', 1)) for x in candles]
-        D   = {'closes': c, 'highs': hi, 'lows': lo, 'opens': op, 'volumes': vol}
-
-        signals = []
-        warmup = 60
-        for i in range(warmup, len(candles) - 1):
-            votes = []
-            for ind in indicators:
-                try:
-                    s = get_signal_at(i, ind.indicator_id, ind.params, D)
-                    if s != 0:
-                        votes.append(s)
-                except Exception:
-                    pass
-            call_v = votes.count(1)
-            put_v  = votes.count(-1)
-            if call_v >= min_agr and call_v > put_v:
-                signals.append({'time': int(candles[i]['time']), 'signal': 1})
-            elif put_v >= min_agr and put_v > call_v:
-                signals.append({'time': int(candles[i]['time']), 'signal': -1})
+        # One dataset per request; entry_signals combines whole-array signal
+        # vectors, so the overlay costs one pass per indicator, not per bar.
+        frame = as_frame(candles)
+        D = build_dataset(frame)
+        strategy = StrategyConfig(indicators=indicators, min_agreement=min_agr)
+
+        warmup = strategy_lookback(strategy)
+        times = frame.time
+        signals = [{'time': times[i], 'signal': d}
+                   for i, d in entry_signals(strategy, D, warmup, len(candles) - 1)]
 
         return jsonify({'success': True, 'signals': signals, 'count': len(signals)})
     except Exception as ex:
@@ -986,23 +999,25 @@ def iqoption_candles():
                     robot.change_balance(acct)
                     time.sleep(2)
 
-                candles_raw = robot.api.get_candles(act, ivl, cnt, time.time())
+                # Resample from M1 history already downloaded for a backtest
+                # (only the newest minutes are fetched) instead of asking the
+                # broker for this interval again.
+                now = time.time()
+                if (fetch_candles_range is not None and ivl % 60 == 0
+                        and has_stored_m1(act, now - cnt * ivl)):
+                    frame = fetch_candles_range(robot, act, ivl, now - cnt * ivl, now)
+                    if len(frame):
+                        chart_cache[uid] = {'status': 'ready', 'data': frame[-cnt:].to_records(),
+                                            'asset': act, 'interval': ivl, 'message': ''}
+                        return
+
+                candles_raw = robot.api.get_candles(act, ivl, cnt, now)
                 if not candles_raw:
                     chart_cache[uid] = {'status': 'error', 'data': None, 'asset': act, 'interval': ivl,
                                         'message': f'Tidak ada data candle untuk {act}.'}
                     return
 
-                result = []
-                for c in candles_raw:
-                    result.append({
-                        'time': int(c.get('from', c.get('id', 0))),
-                        'open': float(c.get('open', 0)),
-                        'high': float(c.get('max', c.get('high', 0))),
-                        'low': float(c.get('min', c.get('low', 0))),
-                        'close': float(c.get('close', 0)),
-                        'volume': int(c.get('volume', 0))
-                    })
-                result.sort(key=lambda x: x['time'])
+                result = CandleFrame.from_iq(candles_raw).sorted_unique().to_records()
                 chart_cache[uid] = {'status': 'ready', 'data': result, 'asset': act,
                                     'interval': ivl, 'message': ''}
             except Exception as ex:
@@ -1062,20 +1077,9 @@ def iqoption_candles_more():
         if not candles_raw:
             return jsonify({'success': True, 'candles': []})
 
-        result = []
-        for c in candles_raw:
-            t_val = int(c.get('from', c.get('id', 0)))
-            if t_val >= before_time:      # strict: exclude any that overlap
-                continue
-            result.append({
-                'time':   t_val,
-                'open':   float(c.get('open', 0)),
-                'high':   float(c.get('max', c.get('high', 0))),
-                'low':    float(c.get('min', c.get('low', 0))),
-                'close':  float(c.get('close', 0)),
-                'volume': int(c.get('volume', 0))
-            })
-        result.sort(key=lambda x: x['time'])
+        # strict: exclude any that overlap (time < before_time; times are ints)
+        frame  = CandleFrame.from_iq(candles_raw).sorted_unique()
+        result = frame.between(0, math.ceil(before_time) - 1).to_records()
         return jsonify({'success': True, 'candles': result})
     except Exception as e:
         logging.exception(f'candles-more error: {e}')
@@ -1227,6 +1231,13 @@ def iqoption_rt_stop():
 backtest_cache: dict = {}
 
 
+# Backtests over more months than this stream their candles (constant memory)
+STREAM_MONTHS = 24
+# A saved scalper checkpoint is extended forward while its range start is at
+# most this much older than the requested one; after that the run starts over
+RESUME_MAX_AGE = 7 * 24 * 3600
+
+
 @app.route('/backtest/run', methods=['POST'])
 @login_required
 def backtest_run():
@@ -1237,8 +1248,9 @@ def backtest_run():
     data        = request.get_json() or {}
     user_id     = current_user.id
     asset       = data.get('asset', 'EURUSD-OTC')
-    months      = int(data.get('months', 12))        # 3 / 6 / 12 / 24
+    months      = int(data.get('months', 12))        # 3 / 6 / 12 / 24, longer streams
     payout      = float(data.get('payout', 0.82))
+    expiries    = sorted({max(1, min(30, int(e))) for e in data.get('expiries', [])})
     iq_email    = data.get('iq_email', '')
     iq_password = data.get('iq_password', '')
     account_type = data.get('account_type', 'PRACTICE')
@@ -1255,7 +1267,7 @@ def backtest_run():
         'message': 'Menginisialisasi…', 'result': None
     }
 
-    def _run(uid, email, password, acct, ast, mon, pay):
+    def _run(uid, email, password, acct, ast, mon, pay, exps):
         def prog(pct, msg):
             backtest_cache[uid]['progress'] = pct
             backtest_cache[uid]['message']  = msg
@@ -1282,34 +1294,89 @@ def backtest_run():
                 robot.change_balance(acct)
                 time.sleep(1)
 
-            prog(5, f'Mengambil data M1 {ast} ({mon} bulan)…')
-            end_ts   = time.time()
-            start_ts = end_ts - mon * 30.5 * 24 * 3600  # approximate
-
-            candles = fetch_candles_range(
-                robot, ast, 60, start_ts, end_ts, progress_cb=prog)
+            # closed candles only, from a UTC midnight: repeat runs share the history
+            start_ts, end_ts = closed_range(60, mon)
+            cache    = default_cache()
+
+            # Scalper state saved by the previous run of this backtest: only
+            # the candles after it are fetched and simulated
+            streamable = ScalperStream is not None and not exps
+            resumable  = streamable and cache is not None
+            ck_key = result_key('checkpoint', ast, 60, 'AtvScalperM1', pay, mon)
+            saved  = cache.get(ck_key) if resumable else None
+            if saved is not None and (start_ts - saved['start'] > RESUME_MAX_AGE or
+                                      saved['state'].get('version') != ScalperStream.CHECKPOINT_VERSION):
+                saved = None
+            checkpoint_from = None            # candles still to be fed to a fresh stream
+
+            if saved is not None or (mon > STREAM_MONTHS and streamable):
+                if saved is not None:
+                    bt = ScalperStream.resume(saved['state'])
+                    start_ts, first_ts = saved['start'], saved['first']
+                    from_ts = bt.last_time + 1
+                    prog(5, f'Melanjutkan backtest {ast} dari '
+                            f'{datetime.utcfromtimestamp(bt.last_time):%Y-%m-%d %H:%M}…')
+                else:
+                    # Multi-year history: stream it chunk by chunk, memory stays flat
+                    bt = ScalperStream(payout=pay)
+                    first_ts, from_ts = None, start_ts
+                    prog(5, f'Mengambil data M1 {ast} ({mon} bulan)…')
+                chunks = iter_candle_chunks(robot, ast, 60, from_ts, end_ts) if from_ts <= end_ts else ()
+                for chunk in chunks:
+                    if first_ts is None:
+                        first_ts = chunk.time[0]
+                    bt.feed(chunk)
+                    pct = 5 + int((bt.last_time - from_ts) / max(end_ts - from_ts, 1) * 94)
+                    prog(min(pct, 99), f'Backtest berjalan: {bt.bars:,} candle '
+                                       f's/d {datetime.utcfromtimestamp(bt.last_time):%Y-%m-%d}…')
+                if first_ts is None:
+                    backtest_cache[uid] = {
+                        'status': 'error', 'progress': 0,
+                        'message': f'Tidak ada data candle untuk {ast}.', 'result': None
+                    }
+                    return
+                result = bt.result()
+                n_candles, last_ts = bt.bars, bt.last_time
+                if resumable:
+                    cache.put(ck_key, {'start': start_ts, 'first': first_ts, 'state': bt.checkpoint()})
+            else:
+                prog(5, f'Mengambil data M1 {ast} ({mon} bulan)…')
+                candles = fetch_candles_range(
+                    robot, ast, 60, start_ts, end_ts, progress_cb=prog)
 
-            if not candles:
-                backtest_cache[uid] = {
-                    'status': 'error', 'progress': 0,
-                    'message': f'Tidak ada data candle untuk {ast}.', 'result': None
-                }
-                return
+                if not candles:
+                    backtest_cache[uid] = {
+                        'status': 'error', 'progress': 0,
+                        'message': f'Tidak ada data candle untuk {ast}.', 'result': None
+                    }
+                    return
 
-            prog(99, f'Menjalankan backtest ({len(candles):,} candle)…')
-            strategy = AtvScalperM1()
-            result   = strategy.backtest(candles, payout=pay)
+                prog(99, f'Menjalankan backtest ({len(candles):,} candle)…')
+                key    = result_key(dataset_fingerprint(candles, ast, 60), 'AtvScalperM1', pay, exps)
+                result = cache.get(key) if cache is not None else None
+                if result is None:
+                    result = AtvScalperM1().backtest(candles, payout=pay, expiries=exps)
+                    if cache is not None:
+                        cache.put(key, result)
+                n_candles, first_ts, last_ts = len(candles), candles.time[0], candles.time[-1]
+                if resumable:
+                    checkpoint_from = candles
+
+            # Period actually simulated: a resumed checkpoint keeps its own
+            # start, up to RESUME_MAX_AGE before the requested range
+            span_months = (last_ts - first_ts) / (30.5 * 24 * 3600)
 
             # Fill average signals/day
-            if result['total_signals'] > 0 and mon > 0:
-                trading_days = mon * 22   # ~22 trading days/month
+            if result['total_signals'] > 0 and span_months > 0:
+                trading_days = span_months * 22   # ~22 trading days/month
                 result['avg_signals_day'] = round(result['total_signals'] / trading_days, 1)
 
             result['asset']          = ast
-            result['period_months']  = mon
-            result['candles_tested'] = len(candles)
-            result['start_date']     = datetime.utcfromtimestamp(candles[0]['time']).strftime('%Y-%m-%d')
-            result['end_date']       = datetime.utcfromtimestamp(candles[-1]['time']).strftime('%Y-%m-%d')
+            result['period_months']  = round(span_months, 1)
+            result['requested_months'] = mon
+            result['candles_tested'] = n_candles
+            result['start_date']     = datetime.utcfromtimestamp(first_ts).strftime('%Y-%m-%d')
+            result['end_date']       = datetime.utcfromtimestamp(last_ts).strftime('%Y-%m-%d')
 
             backtest_cache[uid] = {
                 'status': 'done', 'progress': 100,
@@ -1318,6 +1385,13 @@ def backtest_run():
             logger.info(f"Backtest done: user={uid} asset={ast} "
                         f"win_rate={result['win_rate']}% signals={result['total_signals']}")
 
+            if checkpoint_from is not None:
+                # The result is already out; replay the candles through the
+                # (identical) streaming engine so the next run can resume
+                bt = ScalperStream(payout=pay)
+                bt.feed(checkpoint_from)
+                cache.put(ck_key, {'start': start_ts, 'first': first_ts, 'state': bt.checkpoint()})
+
         except Exception as ex:
             logger.exception(f'Backtest error: {ex}')
             backtest_cache[uid] = {
@@ -1329,12 +1403,143 @@ def backtest_run():
     threading.Thread(
         target=_run,
         args=(user_id, iq_email, iq_password, account_type,
-              asset, months, payout),
+              asset, months, payout, expiries),
         daemon=True
     ).start()
     return jsonify({'success': True})
 
 
+# ─── Batch backtest cache: user_id → {status, progress, results, message} ──────
+batch_cache: dict = {}
+
+
+@app.route('/backtest/batch', methods=['POST'])
+@login_required
+def backtest_batch():
+    """
+    Backtest one strategy on many assets (and intervals) in the shared process
+    pool.  Body: assets [...], intervals [...] (seconds, default [60]), months,
+    kind 'scalper' (AtvScalperM1, payout, optional expiries) or 'strategy'
+    (indicators, min_agreement, expiry and trading fields),
+    iq_email / iq_password / account_type.
+    Per-asset results appear in /backtest/batch-status as each one finishes.
+    """
+    if run_batch is None or fetch_candles_range is None:
+        return jsonify({'success': False, 'message': 'Strategy module tidak tersedia.'})
+
+    data        = request.get_json() or {}
+    user_id     = current_user.id
+    assets      = [a for a in data.get('assets', []) if a][:50]
+    intervals   = [int(i) for i in data.get('intervals', [60])] or [60]
+    months      = int(data.get('months', 12))
+    kind        = data.get('kind', 'scalper')
+    iq_email    = data.get('iq_email', '')
+    iq_password = data.get('iq_password', '')
+    account_type = data.get('account_type', 'PRACTICE')
+
+    if not iq_email or not iq_password:
+        return jsonify({'success': False, 'message': 'Masukkan email & password IQ Option.'})
+    if not assets:
+        return jsonify({'success': False, 'message': 'Pilih minimal 1 aset.'})
+    if batch_cache.get(user_id, {}).get('status') == 'running':
+        return jsonify({'success': False, 'message': 'Batch backtest sedang berjalan…'})
+
+    if kind == 'strategy':
+        if not _SG_AVAILABLE:
+            return jsonify({'success': False, 'message': 'Strategy generator tidak tersedia.'})
+        strategy = StrategyConfig(
+            indicators=[IndicatorConfig(indicator_id=i.get('id'), params=i.get('params', {}))
+                        for i in data.get('indicators', [])],
+            min_agreement=int(data.get('min_agreement', 1)),
+        )
+        if not strategy.indicators:
+            return jsonify({'success': False, 'message': 'Pilih minimal 1 indikator.'})
+        fields = GenTradingConfig.__dataclass_fields__
+        base = GenTradingConfig()
+        trading = replace(base, **{k: type(getattr(base, k))(v)
+                                   for k, v in data.items() if k in fields})
+        task = StrategyTask(strategy, trading, expiry=max(1, int(data.get('expiry', 1))))
+    else:
+        task = ScalperTask(payout=float(data.get('payout', 0.82)),
+                           expiries=tuple(sorted({max(1, min(30, int(e)))
+                                                  for e in data.get('expiries', [])})))
+
+    targets = [(a, i) for a in assets for i in intervals]
+    batch_cache[user_id] = {
+        'status': 'running', 'progress': 0, 'total': len(targets), 'done': 0,
+        'message': 'Menginisialisasi…', 'results': {},
+    }
+
+    def _run(uid, email, password, acct):
+        job = batch_cache[uid]
+
+        def on_result(target, result, error):
+            asset, interval = target
+            entry = {'asset': asset, 'interval': interval}
+            if error:
+                entry['error'] = error
+            else:
+                entry.update(result)
+            job['results'][f'{asset}@{interval}'] = entry
+            job['done'] += 1
+            job['progress'] = int(job['done'] / job['total'] * 100)
+            job['message'] = f'{job["done"]}/{job["total"]} aset selesai ({asset} M{interval // 60}).'
+
+        try:
+            robot = None
+            rt = rt_stream_cache.get(uid)
+            if rt and rt.get('status') == 'active' and rt.get('robot'):
+                robot = rt['robot']
+            elif uid in active_bots and active_bots[uid].check_connect():
+                robot = active_bots[uid]
+            if robot is None:
+                robot = IQTradingRobot(email, password)
+                if not robot.connect():
+                    batch_cache[uid].update({'status': 'error', 'message': 'Gagal konek ke IQ Option.'})
+                    return
+                robot.change_balance(acct)
+                time.sleep(1)
+
+            def fetch(asset, interval):
+                start_ts, end_ts = closed_range(interval, months)
+                job['message'] = f'Mengambil data {asset} M{interval // 60} ({months} bulan)…'
+                return fetch_candles_range(robot, asset, interval, start_ts, end_ts,
+                                           from_m1=len(intervals) > 1)
+
+            run_batch(targets, fetch, task, on_result,
+                      should_stop=lambda: job.get('status') == 'stopped',
+                      cache=default_cache())
+            if job['status'] == 'running':
+                job.update({'status': 'done', 'progress': 100, 'message': 'Batch backtest selesai.'})
+        except Exception as ex:
+            logger.exception(f'Batch backtest error: {ex}')
+            batch_cache[uid].update({'status': 'error', 'message': f'Error: {str(ex)}'})
+
+    threading.Thread(target=_run, args=(user_id, iq_email, iq_password, account_type),
+                     daemon=True).start()
+    return jsonify({'success': True, 'total': len(targets)})
+
+
+@app.route('/backtest/batch-stop', methods=['POST'])
+@login_required
+def backtest_batch_stop():
+    """Stop a running batch: no further assets are fetched and queued backtests are cancelled."""
+    job = batch_cache.get(current_user.id, {})
+    if job.get('status') == 'running':
+        job['status'] = 'stopped'
+        job['message'] = 'Batch backtest dihentikan oleh pengguna.'
+    return jsonify({'success': True})
+
+
+@app.route('/backtest/batch-status', methods=['GET'])
+@login_required
+def backtest_batch_status():
+    """Poll endpoint for a batch backtest: per-asset results stream in as they finish."""
+    return jsonify(batch_cache.get(current_user.id, {
+        'status': 'idle', 'progress': 0, 'total': 0, 'done': 0, 'message': '', 'results': {},
+    }))
+
+
 @app.route('/backtest/status', methods=['GET'])
 @login_required
 def backtest_status():
@@ -1519,6 +1724,18 @@ def strategy_generator_run():
     martingale_steps = int(data.get('martingale_steps', 3))
     martingale_multiplier = float(data.get('martingale_multiplier', 2.2))
     payout = float(data.get('payout', 0.82))
+    # Optional out-of-sample validation: top-N re-selected per fold's train range
+    validation = data.get('validation') if data.get('validation') in ('walk_forward', 'kfold') else None
+    folds = max(2, min(10, int(data.get('folds', 5))))
+    # Trade expiries in candles; each candidate is ranked at its best one
+    expiries = sorted({max(1, min(30, int(e))) for e in data.get('expiries', [1])}) or [1]
+    # Monte Carlo reshuffles of each final result's trades (0 = off)
+    mc_sims = max(0, min(50000, int(data.get('monte_carlo', 10000))))
+    # Score candidates only on entries inside these trading sessions (UTC)
+    sessions = [s for s in data.get('sessions', []) if s in SESSIONS]
+    # Search processes; by default every core but one is left to the web app
+    cpus = os.cpu_count() or 1
+    workers = max(1, min(cpus, int(data.get('workers', cpus - 1))))
 
     if not iq_email or not iq_password:
         return jsonify({'success': False, 'message': 'Masukkan email & password IQ Option.'})
@@ -1537,7 +1754,8 @@ def strategy_generator_run():
     }
 
     def _run(uid, email, password, acct, ast, ivl, mon,
-             allowed, min_ind, max_ind, modal, amount, sl, sw, mrt_s, mrt_m, pay):
+             allowed, min_ind, max_ind, modal, amount, sl, sw, mrt_s, mrt_m, pay,
+             validation, folds, expiries, mc_sims, sessions, workers):
         try:
             # Connect & fetch candles
             robot = None
@@ -1589,6 +1807,12 @@ def strategy_generator_run():
                 allowed_indicators=allowed,
                 min_indicators=min_ind,
                 max_indicators=max_ind,
+                validation=validation,
+                folds=folds,
+                expiries=expiries,
+                monte_carlo_sims=mc_sims,
+                sessions=sessions,
+                workers=workers,
             )
             generator_cache[uid]['_gen'] = gen
 
@@ -1612,6 +1836,7 @@ def strategy_generator_run():
             generator_cache[uid].update({
                 'status': 'done',
                 'results': gen.results_as_dicts(),
+                'validation': gen.validation.as_dict() if gen.validation else None,
                 'iterations': gen.iterations,
                 'found': len(gen.best),
                 'message': (
@@ -1632,7 +1857,8 @@ def strategy_generator_run():
         target=_run,
         args=(user_id, iq_email, iq_password, account_type, asset, interval, months,
               allowed_indicators, min_indicators, max_indicators,
-              modal, amount, stop_loss, stop_win, martingale_steps, martingale_multiplier, payout),
+              modal, amount, stop_loss, stop_win, martingale_steps, martingale_multiplier, payout,
+              validation, folds, expiries, mc_sims, sessions, workers),
         daemon=True,
     ).start()
 
@@ -1652,6 +1878,72 @@ def strategy_generator_status():
     return jsonify(safe)
 
 
+@app.route('/strategy-generator/trades', methods=['POST'])
+@login_required
+def strategy_generator_trades():
+    """Trade log and session breakdown of one generator result, rebuilt on demand."""
+    gen = generator_cache.get(current_user.id, {}).get('_gen')
+    if gen is None:
+        return jsonify({'success': False, 'message': 'Generator belum dijalankan.', 'trades': []})
+    try:
+        data = request.get_json() or {}
+        strategy = StrategyConfig(
+            indicators=[IndicatorConfig(indicator_id=i.get('id'), params=i.get('params', {}))
+                        for i in data.get('indicators', [])],
+            min_agreement=int(data.get('min_agreement', 1)),
+        )
+        expiry = max(1, int(data.get('expiry', 1)))
+        result = gen.detail(strategy, expiry=expiry)
+        if result is None:
+            return jsonify({'success': True, 'trades': [], 'breakdown': None})
+        return jsonify({'success': True, 'trades': result.trades, 'breakdown': result.breakdown})
+    except Exception as ex:
+        return jsonify({'success': False, 'message': str(ex), 'trades': []})
+
+
+@app.route('/strategy-generator/money-sweep', methods=['POST'])
+@login_required
+def strategy_generator_money_sweep():
+    """
+    Re-simulate one generator result under a grid of money-management settings.
+    Body: indicators, min_agreement, expiry, base trading fields (modal, amount, ...)
+    and grid, e.g. {"martingale_steps": [0, 1, 2, 3], "martingale_multiplier": [1.5, 2.2]}.
+    Signals are reused from the generator's dataset; only the balance walk reruns.
+    """
+    gen = generator_cache.get(current_user.id, {}).get('_gen')
+    if gen is None:
+        return jsonify({'success': False, 'message': 'Generator belum dijalankan.', 'results': []})
+    try:
+        data = request.get_json() or {}
+        strategy = StrategyConfig(
+            indicators=[IndicatorConfig(indicator_id=i.get('id'), params=i.get('params', {}))
+                        for i in data.get('indicators', [])],
+            min_agreement=int(data.get('min_agreement', 1)),
+        )
+        fields = GenTradingConfig.__dataclass_fields__
+        base = replace(gen.trading, **{k: type(getattr(gen.trading, k))(v)
+                                       for k, v in data.items() if k in fields})
+        grid = {k: v for k, v in (data.get('grid') or {}).items() if k in fields}
+        tradings = trading_grid(base, **grid)[:500]
+        results = []
+        expiry = max(1, int(data.get('expiry', 1)))
+        for trading, r in zip(tradings, gen.sweep(strategy, tradings, expiry=expiry)):
+            row = asdict(trading)
+            if r is not None:
+                row.update({
+                    'win_rate':          r.win_rate,
+                    'total_trades':      r.total_trades,
+                    'sim_profit':        r.sim_profit,
+                    'sim_final_balance': r.sim_final_balance,
+                    'sim_max_drawdown':  r.sim_max_drawdown,
+                    'max_consec_loss':   r.max_consec_loss,
+                })
+            results.append(row)
+        return jsonify({'success': True, 'results': results})
+    except Exception as ex:
+        return jsonify({'success': False, 'message': str(ex), 'results': []})
+
+
 @app.route('/strategy-generator/stop', methods=['POST'])
 @login_required
 def strategy_generator_stop():
@@ -1832,5 +2124,117 @@ def multi_strategies_delete():
         return jsonify({'success': False, 'message': str(ex)})
 
 
+# ─── Portfolio backtest cache: user_id → {status, progress, message, result} ───
+portfolio_cache: dict = {}
+
+
+@app.route('/strategy-generator/multi-backtest', methods=['POST'])
+@login_required
+def multi_strategies_backtest():
+    """
+    Backtest every active multi-strategy together on one shared balance
+    (portfolio.portfolio_backtest).  Body: months, overlap
+    ('single' | 'per_asset' | 'per_strategy' | 'all'), max_open, TradingConfig
+    fields (default: the bot's own amount / stop / martingale settings),
+    iq_email / iq_password / account_type.
+    """
+    import json as _json
+    if portfolio_backtest is None or fetch_candles_range is None:
+        return jsonify({'success': False, 'message': 'Strategy module tidak tersedia.'})
+
+    data        = request.get_json() or {}
+    user_id     = current_user.id
+    months      = max(1, int(data.get('months', 3)))
+    overlap     = data.get('overlap', 'single')
+    max_open    = max(0, int(data.get('max_open', 0)))
+    iq_email    = data.get('iq_email', '')
+    iq_password = data.get('iq_password', '')
+    account_type = data.get('account_type', 'PRACTICE')
+
+    if not iq_email or not iq_password:
+        return jsonify({'success': False, 'message': 'Masukkan email & password IQ Option.'})
+    if overlap not in OVERLAP_MODES:
+        return jsonify({'success': False, 'message': f'Mode overlap tidak dikenal: {overlap}'})
+    if portfolio_cache.get(user_id, {}).get('status') == 'running':
+        return jsonify({'success': False, 'message': 'Backtest portofolio sedang berjalan…'})
+
+    settings = BotSetting.query.filter_by(user_id=user_id).first()
+    try:
+        entries = _json.loads(settings.active_strategies or '[]') if settings else []
+    except Exception:
+        entries = []
+    members = [PortfolioStrategy.from_active(e) for e in entries if e.get('indicators')]
+    if not members:
+        return jsonify({'success': False, 'message': 'Belum ada strategi aktif. Tambahkan dari Generator.'})
+
+    # Money management as the robot runs it, overridable per request
+    base = GenTradingConfig(
+        amount=settings.trading_amount or 1.0,
+        stop_win=settings.stop_win or 10.0,
+        stop_loss=settings.stop_loss or 10.0,
+        martingale_steps=settings.step_martingale or 0,
+        martingale_multiplier=settings.martingale_multiple or 2.2,
+    )
+    fields = GenTradingConfig.__dataclass_fields__
+    trading = replace(base, **{k: type(getattr(base, k))(v) for k, v in data.items() if k in fields})
+
+    targets = sorted({(m.asset, m.interval) for m in members})
+    portfolio_cache[user_id] = {
+        'status': 'running', 'progress': 0, 'message': 'Menginisialisasi…', 'result': None,
+    }
+
+    def _run(uid, email, password, acct):
+        job = portfolio_cache[uid]
+        try:
+            robot = None
+            rt = rt_stream_cache.get(uid)
+            if rt and rt.get('status') == 'active' and rt.get('robot'):
+                robot = rt['robot']
+            elif uid in active_bots and active_bots[uid].check_connect():
+                robot = active_bots[uid]
+            if robot is None:
+                robot = IQTradingRobot(email, password)
+                if not robot.connect():
+                    job.update({'status': 'error', 'message': 'Gagal konek ke IQ Option.'})
+                    return
+                robot.change_balance(acct)
+                time.sleep(1)
+
+            end_ts   = time.time()
+            start_ts = end_ts - months * 30.5 * 24 * 3600
+            per_asset = {}
+            for asset, interval in targets:
+                per_asset[asset] = per_asset.get(asset, 0) + 1
+            candles = {}
+            for j, (asset, interval) in enumerate(targets):
+                job.update({'progress': int(j / len(targets) * 90),
+                            'message': f'Mengambil data {asset} M{interval // 60} ({months} bulan)…'})
+                candles[(asset, interval)] = fetch_candles_range(
+                    robot, asset, interval, start_ts, end_ts, from_m1=per_asset[asset] > 1)
+
+            job.update({'progress': 90,
+                        'message': f'Menyimulasikan {len(members)} strategi dengan saldo bersama…'})
+            result = portfolio_backtest(members, candles, trading, overlap, max_open)
+            job.update({'status': 'done', 'progress': 100, 'message': 'Backtest portofolio selesai.',
+                        'result': dict(result.as_dict(), overlap=overlap, max_open=max_open,
+                                       trading=asdict(trading), months=months)})
+        except Exception as ex:
+            logger.exception(f'Portfolio backtest error: {ex}')
+            job.update({'status': 'error', 'message': f'Error: {str(ex)}'})
+
+    threading.Thread(target=_run, args=(user_id, iq_email, iq_password, account_type),
+                     daemon=True).start()
+    return jsonify({'success': True, 'strategies': len(members)})
+
+
+@app.route('/strategy-generator/multi-backtest-status', methods=['GET'])
+@login_required
+def multi_strategies_backtest_status():
+    """Poll endpoint for the portfolio backtest."""
+    return jsonify(portfolio_cache.get(current_user.id, {
+        'status': 'idle', 'progress': 0, 'message': '', 'result': None,
+    }))
+
+
 if __name__ == '__main__':
     app.run(host='0.0.0.0', port=5000, debug=True)
@@ -0,0 +1,277 @@
+"""
+Multi-Asset Batch Backtests
+===========================
+Runs the same backtest (ATV Scalper M1 or a generator StrategyConfig) over a
+list of assets / intervals.  Candles are fetched one target at a time in the
+calling thread (the IQ Option connection is not shareable across processes)
+and each backtest is handed to a process pool as soon as its candles arrive,
+so fetching the next asset overlaps with the backtests already running.
+
+The pool is sized to the machine's cores and shared by every job of the
+process (get_pool); results are reported per target through on_result as
+each backtest finishes, in completion order.  With a ResultCache, targets
+whose candles and task were already run are answered from it without
+touching the pool.
+
+Backtest ranges end at the latest closed candle (strategy_scalper.
+closed_range), so a repeat run a few minutes later has new candles and a new
+fingerprint.  Resumable tasks (the scalper without extra expiries) therefore
+cache a checkpoint instead of the result: the streaming state after the
+candles before the last UTC midnight, the part of the range that repeat runs
+on the same day share.  A repeat run resumes from it in this thread and
+feeds only the candles since (a day of M1 at most, a few milliseconds).  On
+a miss the checkpoint is built in the pool next to the backtest.  Other
+tasks cache their whole result, which a repeat hits while no candle has
+closed in between.
+
+    run_batch(targets=[('EURUSD-OTC', 60), ('GBPUSD-OTC', 60)],
+              fetch=lambda asset, interval: fetch_candles_range(...),
+              task=ScalperTask(payout=0.82),
+              on_result=lambda target, result, error: ...)
+"""
+
+import os
+import threading
+import logging
+from concurrent.futures import ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, List, Optional
+
+from strategy_generator import (StrategyConfig, TradingConfig, backtest_strategy,
+                                pool_context)
+from strategy_scalper import AtvScalperM1
+from result_cache import ResultCache, dataset_fingerprint, result_key
+
+try:
+    from stream_backtest import ScalperStream
+except ImportError:
+    ScalperStream = None
+
+logger = logging.getLogger(__name__)
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# SHARED POOL
+# ══════════════════════════════════════════════════════════════════════════════
+
+_POOL: Optional[ProcessPoolExecutor] = None
+_POOL_LOCK = threading.Lock()
+
+
+def get_pool() -> ProcessPoolExecutor:
+    """The process-wide backtest pool (one worker per core), created on first use."""
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is None:
+            _POOL = ProcessPoolExecutor(os.cpu_count() or 1, mp_context=pool_context())
+        return _POOL
+
+
+def _reset_pool(broken: ProcessPoolExecutor) -> None:
+    """Drop a pool whose worker died so the next get_pool() starts a fresh one."""
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is broken:
+            _POOL = None
+    broken.shutdown(wait=False)
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# TASKS  (run in the workers; must be picklable)
+# ══════════════════════════════════════════════════════════════════════════════
+
+def _period(candles) -> dict:
+    times = candles.time
+    return {
+        'candles_tested': len(candles),
+        'start_date': datetime.utcfromtimestamp(times[0]).strftime('%Y-%m-%d') if len(candles) else '',
+        'end_date':   datetime.utcfromtimestamp(times[-1]).strftime('%Y-%m-%d') if len(candles) else '',
+    }
+
+
+@dataclass
+class ScalperTask:
+    """AtvScalperM1.backtest at the given payout (and optional extra expiries)."""
+    payout: float = 0.82
+    expiries: tuple = ()
+
+    def __call__(self, candles) -> dict:
+        result = AtvScalperM1().backtest(candles, payout=self.payout, expiries=self.expiries)
+        result.update(_period(candles))
+        return result
+
+    @property
+    def resumable(self) -> bool:
+        """The same result comes from a ScalperStream (no extra expiries)."""
+        return ScalperStream is not None and not self.expiries
+
+    def checkpoint(self, candles) -> dict:
+        """ScalperStream state after candles, for resume()."""
+        bt = ScalperStream(payout=self.payout)
+        bt.feed(candles)
+        return bt.checkpoint()
+
+    def resume(self, state: dict, candles) -> dict:
+        """This task's result on candles, from a checkpoint() of their first rows."""
+        bt = ScalperStream.resume(state)
+        bt.feed(candles.between(state['last_time'] + 1, candles.time[-1]))
+        result = bt.result()
+        result.update(_period(candles))
+        return result
+
+
+@dataclass
+class StrategyTask:
+    """backtest_strategy of one StrategyConfig (statistics only, no trade log)."""
+    strategy: StrategyConfig
+    trading: TradingConfig
+    expiry: int = 1
+
+    def __call__(self, candles) -> dict:
+        r = backtest_strategy(candles, self.strategy, self.trading, record_trades=False,
+                              expiry=self.expiry)
+        out = _period(candles)
+        if r is None:
+            out.update({'total_trades': 0, 'win_rate': 0.0,
+                        'message': 'Kurang dari 10 sinyal pada data ini.'})
+            return out
+        out.update({
+            'expiry':            r.expiry,
+            'win_rate':          r.win_rate,
+            'total_trades':      r.total_trades,
+            'wins':              r.wins,
+            'losses':            r.losses,
+            'net_pnl':           r.net_pnl,
+            'max_consec_loss':   r.max_consec_loss,
+            'max_consec_win':    r.max_consec_win,
+            'score':             r.score,
+            'sim_profit':        r.sim_profit,
+            'sim_final_balance': r.sim_final_balance,
+            'sim_max_drawdown':  r.sim_max_drawdown,
+        })
+        return out
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# BATCH RUNNER
+# ══════════════════════════════════════════════════════════════════════════════
+
+CHECKPOINT_SPAN = 24 * 3600      # resumable tasks checkpoint the range up to UTC midnight
+
+
+def run_batch(targets: List[tuple], fetch: Callable, task: Callable,
+              on_result: Callable, should_stop: Callable = lambda: False,
+              cache: Optional[ResultCache] = None) -> None:
+    """
+    targets: [(asset, interval)]; fetch(asset, interval) → CandleFrame (empty /
+    None when there is no data); task(candles) → result dict, run in the pool.
+    on_result((asset, interval), result, error) is called once per target —
+    from the pool's callback thread for finished backtests, from this thread
+    for fetch failures.  Returns when every target is reported.
+    should_stop() is checked before each fetch; once it is true, backtests
+    still queued in the pool are cancelled (reported with an error).  Results are looked up in and
+    stored to cache (keyed by candle fingerprint and task) when one is given;
+    resumable tasks keep a checkpoint there instead (see module docstring).
+    """
+    futures = []
+    for target in targets:
+        if should_stop():
+            break
+        try:
+            candles = fetch(*target)
+        except Exception as ex:
+            logger.warning(f'Batch fetch failed for {target}: {ex}')
+            on_result(target, None, f'Gagal mengambil candle: {ex}')
+            continue
+        if not candles:
+            on_result(target, None, 'Tidak ada data candle.')
+            continue
+        key = ck_key = head = None
+        if cache is not None and getattr(task, 'resumable', False):
+            head = _head(candles)
+            if len(head):
+                ck_key = result_key(dataset_fingerprint(head, *target), task, 'checkpoint')
+        if ck_key is not None:
+            state = cache.get(ck_key)
+            if state is not None:
+                _resume(task, state, candles, target, on_result)
+                continue
+        elif cache is not None:         # other tasks, or no midnight in the range: whole result
+            key = result_key(dataset_fingerprint(candles, *target), task)
+            hit = cache.get(key)
+            if hit is not None:
+                on_result(target, hit, None)
+                continue
+        fut, pool = _submit(task, candles)
+        fut.add_done_callback(lambda f, t=target, k=key, p=pool:
+                              _report(f, t, on_result, cache, k, p))
+        futures.append(fut)
+        if ck_key is not None:
+            ck, _ = _submit(task.checkpoint, head)
+            ck.add_done_callback(lambda f, t=target, k=ck_key: _store(f, t, cache, k))
+            futures.append(ck)
+    pending = futures
+    while pending:
+        if should_stop():
+            for fut in pending:
+                fut.cancel()        # queued backtests only; running ones finish
+        pending = wait(pending, timeout=0.5).not_done
+
+
+def _head(candles):
+    """The candles before the last UTC midnight of the range (rows repeat runs share)."""
+    cut = candles.time[-1] // CHECKPOINT_SPAN * CHECKPOINT_SPAN
+    return candles.between(candles.time[0], cut - 1)
+
+
+def _submit(fn, *args) -> tuple:
+    """(future, pool) of fn(*args) on the shared pool, replacing it once if it is broken."""
+    pool = get_pool()
+    try:
+        return pool.submit(fn, *args), pool
+    except BrokenProcessPool:
+        _reset_pool(pool)
+        pool = get_pool()
+        return pool.submit(fn, *args), pool
+
+
+def _resume(task, state, candles, target, on_result) -> None:
+    try:
+        result = task.resume(state, candles)
+    except Exception as ex:
+        logger.exception(f'Batch backtest failed for {target}: {ex}')
+        on_result(target, None, f'Error: {ex}')
+        return
+    on_result(target, result, None)
+
+
+def _store(fut, target, cache, key) -> None:
+    """Done callback of a checkpoint job: a failure only costs the next run its shortcut."""
+    if fut.cancelled():
+        return
+    try:
+        cache.put(key, fut.result())
+    except Exception as ex:
+        logger.warning(f'Batch checkpoint failed for {target}: {ex}')
+
+
+def _report(fut, target, on_result, cache=None, key=None, pool=None) -> None:
+    if fut.cancelled():
+        on_result(target, None, 'Dibatalkan.')
+        return
+    try:
+        result = fut.result()
+        if cache is not None and key is not None:
+            cache.put(key, result)
+        on_result(target, result, None)
+    except BrokenProcessPool as ex:
+        # a worker died: later batches must not keep submitting to this pool
+        if pool is not None:
+            _reset_pool(pool)
+        logger.error(f'Batch backtest failed for {target}: {ex}')
+        on_result(target, None, f'Error: {ex}')
+    except Exception as ex:
+        logger.exception(f'Batch backtest failed for {target}: {ex}')
+        on_result(target, None, f'Error: {ex}')
@@ -0,0 +1,249 @@
+"""
+Columnar Candles
+================
+CandleFrame keeps OHLCV candles as six typed arrays (array.array: 'q' for
+time, 'd' for open/high/low/close/volume) instead of a list of per-candle
+dicts — 48 bytes per candle instead of a ~600-byte dict, so a 24-month M1
+history (~1M candles) is ~50 MB rather than several hundred.
+
+Slicing returns a view over the same buffers (no copy), and a view's
+columns are memoryviews over its window (no copy either); append()/extend()
+grow the arrays; to_records() / to_dict() serialise on the way out (JSON,
+chart cache).  Integer indexing and iteration still yield candle dicts, so
+code written for list[dict] keeps working while hot paths read columns.
+
+    frame = CandleFrame.from_iq(robot.api.get_candles(asset, 60, 1000, now))
+    recent = frame[-250:]              # view, no copy
+    closes = frame.close               # array('d')
+    recent.close                       # memoryview('d'), no copy
+    frame[0]['time']                   # dict access for old call sites
+
+share_frame() / attach_frame() place a frame's columns in one shared-memory
+block, so worker processes read the same candles without a copy each.
+"""
+
+from array import array
+from bisect import bisect_left, bisect_right
+from multiprocessing import shared_memory
+
+COLUMNS = ('time', 'open', 'high', 'low', 'close', 'volume')
+_TYPECODES = {'time': 'q', 'open': 'd', 'high': 'd', 'low': 'd', 'close': 'd', 'volume': 'd'}
+
+
+class CandleFrame:
+    """
+    OHLCV candles as typed columns.  A frame is a [start, stop) window over
+    column buffers that slices of the same frame share.
+    """
+
+    __slots__ = ('_cols', '_start', '_stop')
+
+    def __init__(self, time=(), open=(), high=(), low=(), close=(), volume=()):
+        cols = {}
+        for name, values in zip(COLUMNS, (time, open, high, low, close, volume)):
+            cols[name] = array(_TYPECODES[name], values)
+        n = len(cols['time'])
+        if any(len(col) != n for col in cols.values()):
+            raise ValueError('CandleFrame columns must have the same length')
+        self._cols, self._start, self._stop = cols, 0, n
+
+    @classmethod
+    def _view(cls, cols: dict, start: int, stop: int) -> 'CandleFrame':
+        frame = cls.__new__(cls)
+        frame._cols, frame._start, frame._stop = cols, start, stop
+        return frame
+
+    # ── construction ─────────────────────────────────────────────────────────
+    @classmethod
+    def from_candles(cls, candles) -> 'CandleFrame':
+        """From candle dicts (time/open/high/low/close/volume keys)."""
+        if isinstance(candles, CandleFrame):
+            return candles
+        frame = cls()
+        frame.extend(candles)
+        return frame
+
+    @classmethod
+    def from_iq(cls, raw, start_ts: float = None) -> 'CandleFrame':
+        """
+        From IQ Option get_candles() records ('from'/'max'/'min' keys, or the
+        short 't'/'o'/'h'/'l'/'c'/'v' form).  start_ts drops older candles.
+        """
+        frame = cls()
+        cols = frame._cols
+        for c in raw:
+            t = int(c.get('from', c.get('id', c.get('t', 0))))
+            if start_ts is not None and t < start_ts:
+                continue
+            close = float(c.get('close', c.get('c', 0)))
+            cols['time'].append(t)
+            cols['open'].append(float(c.get('open', c.get('o', close))))
+            cols['high'].append(float(c.get('max', c.get('high', c.get('h', close)))))
+            cols['low'].append(float(c.get('min', c.get('low', c.get('l', close)))))
+            cols['close'].append(close)
+            cols['volume'].append(float(c.get('volume', c.get('v', 0))))
+        frame._stop = len(cols['time'])
+        return frame
+
+    @classmethod
+    def concat(cls, frames) -> 'CandleFrame':
+        """One frame holding the rows of `frames` in order (copies)."""
+        out = cls()
+        for f in frames:
+            for name in COLUMNS:
+                out._cols[name].extend(f.column(name))
+        out._stop = len(out._cols['time'])
+        return out
+
+    # ── sequence protocol ────────────────────────────────────────────────────
+    def __len__(self):
+        return self._stop - self._start
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            start, stop, step = key.indices(len(self))
+            if step == 1:
+                return self._view(self._cols, self._start + start, self._start + max(start, stop))
+            return self.take(range(start, stop, step))
+        n = len(self)
+        if key < 0:
+            key += n
+        if not 0 <= key < n:
+            raise IndexError('CandleFrame index out of range')
+        j = self._start + key
+        return {name: col[j] for name, col in self._cols.items()}
+
+    def __iter__(self):
+        cols = [self._cols[name] for name in COLUMNS]
+        for j in range(self._start, self._stop):
+            yield {name: col[j] for name, col in zip(COLUMNS, cols)}
+
+    def __repr__(self):
+        if not len(self):
+            return 'CandleFrame(0 candles)'
+        return f'CandleFrame({len(self)} candles, {self.time[0]}..{self.time[-1]})'
+
+    # ── columns ──────────────────────────────────────────────────────────────
+    def column(self, name: str):
+        """
+        One column, without copying.  A frame covering its whole buffer
+        returns the buffer itself (array, treat as read-only); a view returns
+        a typed memoryview of its window (indexing, slicing, len(), tolist(),
+        tobytes() and NumPy's buffer protocol work as on the array).  While
+        such a memoryview is alive the underlying array cannot grow, so
+        append() on the parent frame raises BufferError; copy() the view (or
+        call tolist()) to keep values independently of the buffer.
+        """
+        col = self._cols[name]
+        if self._start == 0 and self._stop == len(col):
+            return col
+        return memoryview(col)[self._start:self._stop]
+
+    time   = property(lambda self: self.column('time'))
+    open   = property(lambda self: self.column('open'))
+    high   = property(lambda self: self.column('high'))
+    low    = property(lambda self: self.column('low'))
+    close  = property(lambda self: self.column('close'))
+    volume = property(lambda self: self.column('volume'))
+
+    def copy(self) -> 'CandleFrame':
+        """Compact frame owning its own buffers (column access without copies)."""
+        s, e = self._start, self._stop
+        return self._view({name: col[s:e] for name, col in self._cols.items()}, 0, e - s)
+
+    def take(self, indices) -> 'CandleFrame':
+        """New frame with the rows at `indices` (relative to this frame)."""
+        s = self._start
+        return CandleFrame(*([col[s + i] for i in indices]
+                             for col in (self._cols[name] for name in COLUMNS)))
+
+    def sorted_unique(self) -> 'CandleFrame':
+        """Rows ordered by time, keeping the first row for each timestamp."""
+        t = self.time
+        seen, order = set(), []
+        for i in sorted(range(len(t)), key=t.__getitem__):
+            if t[i] not in seen:
+                seen.add(t[i])
+                order.append(i)
+        return self.take(order)
+
+    def between(self, start_ts: float, end_ts: float) -> 'CandleFrame':
+        """View of the rows with start_ts <= time <= end_ts (frame sorted by time)."""
+        t = self._cols['time']
+        lo = bisect_left(t, start_ts, self._start, self._stop)
+        hi = bisect_right(t, end_ts, lo, self._stop)
+        return self._view(self._cols, lo, hi)
+
+    # ── growth ───────────────────────────────────────────────────────────────
+    def append(self, candle: dict) -> None:
+        """
+        Append one candle dict (missing high/low/open default to close).
+        Raises BufferError, with the frame unchanged, while a view's column
+        memoryview over these buffers is alive.
+        """
+        if self._stop != len(self._cols['time']):
+            raise ValueError('cannot append to a CandleFrame view that is not at the end')
+        close = float(candle.get('close', 0))
+        row = (int(candle.get('time', self._stop)), float(candle.get('open', close)),
+               float(candle.get('high', close)), float(candle.get('low', close)),
+               close, float(candle.get('volume', 1)))
+        done = []
+        try:
+            for name, value in zip(COLUMNS, row):
+                self._cols[name].append(value)
+                done.append(name)
+        except BufferError:
+            # a view's memoryview column pins this buffer: leave the columns aligned
+            for name in done:
+                self._cols[name].pop()
+            raise
+        self._stop += 1
+
+    def extend(self, candles) -> None:
+        for candle in candles:
+            self.append(candle)
+
+    # ── serialisation ────────────────────────────────────────────────────────
+    def to_records(self) -> list:
+        """list[dict] with int time, JSON-ready (the chart / API shape)."""
+        return list(self)
+
+    def to_dict(self) -> dict:
+        """Columnar JSON-ready form: {'time': [...], 'open': [...], ...}."""
+        return {name: self.column(name).tolist() for name in COLUMNS}
+
+
+def as_frame(candles) -> CandleFrame:
+    """candles as a CandleFrame (no-op when it already is one)."""
+    return CandleFrame.from_candles(candles)
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# SHARED MEMORY
+# ══════════════════════════════════════════════════════════════════════════════
+# One block holds the six columns back to back (every item is 8 bytes).  An
+# attached frame's columns are typed memoryviews over that block: indexing,
+# slicing, len(), tolist() and the buffer protocol (NumPy) behave as with
+# array columns, but the frame is read-only and cannot grow.
+
+def share_frame(frame: CandleFrame) -> tuple:
+    """
+    Copy frame into a new SharedMemory block: (shm, spec).  Pass spec to
+    attach_frame() in another process; the caller owns shm and must
+    close() and unlink() it once every worker is done.
+    """
+    frame = as_frame(frame)
+    n = len(frame)
+    shm = shared_memory.SharedMemory(create=True, size=max(1, 8 * n * len(COLUMNS)))
+    for j, name in enumerate(COLUMNS):
+        shm.buf[8 * n * j:8 * n * (j + 1)] = frame.column(name).tobytes()
+    return shm, (shm.name, n)
+
+
+def attach_frame(spec: tuple) -> tuple:
+    """(frame, shm) over a block made by share_frame; keep shm alive while frame is used."""
+    name, n = spec
+    shm = shared_memory.SharedMemory(name=name)
+    cols = {col: shm.buf[8 * n * j:8 * n * (j + 1)].cast(_TYPECODES[col])
+            for j, col in enumerate(COLUMNS)}
+    return CandleFrame._view(cols, 0, n), shm
@@ -0,0 +1,857 @@
+"""
+NumPy Indicator Engine
+======================
+Array versions of every function in the INDICATOR MATH LIBRARY section of
+strategy_generator.py.  Same inputs, same numbers, but:
+  - results are float64 arrays with NaN where the list version has None
+  - window sums / means use cumulative sums (O(N), independent of period)
+  - window max / min use a van Herk / Gil-Werman block scan (O(N))
+  - EMA / RMA style recurrences run as a blocked linear scan (matrix products)
+  - the few branchy state machines (SAR, Supertrend direction, McGinley)
+    stay scalar loops over plain floats
+
+Quirks of the list versions are reproduced on purpose (truthiness checks that
+treat 0.0 as missing, compress-then-pad alignment in MACD/ADX/TRIX, the
+one-bar shift of the Ultimate Oscillator) so signals do not change when the
+engine is switched.
+
+strategy_generator.build_dataset() uses it by default whenever NumPy is
+installed (engine='python' forces the list kernels); the functions here can
+also be called directly.  tests/test_indicators_np.py compares every
+INDICATOR_CATALOG entry against the pure-Python implementation.
+"""
+
+import math
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+_SCAN_BLOCK   = 64          # block length for the linear recurrence scan
+_WINDOW_CHUNK = 1 << 20     # max elements materialised by windowed reductions
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# KERNELS
+# ══════════════════════════════════════════════════════════════════════════════
+
+def _arr(v):
+    return np.asarray(v, dtype=np.float64)
+
+
+def _nan(n):
+    return np.full(n, np.nan)
+
+
+def _truthy(x):
+    """Array version of `x` being truthy in the list code (not None, not 0)."""
+    return ~np.isnan(x) & (x != 0)
+
+
+def _compress(x):
+    """[v for v in x if v is not None]"""
+    return x[~np.isnan(x)]
+
+
+def _pad_front(x, n):
+    """[None] * (n - len(x)) + x"""
+    out = _nan(n)
+    if len(x):
+        out[n - len(x):] = x[-n:] if len(x) > n else x
+    return out
+
+
+def window_sum(x, p, nonneg_zero=False):
+    """
+    Sum of each length-p window, result[k] = sum(x[k:k+p]) (len n-p+1).
+    Cumulative sum over values centred on x[0] to keep rounding small.
+    nonneg_zero: x is >= 0, so windows without a non-zero element are exactly
+    0.0 (the list code tests `if s_tr:` on these sums).
+    """
+    n = len(x)
+    if p <= 0 or n < p:
+        return np.empty(0)
+    ref = x[0]
+    cs  = np.empty(n + 1)
+    cs[0] = 0.0
+    np.cumsum(x - ref, out=cs[1:])
+    s = cs[p:] - cs[:-p] + ref * p
+    if nonneg_zero:
+        nz = np.empty(n + 1)
+        nz[0] = 0.0
+        np.cumsum(x != 0, out=nz[1:])
+        s[(nz[p:] - nz[:-p]) == 0] = 0.0
+    return s
+
+
+def window_count(mask, p):
+    """Number of True values in each length-p window (len n-p+1)."""
+    n = len(mask)
+    if p <= 0 or n < p:
+        return np.empty(0, dtype=np.int64)
+    cs = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(mask, out=cs[1:])
+    return cs[p:] - cs[:-p]
+
+
+def _block_extreme(x, p, ufunc, fill):
+    n = len(x)
+    if p <= 0 or n < p:
+        return np.empty(0)
+    m = -(-n // p) * p
+    xp = np.full(m, fill)
+    xp[:n] = x
+    blocks = xp.reshape(-1, p)
+    pre = ufunc.accumulate(blocks, axis=1).ravel()
+    suf = ufunc.accumulate(blocks[:, ::-1], axis=1)[:, ::-1].ravel()
+    return ufunc(suf[:n - p + 1], pre[p - 1:n])
+
+
+def window_max(x, p):
+    """max(x[k:k+p]) for every k (len n-p+1), O(N) for any p."""
+    return _block_extreme(x, p, np.maximum, -np.inf)
+
+
+def window_min(x, p):
+    """min(x[k:k+p]) for every k (len n-p+1), O(N) for any p."""
+    return _block_extreme(x, p, np.minimum, np.inf)
+
+
+def rolling_max(v, p):
+    """window_max aligned to the input: [i] covers v[i-p+1 : i+1], NaN before."""
+    v = _arr(v)
+    out = _nan(len(v))
+    if p > 0 and len(v) >= p:
+        out[p - 1:] = window_max(v, p)
+    return out
+
+
+def rolling_min(v, p):
+    """window_min aligned to the input: [i] covers v[i-p+1 : i+1], NaN before."""
+    v = _arr(v)
+    out = _nan(len(v))
+    if p > 0 and len(v) >= p:
+        out[p - 1:] = window_min(v, p)
+    return out
+
+
+def _window_reduce(x, p, fn):
+    """fn(window_view_chunk) for length-p windows, chunked to bound memory."""
+    n = len(x)
+    if p <= 0 or n < p:
+        return np.empty(0)
+    view = sliding_window_view(x, p)
+    rows = max(1, _WINDOW_CHUNK // p)
+    out  = np.empty(len(view))
+    for s in range(0, len(view), rows):
+        out[s:s + rows] = fn(view[s:s + rows], s)
+    return out
+
+
+def linear_scan(u, a, y0):
+    """
+    y[t] = a * y[t-1] + u[t], y[-1] = y0, for every t — the recurrence behind
+    EMA / RMA / Fisher.  Computed block-wise: within a block the response is
+    one matrix product, and only the block boundaries are carried serially.
+    """
+    m = len(u)
+    if m == 0:
+        return np.empty(0)
+    B  = _SCAN_BLOCK
+    nb = -(-m // B)
+    U  = np.zeros(nb * B)
+    U[:m] = u
+    U = U.reshape(nb, B)
+    idx  = np.arange(B)
+    expo = idx[:, None] - idx[None, :]
+    T    = np.where(expo >= 0, a ** np.clip(expo, 0, None), 0.0)
+    Z    = U @ T.T
+    decay = a ** (idx + 1.0)
+    aB    = a ** B
+    ends  = Z[:, -1].tolist()
+    starts = np.empty(nb)
+    y = y0
+    for b in range(nb):
+        starts[b] = y
+        y = aB * y + ends[b]
+    return (Z + starts[:, None] * decay).ravel()[:m]
+
+
+def _seeded_smooth(v, p, alpha):
+    """Shared body of _ema / _rma: SMA seed at p-1, then exponential smoothing."""
+    v = _arr(v)
+    n = len(v)
+    if n < p:
+        return _nan(n)
+    out = _nan(n)
+    seed = sum(v[:p].tolist()) / p
+    out[p - 1] = seed
+    out[p:] = linear_scan(v[p:] * alpha, 1 - alpha, seed)
+    return out
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# INDICATOR MATH LIBRARY  (NaN instead of None)
+# ══════════════════════════════════════════════════════════════════════════════
+
+def sma(v, p):
+    v = _arr(v)
+    out = _nan(len(v))
+    if len(v) >= p:
+        out[p - 1:] = window_sum(v, p) / p
+    return out
+
+
+def ema(v, p):
+    return _seeded_smooth(v, p, 2.0 / (p + 1))
+
+
+def rma(v, p):
+    return _seeded_smooth(v, p, 1.0 / p)
+
+
+def wma(v, p):
+    v = _arr(v)
+    out = _nan(len(v))
+    w = np.arange(1, p + 1, dtype=np.float64)
+    d = w.sum()
+    if len(v) >= p:
+        out[p - 1:] = _window_reduce(v, p, lambda win, s: win @ w) / d
+    return out
+
+
+def hma(v, p):
+    return hma_from(wma(v, max(2, p // 2)), wma(v, p), p)
+
+
+def hma_from(w1, w2, p):
+    n = len(w1)
+    sqr  = max(2, int(math.sqrt(p)))
+    diff = 2 * w1 - w2
+    valid = _compress(diff)
+    if len(valid) < sqr:
+        return _nan(n)
+    return _pad_front(wma(valid, sqr), n)
+
+
+def dema(v, p):
+    return dema_from(ema(v, p), p)
+
+
+def dema_from(e1, p):
+    n = len(e1)
+    val = _compress(e1)
+    if len(val) < p:
+        return _nan(n)
+    e2 = _pad_front(ema(val, p), n)
+    return 2 * e1 - e2
+
+
+def tema(v, p):
+    return tema_from(ema(v, p), p)
+
+
+def tema_from(e1, p):
+    n = len(e1)
+    v1 = _compress(e1)
+    if len(v1) < p:
+        return _nan(n)
+    e2r = ema(v1, p)
+    v2 = _compress(e2r)
+    if len(v2) < p:
+        return _nan(n)
+    e3r = ema(v2, p)
+    n3 = len(e3r)
+    pad1 = n - n3
+    pad2 = len(v1) - n3
+    a = e1[pad1:]
+    b = e2r[pad2:pad2 + n3]
+    ok = _truthy(a) & _truthy(b) & _truthy(e3r)
+    out = _nan(n)
+    out[pad1:] = np.where(ok, 3 * a - 3 * b + e3r, np.nan)
+    return out
+
+
+def zlema(v, p):
+    v = _arr(v)
+    lag = max(1, (p - 1) // 2)
+    adjusted = v.copy()
+    adjusted[lag:] = v[lag:] + (v[lag:] - v[:-lag])
+    return ema(adjusted, p)
+
+
+def mcginley(v, p):
+    vals = _arr(v).tolist()
+    n = len(vals)
+    out = _nan(n)
+    if n < p:
+        return out
+    prev = vals[p - 1]
+    out[p - 1] = prev
+    for i in range(p, n):
+        x = vals[i]
+        prev = x if prev == 0 else prev + (x - prev) / (p * (x / prev) ** 4)
+        out[i] = prev
+    return out
+
+
+def rsi(c, p):
+    c = _arr(c)
+    n = len(c)
+    out = _nan(n)
+    if n <= p:
+        return out
+    d = np.diff(c)
+    g = np.maximum(d, 0.0)
+    lo = np.maximum(-d, 0.0)
+    ag0 = sum(g[:p].tolist()) / p
+    al0 = sum(lo[:p].tolist()) / p
+    a = (p - 1) / p
+    ag = np.concatenate(([ag0], linear_scan(g[p:] / p, a, ag0)))
+    al = np.concatenate(([al0], linear_scan(lo[p:] / p, a, al0)))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        out[p:] = np.where(al == 0, 100.0, 100 - 100 / (1 + ag / al))
+    return out
+
+
+def macd(c, fast, slow, sig):
+    return macd_from(ema(c, fast), ema(c, slow), sig)
+
+
+def macd_from(ef, es, sig):
+    n = len(ef)
+    ml = np.where(_truthy(ef) & _truthy(es), ef - es, np.nan)
+    val = _compress(ml)
+    if len(val) < sig:
+        return ml, _nan(n), _nan(n)
+    sg = _pad_front(ema(val, sig), n)
+    return ml, sg, ml - sg
+
+
+def stoch(hi, lo, c, kp, ks=3, ds=3):
+    return stoch_from(rolling_max(hi, kp), rolling_min(lo, kp), c, kp, ks, ds)
+
+
+def stoch_from(hh, ll, c, kp, ks=3, ds=3):
+    c = _arr(c)
+    rng = hh - ll
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rk = np.where(rng == 0, 50.0, 100 * (c - ll) / rng)
+    sk = _smooth_from(rk, ks, kp + ks - 2)
+    sd = _smooth_from(sk, ds, kp + ks + ds - 3)
+    return sk, sd
+
+
+def _smooth_from(x, p, first):
+    """Mean of the last p values for i >= first (the windows there are full)."""
+    n = len(x)
+    out = _nan(n)
+    if first >= n:
+        return out
+    lo = first - p + 1
+    out[first:] = window_sum(x[lo:], p) / p
+    return out
+
+
+def cci(hi, lo, c, p):
+    hi, lo, c = _arr(hi), _arr(lo), _arr(c)
+    n = len(c)
+    out = _nan(n)
+    if n < p:
+        return out
+    tp = (hi + lo + c) / 3
+    mean = window_sum(tp, p) / p
+    mad = _window_reduce(
+        tp, p, lambda win, s: np.abs(win - mean[s:s + len(win), None]).sum(axis=1)) / p
+    with np.errstate(divide='ignore', invalid='ignore'):
+        out[p - 1:] = np.where(mad != 0, (tp[p - 1:] - mean) / (0.015 * mad), 0.0)
+    return out
+
+
+def williams_r(hi, lo, c, p):
+    return williams_r_from(rolling_max(hi, p), rolling_min(lo, p), c)
+
+
+def williams_r_from(hh, ll, c):
+    # NaN != NaN, so bars without a full window stay NaN
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(hh != ll, -100 * (hh - _arr(c)) / (hh - ll), -50.0)
+
+
+def roc(c, p):
+    c = _arr(c)
+    out = _nan(len(c))
+    if len(c) <= p:
+        return out
+    prev = c[:-p]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        out[p:] = np.where(prev != 0, (c[p:] - prev) / prev * 100, 0.0)
+    return out
+
+
+def mfi(hi, lo, c, vol, p):
+    hi, lo, c, vol = _arr(hi), _arr(lo), _arr(c), _arr(vol)
+    n = len(c)
+    out = _nan(n)
+    if n <= p:
+        return out
+    tp = (hi + lo + c) / 3
+    mf = tp * vol
+    up = np.zeros(n, dtype=bool)
+    up[1:] = tp[1:] >= tp[:-1]
+    dn = np.zeros(n, dtype=bool)
+    dn[1:] = tp[1:] < tp[:-1]
+    # the list code also tests j=0 against tp[-1]; windows start at i-p+1 >= 1
+    pos = window_sum(np.where(up, mf, 0.0), p)[1:]
+    neg = window_sum(np.where(dn, mf, 0.0), p)[1:]
+    neg_nz = window_count(dn & (mf != 0), p)[1:]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        out[p:] = np.where(neg_nz == 0, 100.0, 100 - 100 / (1 + pos / neg))
+    return out
+
+
+def trix(c, p):
+    return trix_from(ema(c, p), p)
+
+
+def trix_from(e1, p):
+    n = len(e1)
+    v1 = _compress(e1)
+    if len(v1) < p:
+        return _nan(n)
+    v2 = _compress(ema(v1, p))
+    if len(v2) < p:
+        return _nan(n)
+    e3 = ema(v2, p)
+    prev = np.concatenate(([np.nan], e3[:-1]))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        pct = np.where(_truthy(prev), (e3 - prev) / prev * 100, 0.0)
+    return _pad_front(pct, n)
+
+
+def demarker(hi, lo, c, p):
+    hi, lo = _arr(hi), _arr(lo)
+    n = len(hi)
+    dm_hi = np.zeros(n)
+    dm_lo = np.zeros(n)
+    dm_hi[1:] = np.maximum(hi[1:] - hi[:-1], 0)
+    dm_lo[1:] = np.maximum(lo[:-1] - lo[1:], 0)
+    out = _nan(n)
+    if n < p:
+        return out
+    sh = window_sum(dm_hi, p, nonneg_zero=True) / p
+    sl = window_sum(dm_lo, p, nonneg_zero=True) / p
+    tot = sh + sl
+    with np.errstate(divide='ignore', invalid='ignore'):
+        out[p - 1:] = np.where(tot == 0, 0.5, sh / tot)
+    return out
+
+
+def ultimate_osc(hi, lo, c, p1, p2, p3):
+    hi, lo, c = _arr(hi), _arr(lo), _arr(c)
+    n = len(c)
+    pc = c[:-1]
+    tl = np.minimum(lo[1:], pc)
+    bp = c[1:] - tl
+    tr = np.maximum(hi[1:], pc) - tl
+    M = max(p1, p2, p3)
+    out = _nan(n)
+    m = len(bp)
+    if m < M:
+        return out
+
+    def ratio(p):
+        # windows ending at i = M-1 .. m-1
+        s_bp = window_sum(bp, p)[M - p:]
+        s_tr = window_sum(tr, p, nonneg_zero=True)[M - p:]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(s_tr != 0, s_bp / s_tr, 0.0)
+
+    vals = 100 * (4 * ratio(p1) + 2 * ratio(p2) + ratio(p3)) / 7
+    # list version places bp-index i at output index i+2 (one-bar shift)
+    vals = vals[:max(0, n - (M + 1))]
+    out[M + 1:M + 1 + len(vals)] = vals
+    return out
+
+
+def median_price(hi, lo):
+    return (_arr(hi) + _arr(lo)) / 2
+
+
+def awesome_osc(hi, lo):
+    mid = median_price(hi, lo)
+    return awesome_osc_from(sma(mid, 5), sma(mid, 34))
+
+
+def awesome_osc_from(s5, s34):
+    return np.where(_truthy(s5) & _truthy(s34), s5 - s34, np.nan)
+
+
+def elder_ray(c, p):
+    return elder_ray_from(c, ema(c, p))
+
+
+def elder_ray_from(c, ma):
+    bull = c - ma
+    return bull, bull.copy()
+
+
+def fisher(hi, lo, p):
+    return fisher_from(hi, rolling_max(hi, p), rolling_min(lo, p))
+
+
+def fisher_from(hi, hh, ll):
+    hi = _arr(hi)
+    out = _nan(len(hi))
+    have = np.flatnonzero(~np.isnan(hh))
+    if not len(have):
+        return out
+    s = have[0]
+    h, l = hh[s:], ll[s:]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        val = np.where(h != l, 2 * (hi[s:] - l) / (h - l) - 1, 0.0)
+    val = np.clip(val, -0.999, 0.999)
+    u = 0.5 * np.log((1 + val) / (1 - val))
+    out[s:] = linear_scan(u, 0.5, 0.0)
+    return out
+
+
+def vortex(hi, lo, c, p):
+    hi, lo, c = _arr(hi), _arr(lo), _arr(c)
+    n = len(c)
+    vm_p = np.zeros(n)
+    vm_m = np.zeros(n)
+    tr = np.zeros(n)
+    vm_p[1:] = np.abs(hi[1:] - lo[:-1])
+    vm_m[1:] = np.abs(lo[1:] - hi[:-1])
+    tr[1:] = np.maximum.reduce([hi[1:] - lo[1:], np.abs(hi[1:] - c[:-1]), np.abs(lo[1:] - c[:-1])])
+    vip, vim = _nan(n), _nan(n)
+    if n < p:
+        return vip, vim
+    s_tr = window_sum(tr, p, nonneg_zero=True)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        vip[p - 1:] = np.where(s_tr != 0, window_sum(vm_p, p) / s_tr, np.nan)
+        vim[p - 1:] = np.where(s_tr != 0, window_sum(vm_m, p) / s_tr, np.nan)
+    return vip, vim
+
+
+def tsi(c, r_p, s_p):
+    c = _arr(c)
+    n = len(c)
+    mom = np.zeros(n)
+    mom[1:] = np.diff(c)
+
+    def dsmooth(v):
+        valid = _compress(ema(v, r_p))
+        if not len(valid):
+            return _nan(n)
+        return _pad_front(ema(valid, s_p), n)
+
+    m, a = dsmooth(mom), dsmooth(np.abs(mom))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(~np.isnan(m) & _truthy(a), 100 * m / a, np.nan)
+
+
+def _window_std(c, p, mean):
+    return np.sqrt(_window_reduce(
+        c, p, lambda win, s: ((win - mean[s:s + len(win), None]) ** 2).sum(axis=1)) / p)
+
+
+def bollinger(c, p, m=2.0):
+    return bollinger_from(c, sma(c, p), p, m)
+
+
+def bollinger_from(c, mid, p, m):
+    c = _arr(c)
+    upper, lower = _nan(len(c)), _nan(len(c))
+    if len(c) >= p:
+        std = _window_std(c, p, mid[p - 1:])
+        upper[p - 1:] = mid[p - 1:] + m * std
+        lower[p - 1:] = mid[p - 1:] - m * std
+    return upper, mid, lower
+
+
+def keltner(hi, lo, c, p, mult=2.0):
+    return keltner_from(ema(c, p), atr(hi, lo, c, p), mult)
+
+
+def keltner_from(ema_c, a, mult):
+    ok = _truthy(ema_c) & _truthy(a)
+    upper = np.where(ok, ema_c + mult * a, np.nan)
+    lower = np.where(ok, ema_c - mult * a, np.nan)
+    return upper, ema_c, lower
+
+
+def _true_range(hi, lo, c):
+    return np.maximum.reduce([hi[1:] - lo[1:], np.abs(hi[1:] - c[:-1]), np.abs(lo[1:] - c[:-1])])
+
+
+def atr(hi, lo, c, p):
+    hi, lo, c = _arr(hi), _arr(lo), _arr(c)
+    n = len(c)
+    out = _nan(n)
+    tr = _true_range(hi, lo, c)
+    if len(tr) < p:
+        return out
+    seed = sum(tr[:p].tolist()) / p
+    out[p] = seed
+    out[p + 1:] = linear_scan(tr[p:] / p, (p - 1) / p, seed)
+    return out
+
+
+def natr(hi, lo, c, p):
+    return natr_from(atr(hi, lo, c, p), c)
+
+
+def natr_from(a, c):
+    c = _arr(c)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(_truthy(a) & (c != 0), a / c * 100, np.nan)
+
+
+def adx(hi, lo, c, p):
+    return adx_from(hi, lo, atr(hi, lo, c, p), p)
+
+
+def adx_from(hi, lo, a, p):
+    hi, lo = _arr(hi), _arr(lo)
+    n = len(hi)
+    up = np.zeros(n)
+    dn = np.zeros(n)
+    du = hi[1:] - hi[:-1]
+    dd = lo[:-1] - lo[1:]
+    up[1:] = np.where(du > dd, np.maximum(du, 0), 0)
+    dn[1:] = np.where(dd > du, np.maximum(dd, 0), 0)
+    ok = _truthy(a)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rp, rm = rma(up, p), rma(dn, p)
+        di_p = np.where(~np.isnan(rp) & ok, 100 * rp / a, np.nan)
+        di_m = np.where(~np.isnan(rm) & ok, 100 * rm / a, np.nan)
+        s = di_p + di_m
+        dx = np.where(_truthy(di_p) & _truthy(di_m) & _truthy(s),
+                      np.abs(di_p - di_m) / s * 100, np.nan)
+    valid = _compress(dx)
+    if len(valid) < p:
+        return _nan(n), di_p, di_m
+    return _pad_front(rma(valid, p), n), di_p, di_m
+
+
+def chaikin_mf(hi, lo, c, vol, p):
+    hi, lo, c, vol = _arr(hi), _arr(lo), _arr(c), _arr(vol)
+    n = len(c)
+    out = _nan(n)
+    rng = hi - lo
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mfm = np.where(rng != 0, (c - lo - (hi - c)) / rng, 0.0)
+    if n < p:
+        return out
+    sv = window_sum(vol, p, nonneg_zero=True)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        out[p - 1:] = np.where(sv != 0, window_sum(mfm * vol, p) / sv, 0.0)
+    return out
+
+
+def obv(c, vol):
+    c, vol = _arr(c), _arr(vol)
+    out = np.zeros(len(c))
+    if len(c) > 1:
+        step = np.sign(c[1:] - c[:-1]) * vol[1:]
+        out[1:] = np.cumsum(step)
+    return out
+
+
+def obv_ma(c, vol, p):
+    o = obv(c, vol)
+    return o, ema(o, p)
+
+
+def pair(a, b):
+    return a, b
+
+
+def choppiness(hi, lo, c, p):
+    return choppiness_from(hi, lo, c, rolling_max(hi, p), rolling_min(lo, p), p)
+
+
+def choppiness_from(hi, lo, c, hh, ll, p):
+    hi, lo, c = _arr(hi), _arr(lo), _arr(c)
+    n = len(c)
+    out = _nan(n)
+    tr1 = np.empty(n)
+    if n:
+        tr1[0] = max(hi[0] - lo[0], 0, 0)
+        tr1[1:] = _true_range(hi, lo, c)
+    if n < p:
+        return out
+    tr_sum = window_sum(tr1, p, nonneg_zero=True)
+    rng = hh[p - 1:] - ll[p - 1:]
+    ok = (rng != 0) & (tr_sum != 0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        out[p - 1:] = np.where(ok, 100 * np.log10(tr_sum / rng) / math.log10(p), np.nan)
+    return out
+
+
+def stdev(c, p):
+    c = _arr(c)
+    out = _nan(len(c))
+    if len(c) >= p:
+        out[p - 1:] = _window_std(c, p, window_sum(c, p) / p)
+    return out
+
+
+def donchian(hi, lo, p):
+    return rolling_max(hi, p), rolling_min(lo, p)
+
+
+def parabolic_sar(hi, lo, c, af0=0.02, af_step=0.02, af_max=0.2):
+    hi, lo, c = _arr(hi).tolist(), _arr(lo).tolist(), _arr(c).tolist()
+    n = len(c)
+    sar = _nan(n)
+    if n < 2:
+        return sar
+    bull = c[1] > c[0]
+    ep = hi[1] if bull else lo[1]
+    af = af0
+    ns = lo[0] if bull else hi[0]
+    sar[1] = ns
+    for i in range(2, n):
+        p = ns
+        ns = p + af * (ep - p)
+        if bull:
+            ns = min(ns, lo[i - 1], lo[i - 2] if i > 2 else lo[i - 1])
+            if lo[i] < ns:
+                bull, ns, ep, af = False, ep, lo[i], af0
+            elif hi[i] > ep:
+                ep = hi[i]; af = min(af + af_step, af_max)
+        else:
+            ns = max(ns, hi[i - 1], hi[i - 2] if i > 2 else hi[i - 1])
+            if hi[i] > ns:
+                bull, ns, ep, af = True, ep, hi[i], af0
+            elif lo[i] < ep:
+                ep = lo[i]; af = min(af + af_step, af_max)
+        sar[i] = ns
+    return sar
+
+
+def supertrend(hi, lo, c, p, mult):
+    return supertrend_from(hi, lo, c, atr(hi, lo, c, p), mult)
+
+
+def supertrend_from(hi, lo, c, a, mult):
+    hi, lo, c = _arr(hi), _arr(lo), _arr(c)
+    n = len(c)
+    ok = _truthy(a)
+    mid = (hi + lo) / 2
+    ub = np.where(ok, mid + mult * a, np.nan)
+    lb = np.where(ok, mid - mult * a, np.nan)
+    ok[0] = False           # the list loop starts at 1
+    # Bands ratchet (lower only rises, upper only falls) within each run of
+    # consecutive valid bars; a missing bar restarts the run.
+    starts = np.flatnonzero(ok & ~np.concatenate(([False], ok[:-1])))
+    ends   = np.flatnonzero(ok & ~np.concatenate((ok[1:], [False]))) + 1
+    for s, e in zip(starts, ends):
+        lb[s:e] = np.maximum.accumulate(lb[s:e])
+        ub[s:e] = np.minimum.accumulate(ub[s:e])
+    trend, direction = _nan(n), _nan(n)
+    cl, ubl, lbl, okl = c.tolist(), ub.tolist(), lb.tolist(), ok.tolist()
+    prev = None
+    for i in range(1, n):
+        if not okl[i]:
+            prev = None
+            continue
+        if prev is None:
+            d = 1 if cl[i] <= ubl[i] else -1
+        elif prev == 1:
+            d = -1 if cl[i] > ubl[i] else 1
+        else:
+            d = 1 if cl[i] < lbl[i] else -1
+        direction[i] = d
+        trend[i] = lbl[i] if d == -1 else ubl[i]
+        prev = d
+    return trend, direction
+
+
+def ichimoku(hi, lo, tenkan_p, kijun_p):
+    return ichimoku_from(rolling_max(hi, tenkan_p), rolling_min(lo, tenkan_p),
+                         rolling_max(hi, kijun_p), rolling_min(lo, kijun_p))
+
+
+def ichimoku_from(th, tl, kh, kl):
+    return (th + tl) / 2, (kh + kl) / 2
+
+
+def squeeze(hi, lo, c, p, boll_m=2.0, kelt_m=1.5):
+    return squeeze_from(c, bollinger(c, p, boll_m), keltner(hi, lo, c, p, kelt_m))
+
+
+def squeeze_from(c, boll, kelt):
+    c = _arr(c)
+    bbu, _, bbl = boll
+    kcu, _, kcl = kelt
+    have = ~(np.isnan(bbu) | np.isnan(bbl) | np.isnan(kcu) | np.isnan(kcl))
+    sq = np.where(have, ((bbu < kcu) & (bbl > kcl)).astype(np.float64), np.nan)
+    mom = c - (kcu + kcl) / 2
+    return sq, mom
+
+
+def pivot_points(hi, lo, c):
+    hi, lo, c = _arr(hi), _arr(lo), _arr(c)
+    out = _nan(len(c))
+    out[1:] = (hi[:-1] + lo[:-1] + c[:-1]) / 3
+    return out
+
+
+def williams_fractal(hi, lo, p=2):
+    hi, lo = _arr(hi), _arr(lo)
+    n = len(hi)
+    bull = np.zeros(n, dtype=bool)
+    bear = np.zeros(n, dtype=bool)
+    if n <= 2 * p:
+        return bull, bear
+    core = slice(p, n - p)
+    b_ok = np.ones(n - 2 * p, dtype=bool)
+    r_ok = np.ones(n - 2 * p, dtype=bool)
+    for j in range(1, p + 1):
+        b_ok &= (lo[core] < lo[p - j:n - p - j]) & (lo[core] < lo[p + j:n - p + j])
+        r_ok &= (hi[core] > hi[p - j:n - p - j]) & (hi[core] > hi[p + j:n - p + j])
+    bull[core] = b_ok
+    bear[core] = r_ok
+    return bull, bear
+
+
+# Pure-Python function name (strategy_generator) → NumPy kernel
+KERNELS = {
+    '_sma': sma, '_ema': ema, '_wma': wma, '_rma': rma, '_hma': hma,
+    '_dema': dema, '_tema': tema, '_zlema': zlema, '_mcginley': mcginley,
+    '_rsi': rsi, '_macd': macd, '_stoch': stoch, '_cci': cci,
+    '_williams_r': williams_r, '_roc': roc, '_mfi': mfi, '_trix': trix,
+    '_demarker': demarker, '_ultimate_osc': ultimate_osc,
+    '_awesome_osc': awesome_osc, '_elder_ray': elder_ray, '_fisher': fisher,
+    '_vortex': vortex, '_tsi': tsi, '_bollinger': bollinger,
+    '_keltner': keltner, '_atr': atr, '_natr': natr, '_adx': adx,
+    '_chaikin_mf': chaikin_mf, '_obv': obv, '_obv_ma': obv_ma,
+    '_choppiness': choppiness, '_stdev': stdev, '_donchian': donchian,
+    '_parabolic_sar': parabolic_sar, '_supertrend': supertrend,
+    '_ichimoku': ichimoku, '_squeeze': squeeze,
+    '_pivot_points': pivot_points, '_williams_fractal': williams_fractal,
+    '_rolling_max': rolling_max, '_rolling_min': rolling_min,
+    # combine steps of series_dag composites
+    '_pair': pair, '_median_price': median_price, '_hma_from': hma_from,
+    '_dema_from': dema_from, '_tema_from': tema_from, '_trix_from': trix_from,
+    '_macd_from': macd_from, '_stoch_from': stoch_from,
+    '_williams_r_from': williams_r_from, '_fisher_from': fisher_from,
+    '_ichimoku_from': ichimoku_from, '_choppiness_from': choppiness_from,
+    '_awesome_osc_from': awesome_osc_from, '_elder_ray_from': elder_ray_from,
+    '_bollinger_from': bollinger_from, '_keltner_from': keltner_from,
+    '_natr_from': natr_from, '_adx_from': adx_from,
+    '_supertrend_from': supertrend_from, '_squeeze_from': squeeze_from,
+}
+NAMES = {kernel: name for name, kernel in KERNELS.items()}
+
+
+def to_py(value):
+    """Convert kernel output to the list-of-(float|None) shape of the list code."""
+    if isinstance(value, tuple):
+        return tuple(to_py(v) for v in value)
+    if value.dtype == bool:
+        return value.tolist()
+    return [None if x != x else x for x in value.tolist()]
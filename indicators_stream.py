@@ -0,0 +1,1094 @@
+"""
+Streaming Indicator Engine
+==========================
+Incremental versions of the INDICATOR MATH LIBRARY in strategy_generator.py
+for live trading.  An IndicatorStream keeps a bounded candle history plus one
+state object per indicator series; each closed candle updates every state in
+O(1) (amortised) instead of recomputing the whole history.
+
+The candle that is still forming (IQ Option `candle-generated` updates) is
+never committed: its values are evaluated with `peek`, which reads the
+committed state without changing it, so any number of revisions of the same
+candle cost O(1) each and leave no trace.  When a candle with a newer `time`
+arrives the forming one is committed and the new one starts forming.
+
+Series are created lazily the first time get_signal_at asks for them and are
+seeded from the retained history, so IndicatorStream plugs straight into the
+existing signal rules:
+
+    stream = IndicatorStream(candles)          # last candle = forming one
+    stream.update(candle)                      # revision or next candle
+    stream.direction(strategy)                 # +1 / -1 / 0 on last closed bar
+    stream.direction(strategy, forming=True)   # tentative, on the forming bar
+
+Numbers follow the list versions step by step (same seeds, same recurrences,
+same re-anchoring of window sums), so signals match get_signal_at on the same
+candles.  Two-pass window statistics (CCI mean deviation, standard deviation)
+stay O(period) per bar to keep that equality.
+"""
+
+import math
+from collections import deque
+
+from strategy_generator import get_signal_at
+
+_COLUMNS = ('opens', 'highs', 'lows', 'closes', 'volumes')
+_TAIL = 8                    # committed outputs kept per series (rules read i, i-1)
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# PRIMITIVES
+# ══════════════════════════════════════════════════════════════════════════════
+# step(x, commit) returns the value for the next bar; with commit=False the
+# state is left untouched (used for the forming candle).
+
+class _Ema:
+    """_ema / _rma: SMA seed after p values, then y = y*(1-a) + x*a."""
+
+    def __init__(self, p, alpha):
+        self.p, self.a = p, alpha
+        self.n, self.s, self.y = 0, 0, None
+
+    def step(self, x, commit=True):
+        if self.y is not None:
+            y = self.y * (1 - self.a) + x * self.a
+            if commit:
+                self.y = y
+            return y
+        n, s = self.n + 1, self.s + x
+        y = s / self.p if n == self.p else None
+        if commit:
+            self.n, self.s, self.y = n, s, y
+        return y
+
+
+def _ema(p):
+    return _Ema(p, 2.0 / (p + 1))
+
+
+def _rma(p):
+    return _Ema(p, 1.0 / p)
+
+
+class _WindowSum:
+    """_rolling_sum: running sum, exact sum() every p bars, all-zero → 0.0."""
+
+    def __init__(self, p):
+        self.p = p
+        self.win = deque()        # last p inputs
+        self.n = self.nz = 0
+        self.s = 0.0
+
+    def step(self, x, commit=True):
+        p, i = self.p, self.n
+        nz = self.nz + (1 if x else 0)
+        old = self.win[0] if len(self.win) == p else None
+        if old:
+            nz -= 1
+        s = self.s
+        out = None
+        if p > 0 and i >= p - 1:
+            start = i - p + 1
+            if start % p == 0:
+                s = sum(list(self.win)[len(self.win) - (p - 1):] + [x] if p > 1 else [x])
+            else:
+                s += x - old
+            out = s if nz else 0.0
+        if commit:
+            self.win.append(x)
+            if len(self.win) > p:
+                self.win.popleft()
+            self.n, self.nz, self.s = i + 1, nz, s
+        return out
+
+
+class _WindowWSum:
+    """_rolling_wsum: weights 1..p, same recurrence and re-anchoring."""
+
+    def __init__(self, p):
+        self.p = p
+        self.sums = _WindowSum(p)
+        self.win = deque()
+        self.n = 0
+        self.w = 0.0
+        self.last_sum = None
+
+    def step(self, x, commit=True):
+        p, i = self.p, self.n
+        s = self.sums.step(x, commit)
+        w, out = self.w, None
+        if p > 0 and i >= p - 1:
+            if (i - p + 1) % p == 0:
+                vals = list(self.win)[len(self.win) - (p - 1):] + [x] if p > 1 else [x]
+                w = sum((j + 1) * vals[j] for j in range(p))
+            else:
+                w += p * x - self.last_sum
+            out = w
+        if commit:
+            self.win.append(x)
+            if len(self.win) > p:
+                self.win.popleft()
+            self.n, self.w, self.last_sum = i + 1, w, s
+        return out
+
+
+class _WindowExtreme:
+    """Monotonic deque max (sign=1) or min (sign=-1) over the last p inputs."""
+
+    def __init__(self, p, sign):
+        self.p, self.sign = p, sign
+        self.dq = deque()         # (index, value), values monotonic
+        self.n = 0
+
+    def _better(self, a, b):
+        return a if (a - b) * self.sign >= 0 else b
+
+    def step(self, x, commit=True):
+        p, i, dq = self.p, self.n, self.dq
+        if not commit:
+            if i < p - 1:
+                return None
+            best = x
+            for k in range(min(2, len(dq))):
+                if dq[k][0] > i - p:
+                    best = self._better(dq[k][1], x)
+                    break
+            return best
+        sign = self.sign
+        while dq and (x - dq[-1][1]) * sign >= 0:
+            dq.pop()
+        dq.append((i, x))
+        if dq[0][0] <= i - p:
+            dq.popleft()
+        self.n = i + 1
+        return dq[0][1] if i >= p - 1 else None
+
+
+class _Lag:
+    """x from k steps ago (None until available)."""
+
+    def __init__(self, k):
+        self.buf = deque(maxlen=k)
+        self.k = k
+
+    def step(self, x, commit=True):
+        out = self.buf[0] if len(self.buf) == self.k else None
+        if commit:
+            self.buf.append(x)
+        return out
+
+
+class _Window:
+    """The last p inputs as a list (None until full) — for two-pass stats."""
+
+    def __init__(self, p):
+        self.p = p
+        self.buf = deque(maxlen=p)
+
+    def step(self, x, commit=True):
+        if commit:
+            self.buf.append(x)
+            w = list(self.buf)
+        else:
+            w = list(self.buf)[1:] + [x] if len(self.buf) == self.p else list(self.buf) + [x]
+        return w if len(w) == self.p else None
+
+
+class _Prev:
+    """Previous bar's inputs (None on the first bar)."""
+
+    def __init__(self):
+        self.v = None
+
+    def step(self, x, commit=True):
+        out = self.v
+        if commit:
+            self.v = x
+        return out
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# SERIES STATES  (one per INDICATOR MATH LIBRARY function)
+# ══════════════════════════════════════════════════════════════════════════════
+# step(*column_values, commit) → the function's value at this bar (a tuple
+# for multi-series functions).  `delay` > 0 means the value belongs to the bar
+# `delay` steps back (fractals need later bars to confirm).
+
+class _Node:
+    outputs = 1
+    delay = 0
+    default = None
+
+
+class _Sma(_Node):
+    def __init__(self, p):
+        self.p, self.sum = p, _WindowSum(p)
+
+    def step(self, x, commit=True):
+        s = self.sum.step(x, commit)
+        return None if s is None else s / self.p
+
+
+class _Wma(_Node):
+    def __init__(self, p):
+        self.d, self.ws = p * (p + 1) / 2, _WindowWSum(p)
+
+    def step(self, x, commit=True):
+        w = self.ws.step(x, commit)
+        return None if w is None else w / self.d
+
+
+class _EmaNode(_Node):
+    def __init__(self, p):
+        self.e = _ema(p)
+
+    def step(self, x, commit=True):
+        return self.e.step(x, commit)
+
+
+class _Hma(_Node):
+    def __init__(self, p):
+        self.w1 = _Wma(max(2, p // 2))
+        self.w2 = _Wma(p)
+        self.w3 = _Wma(max(2, int(math.sqrt(p))))
+
+    def step(self, x, commit=True):
+        a, b = self.w1.step(x, commit), self.w2.step(x, commit)
+        if a is None or b is None:
+            return None
+        return self.w3.step(2 * a - b, commit)
+
+
+class _Dema(_Node):
+    def __init__(self, p):
+        self.e1, self.e2 = _ema(p), _ema(p)
+
+    def step(self, x, commit=True):
+        a = self.e1.step(x, commit)
+        if a is None:
+            return None
+        b = self.e2.step(a, commit)
+        return None if b is None else 2 * a - b
+
+
+class _Tema(_Node):
+    def __init__(self, p):
+        self.e1, self.e2, self.e3 = _ema(p), _ema(p), _ema(p)
+
+    def step(self, x, commit=True):
+        a = self.e1.step(x, commit)
+        if a is None:
+            return None
+        b = self.e2.step(a, commit)
+        if b is None:
+            return None
+        c = self.e3.step(b, commit)
+        return 3*a - 3*b + c if (a and b and c) else None
+
+
+class _Zlema(_Node):
+    def __init__(self, p):
+        self.lag, self.e = _Lag(max(1, (p - 1) // 2)), _ema(p)
+
+    def step(self, x, commit=True):
+        old = self.lag.step(x, commit)
+        return self.e.step(x if old is None else x + (x - old), commit)
+
+
+class _McGinley(_Node):
+    def __init__(self, p):
+        self.p, self.n, self.y = p, 0, None
+
+    def step(self, x, commit=True):
+        p, n, prev = self.p, self.n, self.y
+        if n < p - 1:
+            y = None
+        elif n == p - 1 or prev is None or prev == 0:
+            y = x
+        else:
+            y = prev + (x - prev) / (p * (x / prev) ** 4)
+        if commit:
+            self.n, self.y = n + 1, y
+        return y
+
+
+class _Rsi(_Node):
+    def __init__(self, p):
+        self.p = p
+        self.prev = _Prev()
+        self.k = 0                      # price changes seen
+        self.sg = self.sl = 0
+        self.ag = self.al = None
+
+    def step(self, c, commit=True):
+        p = self.p
+        pc = self.prev.step(c, commit)
+        if pc is None:
+            return None
+        d = c - pc
+        g, lo = max(d, 0.0), max(-d, 0.0)
+        k = self.k + 1
+        if self.ag is None:
+            sg, sl = self.sg + g, self.sl + lo
+            ag = al = None
+            if k == p:
+                ag, al = sg / p, sl / p
+            if commit:
+                self.k, self.sg, self.sl, self.ag, self.al = k, sg, sl, ag, al
+        else:
+            ag = (self.ag * (p - 1) + g) / p
+            al = (self.al * (p - 1) + lo) / p
+            if commit:
+                self.k, self.ag, self.al = k, ag, al
+        if ag is None:
+            return None
+        return 100.0 if al == 0 else 100 - 100 / (1 + ag / al)
+
+
+class _Macd(_Node):
+    outputs = 3
+
+    def __init__(self, fast, slow, sig):
+        self.ef, self.es, self.esig = _ema(fast), _ema(slow), _ema(sig)
+
+    def step(self, c, commit=True):
+        f, s = self.ef.step(c, commit), self.es.step(c, commit)
+        if not (f and s):
+            return None, None, None
+        ml = f - s
+        sg = self.esig.step(ml, commit)
+        return ml, sg, (None if sg is None else ml - sg)
+
+
+class _Stoch(_Node):
+    outputs = 2
+
+    def __init__(self, kp, ks=3, ds=3):
+        self.ks, self.ds = ks, ds
+        self.hh, self.ll = _WindowExtreme(kp, 1), _WindowExtreme(kp, -1)
+        self.sk_sum, self.sd_sum = _WindowSum(ks), _WindowSum(ds)
+
+    def step(self, hi, lo, c, commit=True):
+        h, l = self.hh.step(hi, commit), self.ll.step(lo, commit)
+        if h is None:
+            return None, None
+        rk = 50.0 if h == l else 100*(c-l)/(h-l)
+        s = self.sk_sum.step(rk, commit)
+        if s is None:
+            return None, None
+        sk = s / self.ks
+        s = self.sd_sum.step(sk, commit)
+        return sk, (None if s is None else s / self.ds)
+
+
+class _Cci(_Node):
+    def __init__(self, p):
+        self.p, self.win = p, _Window(p)
+
+    def step(self, hi, lo, c, commit=True):
+        tp = self.win.step((hi + lo + c) / 3, commit)
+        if tp is None:
+            return None
+        p = self.p
+        mean = sum(tp) / p
+        mad = sum(abs(x - mean) for x in tp) / p
+        return (tp[-1] - mean) / (0.015 * mad) if mad else 0.0
+
+
+class _WilliamsR(_Node):
+    def __init__(self, p):
+        self.hh, self.ll = _WindowExtreme(p, 1), _WindowExtreme(p, -1)
+
+    def step(self, hi, lo, c, commit=True):
+        h, l = self.hh.step(hi, commit), self.ll.step(lo, commit)
+        if h is None:
+            return None
+        return -100*(h-c)/(h-l) if h != l else -50.0
+
+
+class _Roc(_Node):
+    def __init__(self, p):
+        self.lag = _Lag(p)
+
+    def step(self, c, commit=True):
+        old = self.lag.step(c, commit)
+        if old is None:
+            return None
+        return (c - old) / old * 100 if old != 0 else 0.0
+
+
+class _Mfi(_Node):
+    def __init__(self, p):
+        self.p, self.n = p, 0
+        self.prev_tp = _Prev()
+        self.pos, self.neg = _WindowSum(p), _WindowSum(p)
+
+    def step(self, hi, lo, c, vol, commit=True):
+        tp = (hi + lo + c) / 3
+        mf = tp * vol
+        ptp = self.prev_tp.step(tp, commit)
+        up = ptp is not None and tp >= ptp
+        pos = self.pos.step(mf if up else 0.0, commit)
+        neg = self.neg.step(0.0 if up else mf, commit)
+        n = self.n
+        if commit:
+            self.n = n + 1
+        if n < self.p:
+            return None
+        return 100.0 if neg == 0 else 100 - 100/(1 + pos/neg)
+
+
+class _Trix(_Node):
+    def __init__(self, p):
+        self.e1, self.e2, self.e3 = _ema(p), _ema(p), _ema(p)
+        self.prev = None
+
+    def step(self, c, commit=True):
+        a = self.e1.step(c, commit)
+        if a is None:
+            return None
+        b = self.e2.step(a, commit)
+        if b is None:
+            return None
+        x, prev = self.e3.step(b, commit), self.prev
+        if commit:
+            self.prev = x
+        if prev is None or prev == 0:
+            return 0.0
+        return (x - prev) / prev * 100
+
+
+class _Demarker(_Node):
+    def __init__(self, p):
+        self.prev = _Prev()
+        self.s_hi, self.s_lo = _Sma(p), _Sma(p)
+
+    def step(self, hi, lo, c, commit=True):
+        prev = self.prev.step((hi, lo), commit)
+        dm_hi = max(hi - prev[0], 0) if prev else 0
+        dm_lo = max(prev[1] - lo, 0) if prev else 0
+        h, l = self.s_hi.step(dm_hi, commit), self.s_lo.step(dm_lo, commit)
+        if h is None or l is None:
+            return None
+        return 0.5 if h + l == 0 else h / (h + l)
+
+
+class _UltimateOsc(_Node):
+    def __init__(self, p1, p2, p3):
+        self.ps = (p1, p2, p3)
+        self.m = max(p1, p2, p3)
+        self.sums = {p: (_WindowSum(p), _WindowSum(p)) for p in set(self.ps)}
+        self.prev_c = _Prev()
+        self.k = 0                      # buying-pressure values seen
+        self.pending = None             # value published on the next bar
+
+    def step(self, hi, lo, c, commit=True):
+        out = self.pending
+        pc = self.prev_c.step(c, commit)
+        if pc is None:
+            return out
+        tl = min(lo, pc)
+        bp, tr = c - tl, max(hi, pc) - tl
+        ratios = {}
+        for p, (s_bp, s_tr) in self.sums.items():
+            a, b = s_bp.step(bp, commit), s_tr.step(tr, commit)
+            ratios[p] = (a / b if b else 0) if b is not None else None
+        if commit:
+            p1, p2, p3 = self.ps
+            self.pending = (100*(4*ratios[p1] + 2*ratios[p2] + ratios[p3])/7
+                            if self.k >= self.m - 1 else None)
+            self.k += 1
+        return out
+
+
+class _AwesomeOsc(_Node):
+    def __init__(self):
+        self.s5, self.s34 = _Sma(5), _Sma(34)
+
+    def step(self, hi, lo, commit=True):
+        mid = (hi + lo) / 2
+        a, b = self.s5.step(mid, commit), self.s34.step(mid, commit)
+        return a - b if (a and b) else None
+
+
+class _ElderRay(_Node):
+    outputs = 2
+
+    def __init__(self, p):
+        self.e = _ema(p)
+
+    def step(self, c, commit=True):
+        ma = self.e.step(c, commit)
+        v = None if ma is None else c - ma
+        return v, v
+
+
+class _Fisher(_Node):
+    def __init__(self, p):
+        self.hh, self.ll = _WindowExtreme(p, 1), _WindowExtreme(p, -1)
+        self.prev = 0.0
+
+    def step(self, hi, lo, commit=True):
+        h, l = self.hh.step(hi, commit), self.ll.step(lo, commit)
+        if h is None:
+            return None
+        val = 2*(hi - l)/(h - l) - 1 if h != l else 0
+        val = max(-0.999, min(0.999, val))
+        fish = 0.5*math.log((1+val)/(1-val)) + 0.5*self.prev
+        if commit:
+            self.prev = fish
+        return fish
+
+
+class _Vortex(_Node):
+    outputs = 2
+
+    def __init__(self, p):
+        self.prev = _Prev()
+        self.s_tr, self.s_vp, self.s_vm = _WindowSum(p), _WindowSum(p), _WindowSum(p)
+
+    def step(self, hi, lo, c, commit=True):
+        prev = self.prev.step((hi, lo, c), commit)
+        if prev is None:
+            vp = vm = 0
+            tr = 0.0
+        else:
+            ph, pl, pc = prev
+            vp, vm = abs(hi - pl), abs(lo - ph)
+            tr = max(hi - lo, abs(hi - pc), abs(lo - pc))
+        s_tr = self.s_tr.step(tr, commit)
+        a, b = self.s_vp.step(vp, commit), self.s_vm.step(vm, commit)
+        if s_tr is None or not s_tr:
+            return None, None
+        return a / s_tr, b / s_tr
+
+
+class _Tsi(_Node):
+    def __init__(self, r_p, s_p):
+        self.prev = _Prev()
+        self.m1, self.m2 = _ema(r_p), _ema(s_p)
+        self.a1, self.a2 = _ema(r_p), _ema(s_p)
+
+    @staticmethod
+    def _dsmooth(e1, e2, x, commit):
+        v = e1.step(x, commit)
+        return None if v is None else e2.step(v, commit)
+
+    def step(self, c, commit=True):
+        pc = self.prev.step(c, commit)
+        mom = 0.0 if pc is None else c - pc
+        m = self._dsmooth(self.m1, self.m2, mom, commit)
+        a = self._dsmooth(self.a1, self.a2, abs(mom), commit)
+        return 100*m/a if (m is not None and a) else None
+
+
+class _Bollinger(_Node):
+    outputs = 3
+
+    def __init__(self, p, m=2.0):
+        self.p, self.m = p, m
+        self.mid, self.win = _Sma(p), _Window(p)
+
+    def step(self, c, commit=True):
+        mean, w = self.mid.step(c, commit), self.win.step(c, commit)
+        if mean is None:
+            return None, None, None
+        std = math.sqrt(sum((x - mean)**2 for x in w) / self.p)
+        return mean + self.m*std, mean, mean - self.m*std
+
+
+class _Atr(_Node):
+    def __init__(self, p):
+        self.p = p
+        self.prev_c = _Prev()
+        self.k, self.s, self.av = 0, 0, None
+
+    def step(self, hi, lo, c, commit=True):
+        pc = self.prev_c.step(c, commit)
+        if pc is None:
+            return None
+        tr = max(hi - lo, abs(hi - pc), abs(lo - pc))
+        p = self.p
+        if self.av is not None:
+            av = (self.av*(p-1) + tr) / p
+            if commit:
+                self.av = av
+            return av
+        k, s = self.k + 1, self.s + tr
+        av = s / p if k == p else None
+        if commit:
+            self.k, self.s, self.av = k, s, av
+        return av
+
+
+class _Natr(_Node):
+    def __init__(self, p):
+        self.atr = _Atr(p)
+
+    def step(self, hi, lo, c, commit=True):
+        a = self.atr.step(hi, lo, c, commit)
+        return a / c * 100 if (a and c) else None
+
+
+class _Keltner(_Node):
+    outputs = 3
+
+    def __init__(self, p, mult=2.0):
+        self.mult = mult
+        self.e, self.atr = _ema(p), _Atr(p)
+
+    def step(self, hi, lo, c, commit=True):
+        e, a = self.e.step(c, commit), self.atr.step(hi, lo, c, commit)
+        if not (e and a):
+            return None, e, None
+        return e + self.mult*a, e, e - self.mult*a
+
+
+class _Adx(_Node):
+    outputs = 3
+
+    def __init__(self, p):
+        self.prev = _Prev()
+        self.rp, self.rm = _rma(p), _rma(p)
+        self.atr = _Atr(p)
+        self.adx = _rma(p)
+
+    def step(self, hi, lo, c, commit=True):
+        prev = self.prev.step((hi, lo), commit)
+        if prev is None:
+            dmp = dmm = 0
+        else:
+            up, down = hi - prev[0], prev[1] - lo
+            dmp = max(up, 0) if up > down else 0
+            dmm = max(down, 0) if down > up else 0
+        dp = self.rp.step(dmp if dmp else 0, commit)
+        dm = self.rm.step(dmm if dmm else 0, commit)
+        at = self.atr.step(hi, lo, c, commit)
+        di_p = 100*dp/at if (dp is not None and at) else None
+        di_m = 100*dm/at if (dm is not None and at) else None
+        adx = None
+        if di_p and di_m and di_p + di_m:
+            adx = self.adx.step(abs(di_p - di_m)/(di_p + di_m)*100, commit)
+        return adx, di_p, di_m
+
+
+class _ChaikinMf(_Node):
+    def __init__(self, p):
+        self.s_vol, self.s_mfv = _WindowSum(p), _WindowSum(p)
+
+    def step(self, hi, lo, c, vol, commit=True):
+        mfm = (c - lo - (hi - c)) / (hi - lo) if hi != lo else 0
+        sv, smf = self.s_vol.step(vol, commit), self.s_mfv.step(mfm * vol, commit)
+        if sv is None:
+            return None
+        return smf / sv if sv else 0.0
+
+
+class _ObvMa(_Node):
+    outputs = 2
+
+    def __init__(self, p):
+        self.prev_c = _Prev()
+        self.obv = None
+        self.e = _ema(p)
+
+    def step(self, c, vol, commit=True):
+        pc = self.prev_c.step(c, commit)
+        if pc is None:
+            obv = 0.0
+        elif c > pc:
+            obv = self.obv + vol
+        elif c < pc:
+            obv = self.obv - vol
+        else:
+            obv = self.obv
+        if commit:
+            self.obv = obv
+        return obv, self.e.step(obv, commit)
+
+
+class _Choppiness(_Node):
+    def __init__(self, p):
+        self.log_p = math.log10(p)
+        self.prev_c = _Prev()
+        self.s_tr = _WindowSum(p)
+        self.hh, self.ll = _WindowExtreme(p, 1), _WindowExtreme(p, -1)
+
+    def step(self, hi, lo, c, commit=True):
+        pc = self.prev_c.step(c, commit)
+        tr = max(hi - lo, abs(hi - pc) if pc is not None else 0, abs(lo - pc) if pc is not None else 0)
+        s = self.s_tr.step(tr, commit)
+        h, l = self.hh.step(hi, commit), self.ll.step(lo, commit)
+        if s is None:
+            return None
+        rng = h - l
+        return 100*math.log10(s/rng)/self.log_p if (rng and s) else None
+
+
+class _Stdev(_Node):
+    def __init__(self, p):
+        self.p, self.win = p, _Window(p)
+
+    def step(self, c, commit=True):
+        w = self.win.step(c, commit)
+        if w is None:
+            return None
+        mean = sum(w) / self.p
+        return math.sqrt(sum((x - mean)**2 for x in w) / self.p)
+
+
+class _Donchian(_Node):
+    outputs = 2
+
+    def __init__(self, p):
+        self.hh, self.ll = _WindowExtreme(p, 1), _WindowExtreme(p, -1)
+
+    def step(self, hi, lo, commit=True):
+        return self.hh.step(hi, commit), self.ll.step(lo, commit)
+
+
+class _ParabolicSar(_Node):
+    def __init__(self, af0=0.02, af_step=0.02, af_max=0.2):
+        self.af0, self.af_step, self.af_max = af0, af_step, af_max
+        self.n = 0
+        self.bars = deque(maxlen=2)     # (hi, lo, c) of the last two bars
+        self.state = None               # (bull, ep, af, sar)
+
+    def step(self, hi, lo, c, commit=True):
+        n, bars = self.n, self.bars
+        sar, state = None, self.state
+        if n == 1:
+            h0, l0, c0 = bars[-1]
+            bull = c > c0
+            state = (bull, hi if bull else lo, self.af0, l0 if bull else h0)
+            sar = state[3]
+        elif n >= 2:
+            bull, ep, af, p = self.state
+            (h2, l2, _), (h1, l1, _) = bars[0], bars[1]
+            ns = p + af*(ep - p)
+            if bull:
+                ns = min(ns, l1, l2 if n > 2 else l1)
+                if lo < ns: bull, ns, ep, af = False, ep, lo, self.af0
+                elif hi > ep: ep = hi; af = min(af + self.af_step, self.af_max)
+            else:
+                ns = max(ns, h1, h2 if n > 2 else h1)
+                if hi > ns: bull, ns, ep, af = True, ep, hi, self.af0
+                elif lo < ep: ep = lo; af = min(af + self.af_step, self.af_max)
+            state, sar = (bull, ep, af, ns), ns
+        if commit:
+            self.n = n + 1
+            bars.append((hi, lo, c))
+            self.state = state
+        return sar
+
+
+class _Supertrend(_Node):
+    outputs = 2
+
+    def __init__(self, p, mult):
+        self.mult = mult
+        self.atr = _Atr(p)
+        self.lb = self.ub = self.dir = None
+
+    def step(self, hi, lo, c, commit=True):
+        a = self.atr.step(hi, lo, c, commit)
+        if not a:
+            if commit:
+                self.lb = self.ub = self.dir = None
+            return None, None
+        mid = (hi + lo) / 2
+        lb, ub = mid - self.mult*a, mid + self.mult*a
+        if self.lb is not None and lb < self.lb:
+            lb = self.lb
+        if self.ub is not None and ub > self.ub:
+            ub = self.ub
+        if self.dir is None:
+            d = 1 if c <= ub else -1
+        elif self.dir == 1:
+            d = -1 if c > ub else 1
+        else:
+            d = 1 if c < lb else -1
+        if commit:
+            self.lb, self.ub, self.dir = lb, ub, d
+        return (lb if d == -1 else ub), d
+
+
+class _Ichimoku(_Node):
+    outputs = 2
+
+    def __init__(self, tenkan_p, kijun_p):
+        self.t = (_WindowExtreme(tenkan_p, 1), _WindowExtreme(tenkan_p, -1))
+        self.k = (_WindowExtreme(kijun_p, 1), _WindowExtreme(kijun_p, -1))
+
+    @staticmethod
+    def _mid(pair, hi, lo, commit):
+        h, l = pair[0].step(hi, commit), pair[1].step(lo, commit)
+        return None if h is None else (h + l) / 2
+
+    def step(self, hi, lo, commit=True):
+        return self._mid(self.t, hi, lo, commit), self._mid(self.k, hi, lo, commit)
+
+
+class _Squeeze(_Node):
+    outputs = 2
+
+    def __init__(self, p, boll_m=2.0, kelt_m=1.5):
+        self.bb, self.kc = _Bollinger(p, boll_m), _Keltner(p, kelt_m)
+
+    def step(self, hi, lo, c, commit=True):
+        bu, _, bl = self.bb.step(c, commit)
+        ku, _, kl = self.kc.step(hi, lo, c, commit)
+        if ku is None or kl is None:
+            return None, None
+        sq = None if (bu is None or bl is None) else (bu < ku and bl > kl)
+        return sq, c - (ku + kl) / 2
+
+
+class _PivotPoints(_Node):
+    def __init__(self):
+        self.prev = _Prev()
+
+    def step(self, hi, lo, c, commit=True):
+        prev = self.prev.step((hi, lo, c), commit)
+        return None if prev is None else (prev[0] + prev[1] + prev[2]) / 3
+
+
+class _WilliamsFractal(_Node):
+    outputs = 2
+    default = False
+
+    def __init__(self, p=2):
+        self.p = self.delay = p
+        self.win = _Window(2 * p + 1)
+
+    def step(self, hi, lo, commit=True):
+        w = self.win.step((hi, lo), commit)
+        if w is None:
+            return False, False
+        p = self.p
+        h, l = w[p]
+        bull = all(l < w[p - j][1] and l < w[p + j][1] for j in range(1, p + 1))
+        bear = all(h > w[p - j][0] and h > w[p + j][0] for j in range(1, p + 1))
+        return bull, bear
+
+
+class _RollingMax(_Node):
+    def __init__(self, p):
+        self.x = _WindowExtreme(p, 1)
+
+    def step(self, v, commit=True):
+        return self.x.step(v, commit)
+
+
+class _RollingMin(_Node):
+    def __init__(self, p):
+        self.x = _WindowExtreme(p, -1)
+
+    def step(self, v, commit=True):
+        return self.x.step(v, commit)
+
+
+# strategy_generator function name → streaming state
+STREAMS = {
+    '_sma': _Sma, '_ema': _EmaNode, '_wma': _Wma, '_hma': _Hma,
+    '_dema': _Dema, '_tema': _Tema, '_zlema': _Zlema, '_mcginley': _McGinley,
+    '_rsi': _Rsi, '_macd': _Macd, '_stoch': _Stoch, '_cci': _Cci,
+    '_williams_r': _WilliamsR, '_roc': _Roc, '_mfi': _Mfi, '_trix': _Trix,
+    '_demarker': _Demarker, '_ultimate_osc': _UltimateOsc,
+    '_awesome_osc': _AwesomeOsc, '_elder_ray': _ElderRay, '_fisher': _Fisher,
+    '_vortex': _Vortex, '_tsi': _Tsi, '_bollinger': _Bollinger,
+    '_keltner': _Keltner, '_atr': _Atr, '_natr': _Natr, '_adx': _Adx,
+    '_chaikin_mf': _ChaikinMf, '_obv_ma': _ObvMa, '_choppiness': _Choppiness,
+    '_stdev': _Stdev, '_donchian': _Donchian, '_parabolic_sar': _ParabolicSar,
+    '_supertrend': _Supertrend, '_ichimoku': _Ichimoku, '_squeeze': _Squeeze,
+    '_pivot_points': _PivotPoints, '_williams_fractal': _WilliamsFractal,
+    '_rolling_max': _RollingMax, '_rolling_min': _RollingMin,
+}
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# STREAM
+# ══════════════════════════════════════════════════════════════════════════════
+
+class _Column:
+    """Bounded candle column indexed by absolute bar number (forming bar last)."""
+
+    def __init__(self, stream, values):
+        self._s, self._v = stream, values
+
+    def __len__(self):
+        return self._s.n + (self._s.forming is not None)
+
+    def __getitem__(self, i):
+        s = self._s
+        if i == s.n and s.forming is not None:
+            return s.forming[self._v]
+        if i < 0:
+            i += len(self)
+        j = i - (s.n - len(s.bars))
+        if j < 0 or i >= s.n:
+            raise IndexError(f'bar {i} is outside the retained history')
+        return s.bars[j][self._v]
+
+
+class _Series:
+    """A node's committed outputs plus its value on the forming bar."""
+
+    def __init__(self, stream, node, cols):
+        self.stream, self.node, self.cols = stream, node, cols
+        self.tail = deque(maxlen=_TAIL)
+        self.peeked = (None, None)       # (revision, value)
+
+    def push(self, bar):
+        self.tail.append(self.node.step(*[bar[k] for k in self.cols]))
+
+    def at(self, i, k):
+        s, node = self.stream, self.node
+        if s.forming is not None and i == s.n - node.delay:
+            rev, value = self.peeked
+            if rev != s.revision:
+                value = node.step(*[s.forming[k] for k in self.cols], commit=False)
+                self.peeked = (s.revision, value)
+        else:
+            last = s.n - 1 - node.delay
+            if i > last:
+                return node.default
+            j = len(self.tail) - 1 - (last - i)
+            if j < 0:
+                raise IndexError(f'bar {i} is older than the streamed tail')
+            value = self.tail[j]
+        return value if k is None else value[k]
+
+
+class _View:
+    """List-like access to one output of a _Series (what get_signal_at indexes)."""
+
+    def __init__(self, series, k=None):
+        self.series, self.k = series, k
+
+    def __getitem__(self, i):
+        return self.series.at(i, self.k)
+
+
+class IndicatorStream:
+    """
+    Live candle feed for one asset/timeframe.  Acts as the dataset *and* the
+    series cache for get_signal_at, so every catalog indicator streams without
+    a second copy of the signal rules.
+    """
+
+    def __init__(self, candles=(), max_bars: int = 5000):
+        self.bars = deque(maxlen=max_bars)   # committed candles as column dicts
+        self.n = 0                           # committed candles ever seen
+        self.forming = None                  # column dict of the forming candle
+        self.forming_time = None
+        self.revision = 0
+        self._series = {}
+        self.D = {k: _Column(self, k) for k in _COLUMNS}
+        self.D['cache'] = self
+        for c in candles:
+            self.update(c)
+
+    # ── feed ─────────────────────────────────────────────────────────────────
+    @staticmethod
+    def _columns(candle):
+        c = float(candle.get('close', 0))
+        return {
+            'closes':  c,
+            'highs':   float(candle.get('high', c)),
+            'lows':    float(candle.get('low', c)),
+            'opens':   float(candle.get('open', c)),
+            'volumes': float(candle.get('volume', 1)),
+        }
+
+    def update(self, candle: dict) -> None:
+        """
+        Feed a candle.  Same `time` as the forming candle → revision; later
+        `time` → the forming candle is closed and this one starts forming;
+        earlier `time` → ignored (stale message).
+        """
+        t = candle.get('time')
+        if self.forming is not None:
+            if t == self.forming_time:
+                self.forming = self._columns(candle)
+                self.revision += 1
+                return
+            if t is not None and self.forming_time is not None and t < self.forming_time:
+                return
+            self.commit()
+        self.forming, self.forming_time = self._columns(candle), t
+        self.revision += 1
+
+    def commit(self) -> None:
+        """Close the forming candle (no-op when there is none)."""
+        bar = self.forming
+        if bar is None:
+            return
+        for series in self._series.values():
+            series.push(bar)
+        self.bars.append(bar)
+        self.n += 1
+        self.forming = self.forming_time = None
+        self.revision += 1
+
+    @property
+    def last_time(self):
+        """`time` of the newest candle fed (forming or closed)."""
+        return self.forming_time
+
+    # ── cache protocol used by strategy_generator._series ────────────────────
+    def get(self, key, compute):
+        series = self._series.get(key)
+        if series is None:
+            fn, args = key[0], key[1:]
+            factory = STREAMS.get(getattr(fn, '__name__', ''))
+            if factory is None:
+                raise KeyError(f'no streaming version of {fn!r}')
+            cols = tuple(a for a in args if isinstance(a, str))
+            node = factory(*[a for a in args if not isinstance(a, str)])
+            series = _Series(self, node, cols)
+            for bar in self.bars:                # seed from retained history
+                series.push(bar)
+            self._series[key] = series
+        outputs = series.node.outputs
+        if outputs == 1:
+            return _View(series)
+        return tuple(_View(series, k) for k in range(outputs))
+
+    def __len__(self):
+        return len(self._series)
+
+    # ── evaluation ───────────────────────────────────────────────────────────
+    def _index(self, forming):
+        if forming:
+            if self.forming is None:
+                raise ValueError('no forming candle')
+            return self.n
+        return self.n - 1
+
+    def signal(self, ind, forming: bool = False) -> int:
+        """get_signal_at on the last closed bar (or the forming one)."""
+        return get_signal_at(self._index(forming), ind.indicator_id, ind.params, self.D)
+
+    def votes(self, strategy, forming: bool = False):
+        """(call_votes, put_votes) of the strategy's indicators."""
+        i = self._index(forming)
+        call = put = 0
+        for ind in strategy.indicators:
+            try:
+                s = get_signal_at(i, ind.indicator_id, ind.params, self.D)
+            except Exception:
+                continue
+            call += s == 1
+            put += s == -1
+        return call, put
+
+    def direction(self, strategy, forming: bool = False) -> int:
+        """+1 CALL / -1 PUT / 0 under the strategy's min_agreement rule."""
+        call, put = self.votes(strategy, forming)
+        m = strategy.min_agreement
+        if call >= m and call > put:
+            return 1
+        if put >= m and put > call:
+            return -1
+        return 0
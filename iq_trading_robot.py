@@ -5,6 +5,8 @@ import logging
 from dataclasses import dataclass, field
 from typing import Optional
 
+from candle_frame import CandleFrame
+
 logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
@@ -15,7 +17,9 @@ except ImportError:
     logger.warning("iqoptionapi not available")
 
 try:
-    from strategy_generator import INDICATOR_CATALOG, IndicatorConfig, StrategyConfig, get_signal_at
+    from strategy_generator import (INDICATOR_CATALOG, IndicatorConfig, StrategyConfig,
+                                    strategy_lookback)
+    from indicators_stream import IndicatorStream
     _SG_AVAILABLE = True
 except Exception as _e:
     _SG_AVAILABLE = False
@@ -75,6 +79,7 @@ class IQTradingRobot:
         self.consecutive_losses = 0
         self._trade_thread = None
         self._stop_event = threading.Event()
+        self._streams = {}   # "ASSET_interval" → IndicatorStream
 
     def connect(self) -> bool:
         if IQ_Option is None:
@@ -353,10 +358,45 @@ class IQTradingRobot:
 
         return None
 
+    def _candle_stream(self, asset, interval, history):
+        """
+        Streaming indicator state for asset/interval.  The first poll (or one
+        after a gap, or when the strategy needs more than the stream holds)
+        fetches `history` candles to seed it; later polls fetch only the
+        newest 3, which revise the forming candle or close it, so indicators
+        update in O(1) instead of being recomputed from the whole history.
+        """
+        key  = f"{asset}_{interval}"
+        size = interval * 60
+        stream = self._streams.get(key)
+        if stream is not None and stream.n + 1 < history:
+            stream = None
+        count  = history if stream is None else 3
+        try:
+            candles_raw = self.api.get_candles(asset, size, count, time.time())
+            if not candles_raw:
+                logger.warning(f"No candles returned for {asset} M{interval}")
+                return None
+        except Exception as ex:
+            logger.warning(f"Failed to fetch candles: {ex}")
+            return None
+
+        candles = CandleFrame.from_iq(candles_raw)
+        if stream is None:
+            stream = self._streams[key] = IndicatorStream(candles)
+            return stream
+        if candles.time[0] > (stream.last_time or 0) + size:
+            # polls were too far apart to bridge with 3 candles → reseed
+            del self._streams[key]
+            return self._candle_stream(asset, interval, history)
+        for candle in candles:
+            stream.update(candle)
+        return stream
+
     def _get_signal_from_strategy(self):
         """
         Generate CALL/PUT signal by running the saved indicator strategy
-        on the last N candles fetched from IQ Option.
+        on the streamed candle feed of the selected asset/timeframe.
         Returns (direction, asset, duration) or None.
         """
         cfg = self.config
@@ -402,54 +442,20 @@ class IQTradingRobot:
         if not indicators:
             return None
 
-        # Fetch recent candles — need at least 200 for warmup
-        candle_count = 250
-        try:
-            candles_raw = self.api.get_candles(asset, interval * 60, candle_count, time.time())
-            if not candles_raw:
-                logger.warning(f"No candles returned for {asset} M{interval}")
-                return None
-        except Exception as ex:
-            logger.warning(f"Failed to fetch candles: {ex}")
-            return None
+        min_agr  = max(1, cfg.min_agreement)
+        strategy = StrategyConfig(indicators=indicators, min_agreement=min_agr)
 
-        # Normalise candle format
-        candles = []
-        for raw in candles_raw:
-            candles.append({
-                'open':   float(raw.get('open', raw.get('o', 0))),
-                'high':   float(raw.get('max',  raw.get('h', 0))),
-                'low':    float(raw.get('min',  raw.get('l', 0))),
-                'close':  float(raw.get('close',raw.get('c', 0))),
-                'volume': float(raw.get('volume', raw.get('v', 1))),
-                'time':   raw.get('from', raw.get('t', 0)),
-            })
-
-        if len(candles) < 70:
-            logger.warning(f"Not enough candles: {len(candles)}")
+        # Votes on the last closed candle, which needs `lookback` earlier
+        # candles; the forming one on top is the trade candle
+        lookback = strategy_lookback(strategy)
+        stream = self._candle_stream(asset, interval, lookback + 2)
+        if stream is None:
+            return None
+        if stream.n <= lookback:
+            logger.warning(f"Not enough candles: {stream.n + 1} (need {lookback + 2})")
             return None
 
-        c   = [x['close']  for x in candles]
-        hi  = [x['high']   for x in candles]
-        lo  = [x['low']    for x in candles]
-        op  = [x['open']   for x in candles]
-        vol = [x['volume'] for x in candles]
-        D   = {'closes': c, 'highs': hi, 'lows': lo, 'opens': op, 'volumes': vol}
-
-        # Compute votes from last candle (index = -2, so next candle = -1 is the trade)
-        i = len(candles) - 2
-        votes = []
-        for ind in indicators:
-            try:
-                s = get_signal_at(i, ind.indicator_id, ind.params, D)
-                if s != 0:
-                    votes.append(s)
-            except Exception as ex:
-                logger.debug(f"Indicator {ind.indicator_id} error: {ex}")
-
-        min_agr = max(1, cfg.min_agreement)
-        call_v  = votes.count(1)
-        put_v   = votes.count(-1)
+        call_v, put_v = stream.votes(strategy)
 
         logger.info(f"Strategy signal votes: CALL={call_v} PUT={put_v} (need {min_agr})")
 
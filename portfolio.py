@@ -0,0 +1,278 @@
+"""
+Portfolio Backtest
+==================
+Backtests the bot's active strategies together, the way one account trades
+them: every strategy (asset, interval, indicators) produces its own trade
+stream, the streams are merged by entry time, and all trades draw on one
+shared balance with one stop-win / stop-loss on the combined profit.  Each
+strategy keeps its own martingale ladder, as if it had its own robot on the
+same account.
+
+Trade streams come from strategy_generator.outcome_sequence on one dataset
+per (asset, interval), so strategies on the same candles share indicator
+series and signal vectors (pass `datasets` to reuse them across runs).
+Streams are merged by entry time (heapq.merge, or one stable sort of the
+concatenated entry times with NumPy — same order); open positions wait in a
+heap keyed by their close time and are settled before any later entry, so
+the walk is one pass over the trades.
+
+A position's stake is reserved while it is open and a trade is only taken
+if the free balance covers it.  Which concurrent positions are allowed is
+set by `overlap`:
+
+  single        one open position on the whole account (the live robot)
+  per_asset     one open position per asset
+  per_strategy  one open position per strategy
+  all           every signal is traded
+
+and `max_open` caps the number of open positions in any mode (0 = no cap).
+Signals refused by these rules are counted as skipped.
+
+    members = [PortfolioStrategy.from_active(e) for e in active_strategies]
+    res = portfolio_backtest(members, {('EURUSD-OTC', 60): m1, ...}, trading,
+                             overlap='per_asset')
+"""
+
+import heapq
+import itertools
+import logging
+from collections import deque
+from dataclasses import asdict, dataclass
+from typing import Dict, List, Optional
+
+from strategy_generator import (IndicatorConfig, StrategyConfig, TradingConfig, build_dataset,
+                                outcome_sequence)
+
+try:
+    import numpy as np
+except ImportError:        # streams merged with heapq.merge only
+    np = None
+
+logger = logging.getLogger(__name__)
+
+OVERLAP_MODES = ('single', 'per_asset', 'per_strategy', 'all')
+
+
+@dataclass
+class PortfolioStrategy:
+    strategy: StrategyConfig
+    asset: str
+    interval: int = 60          # candle size, seconds
+    expiry: int = 1             # candles per trade
+    name: str = ''
+
+    @classmethod
+    def from_active(cls, entry: dict) -> 'PortfolioStrategy':
+        """An entry of BotSetting.active_strategies (its interval is stored in minutes)."""
+        strategy = StrategyConfig(
+            indicators=[IndicatorConfig(indicator_id=i.get('id'), params=i.get('params', {}))
+                        for i in entry.get('indicators', [])],
+            min_agreement=int(entry.get('min_agreement', 1)),
+        )
+        return cls(strategy, entry.get('asset', 'EURUSD-OTC'),
+                   interval=max(1, int(entry.get('interval', 1))) * 60,
+                   expiry=max(1, int(entry.get('expiry', 1))),
+                   name=entry.get('name', ''))
+
+
+@dataclass
+class PortfolioResult:
+    total_trades: int
+    wins: int
+    losses: int
+    win_rate: float
+    profit: float
+    final_balance: float
+    max_drawdown: float         # % of the running peak balance
+    skipped: int                # signals refused by the overlap rules / free balance
+    max_concurrent: int         # most positions open at once
+    stopped: str                # '' | 'stop_win' | 'stop_loss' | 'ruined'
+    per_strategy: list          # {name, asset, interval, trades, wins, win_rate, profit, skipped}
+    trades: list                # last trade_tail settled trades
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+def _trade_stream(member: PortfolioStrategy, D: dict) -> tuple:
+    """(open times, close times, won, votes) of member's entries, in time order."""
+    outcomes = outcome_sequence(member.strategy, D, expiry=member.expiry, min_trades=1)
+    if outcomes is None:
+        return [], [], [], []
+    times, e, iv = D['times'], member.expiry, member.interval
+    return ([times[i + 1] for i in outcomes.bars], [times[i + e] + iv for i in outcomes.bars],
+            outcomes.won, outcomes.votes)
+
+
+def _merged(streams: dict, chunk: int = 1 << 16):
+    """
+    (open time, k, close time, won, vote) of every stream {k: _trade_stream},
+    ordered by open time then k — heapq.merge of the streams.  With NumPy the
+    same order comes from one stable sort of the concatenated open times,
+    materialised `chunk` trades at a time.
+    """
+    if np is None:
+        yield from heapq.merge(*(zip(o, itertools.repeat(k), c, w, v)
+                                 for k, (o, c, w, v) in streams.items()))
+        return
+    ks = sorted(streams)
+    cols = [np.concatenate([np.asarray(streams[k][j], dtype=dt) for k in ks] or [np.empty(0, dt)])
+            for j, dt in enumerate((np.int64, np.int64, bool, np.int8))]
+    owner = np.repeat(np.asarray(ks, dtype=np.int64), [len(streams[k][0]) for k in ks])
+    order = np.argsort(cols[0], kind='stable')        # streams are concatenated in k order
+    for lo in range(0, len(order), chunk):
+        sel = order[lo:lo + chunk]
+        yield from zip(cols[0][sel].tolist(), owner[sel].tolist(), cols[1][sel].tolist(),
+                       cols[2][sel].tolist(), cols[3][sel].tolist())
+
+
+def portfolio_backtest(members: List[PortfolioStrategy], candles: Dict[tuple, object],
+                       trading: TradingConfig, overlap: str = 'single', max_open: int = 0,
+                       datasets: Optional[Dict[tuple, dict]] = None,
+                       trade_tail: int = 200) -> PortfolioResult:
+    """
+    Simulate members on one shared balance.  candles: {(asset, interval):
+    candles}; members without candles take no trades.  datasets: optional
+    {(asset, interval): build_dataset D}, filled in for the keys it lacks.
+    """
+    if overlap not in OVERLAP_MODES:
+        raise ValueError(f'Unknown overlap mode: {overlap}')
+    datasets = {} if datasets is None else datasets
+    streams = {}
+    for k, m in enumerate(members):
+        key = (m.asset, m.interval)
+        if key not in datasets:
+            if candles.get(key) is None:
+                logger.warning(f'Portfolio: no candles for {m.asset} @ {m.interval}s')
+                continue
+            datasets[key] = build_dataset(candles[key])
+        streams[k] = _trade_stream(m, datasets[key])
+
+    n = len(members)
+    assets   = sorted({m.asset for m in members})
+    asset_of = [assets.index(m.asset) for m in members]
+    base, payout = trading.amount, trading.payout
+    top, mult    = trading.martingale_steps, trading.martingale_multiplier
+    amount   = [base] * n                    # per-strategy martingale state
+    step     = [0] * n
+    s_trades, s_wins, s_profit, s_skipped = [0] * n, [0] * n, [0.0] * n, [0] * n
+    open_per_strategy = [0] * n
+    open_per_asset    = [0] * len(assets)
+    single, per_asset, per_strategy = (overlap == 'single', overlap == 'per_asset',
+                                       overlap == 'per_strategy')
+
+    balance = trading.modal
+    peak    = trading.modal
+    locked  = 0.0                            # stakes of open positions
+    profit  = 0.0
+    max_drawdown = 0.0
+    wins = settled = skipped = max_concurrent = 0
+    stopped = ''
+    positions = []                           # heap of (close time, seq, k, bet, won, open time, vote)
+    seq = 0
+    records = deque(maxlen=trade_tail)       # raw tuples, formatted once at the end
+
+    def settle():
+        nonlocal balance, peak, locked, profit, max_drawdown, wins, settled, stopped
+        close_t, _, k, bet, won, open_t, vote = heapq.heappop(positions)
+        locked -= bet
+        open_per_strategy[k] -= 1
+        open_per_asset[asset_of[k]] -= 1
+        if won:
+            pnl = bet * payout
+            wins += 1
+            s_wins[k] += 1
+            step[k] = 0
+            amount[k] = base
+        elif step[k] < top:
+            pnl = -bet
+            step[k] += 1
+            amount[k] = base * (mult ** step[k])
+        else:
+            pnl = -bet
+            step[k] = 0
+            amount[k] = base
+        balance += pnl
+        profit  += pnl
+        settled += 1
+        s_trades[k] += 1
+        s_profit[k] += pnl
+        if balance > peak:
+            peak = balance
+        elif peak > 0 and (peak - balance) / peak * 100 > max_drawdown:
+            max_drawdown = (peak - balance) / peak * 100
+        records.append((settled, k, open_t, close_t, vote, bet, pnl, won, balance, step[k]))
+        if not stopped:
+            if profit >= trading.stop_win:
+                stopped = 'stop_win'
+            elif profit <= -trading.stop_loss:
+                stopped = 'stop_loss'
+            elif balance <= 0 and not positions:
+                stopped = 'ruined'           # nothing left to stake, ever
+
+    for open_t, k, close_t, won, vote in _merged(streams):
+        while positions and positions[0][0] <= open_t and not stopped:
+            settle()
+        if stopped:
+            break
+        a = asset_of[k]
+        if ((single and positions) or (per_asset and open_per_asset[a]) or
+                (per_strategy and open_per_strategy[k]) or
+                (max_open and len(positions) >= max_open)):
+            skipped += 1
+            s_skipped[k] += 1
+            continue
+        bet = amount[k]
+        if bet > balance - locked:
+            bet = balance - locked
+        if bet <= 0:
+            skipped += 1
+            s_skipped[k] += 1
+            continue
+        locked += bet
+        open_per_strategy[k] += 1
+        open_per_asset[a] += 1
+        heapq.heappush(positions, (close_t, seq, k, bet, won, open_t, vote))
+        seq += 1
+        if len(positions) > max_concurrent:
+            max_concurrent = len(positions)
+
+    # positions already placed still run to expiry
+    while positions:
+        settle()
+
+    return PortfolioResult(
+        total_trades=settled,
+        wins=wins,
+        losses=settled - wins,
+        win_rate=round(wins / settled * 100, 2) if settled else 0,
+        profit=round(profit, 2),
+        final_balance=round(balance, 2),
+        max_drawdown=round(max_drawdown, 2),
+        skipped=skipped,
+        max_concurrent=max_concurrent,
+        stopped=stopped,
+        per_strategy=[{
+            'name':     m.name or f'#{k + 1}',
+            'asset':    m.asset,
+            'interval': m.interval,
+            'trades':   s_trades[k],
+            'wins':     s_wins[k],
+            'win_rate': round(s_wins[k] / s_trades[k] * 100, 2) if s_trades[k] else 0,
+            'profit':   round(s_profit[k], 2),
+            'skipped':  s_skipped[k],
+        } for k, m in enumerate(members)],
+        trades=[{
+            'no':         no,
+            'strategy':   members[k].name or f'#{k + 1}',
+            'asset':      members[k].asset,
+            'time':       open_t,
+            'close_time': close_t,
+            'direction':  'CALL' if vote > 0 else 'PUT',
+            'bet':        round(bet, 2),
+            'pnl':        round(pnl, 4),
+            'won':        won,
+            'balance':    round(bal, 2),
+            'mrt_step':   mrt_step,
+        } for no, k, open_t, close_t, vote, bet, pnl, won, bal, mrt_step in records],
+    )
@@ -0,0 +1,161 @@
+"""
+Persistent Backtest Result Cache
+================================
+SQLite-backed store of finished backtest results, so re-running the same
+strategy on the same candles (a preset, an applied strategy, the same asset
+and months) returns instantly instead of re-simulating.
+
+A key is a hash of
+  - dataset_fingerprint(): asset, interval, first / last candle time, count
+    and a BLAKE2 digest of the OHLCV column bytes — any change in the
+    candles gives a new key, so stale results are never served, only aged
+    out;
+  - canonical JSON of whatever identifies the run (StrategyConfig,
+    TradingConfig, a batch task, payout …) with dataclasses expanded and
+    dict keys sorted.
+
+Values are JSON dicts.  The file is bounded by max_bytes of stored JSON;
+the least recently read / written entries are evicted first.
+
+    cache = default_cache()
+    key = result_key(dataset_fingerprint(frame, 'EURUSD-OTC', 60), strategy, trading)
+    result = cache.get(key)
+    if result is None:
+        result = run_backtest(...)
+        cache.put(key, result)
+"""
+
+import os
+import json
+import time
+import hashlib
+import sqlite3
+import logging
+import threading
+from dataclasses import asdict, is_dataclass
+from typing import Optional
+
+from candle_frame import COLUMNS, as_frame
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PATH = os.environ.get('RESULT_CACHE_PATH', 'result_cache.sqlite3')
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# KEYS
+# ══════════════════════════════════════════════════════════════════════════════
+
+def dataset_fingerprint(candles, asset: str = '', interval: int = 0) -> str:
+    """Identity of a candle range: metadata plus a digest of every column."""
+    frame = as_frame(candles)
+    h = hashlib.blake2b(digest_size=16)
+    for name in COLUMNS:
+        h.update(frame.column(name).tobytes())
+    times = frame.time
+    first, last = (times[0], times[-1]) if len(frame) else (0, 0)
+    return f'{asset}|{interval}|{first}|{last}|{len(frame)}|{h.hexdigest()}'
+
+
+def _canonical(obj):
+    if is_dataclass(obj) and not isinstance(obj, type):
+        return {'__type__': type(obj).__name__, **_canonical(asdict(obj))}
+    if isinstance(obj, dict):
+        return {str(k): _canonical(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_canonical(v) for v in obj]
+    return obj
+
+
+def result_key(fingerprint: str, *parts) -> str:
+    """Cache key of one run: the dataset fingerprint plus its canonical config."""
+    blob = json.dumps([fingerprint, _canonical(list(parts))], sort_keys=True,
+                      separators=(',', ':'), default=str)
+    return hashlib.sha256(blob.encode()).hexdigest()
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# STORE
+# ══════════════════════════════════════════════════════════════════════════════
+
+class ResultCache:
+    """
+    Size-bounded LRU of JSON results in one SQLite file.  Safe to share
+    between threads; separate processes may open the same file (SQLite
+    locking), at worst evicting each other's entries slightly early.
+    """
+
+    def __init__(self, path: str = DEFAULT_PATH, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, timeout=10)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute('CREATE TABLE IF NOT EXISTS results ('
+                         'key TEXT PRIMARY KEY, value TEXT NOT NULL, '
+                         'size INTEGER NOT NULL, used REAL NOT NULL)')
+        self._db.execute('CREATE INDEX IF NOT EXISTS results_used ON results (used)')
+        self._db.commit()
+
+    def get(self, key: str) -> Optional[dict]:
+        with self._lock:
+            row = self._db.execute('SELECT value FROM results WHERE key = ?', (key,)).fetchone()
+            if row is None:
+                return None
+            self._db.execute('UPDATE results SET used = ? WHERE key = ?', (time.time(), key))
+            self._db.commit()
+        return json.loads(row[0])
+
+    def put(self, key: str, value: dict) -> None:
+        blob = json.dumps(value, separators=(',', ':'), default=str)
+        if len(blob) > self.max_bytes:
+            return
+        with self._lock:
+            self._db.execute('INSERT OR REPLACE INTO results (key, value, size, used) '
+                             'VALUES (?, ?, ?, ?)', (key, blob, len(blob), time.time()))
+            self._evict()
+            self._db.commit()
+
+    def _evict(self) -> None:
+        total = self._db.execute('SELECT COALESCE(SUM(size), 0) FROM results').fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        doomed = []
+        for key, size in self._db.execute('SELECT key, size FROM results ORDER BY used'):
+            if total <= self.max_bytes:
+                break
+            doomed.append((key,))
+            total -= size
+        self._db.executemany('DELETE FROM results WHERE key = ?', doomed)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._db.execute('DELETE FROM results')
+            self._db.commit()
+
+    @property
+    def nbytes(self) -> int:
+        with self._lock:
+            return self._db.execute('SELECT COALESCE(SUM(size), 0) FROM results').fetchone()[0]
+
+    def __len__(self):
+        with self._lock:
+            return self._db.execute('SELECT COUNT(*) FROM results').fetchone()[0]
+
+
+_DEFAULT: Optional[ResultCache] = None
+_DEFAULT_LOCK = threading.Lock()
+
+
+def default_cache() -> Optional[ResultCache]:
+    """The process-wide cache at RESULT_CACHE_PATH; None if the file cannot be opened."""
+    global _DEFAULT
+    with _DEFAULT_LOCK:
+        if _DEFAULT is None:
+            try:
+                _DEFAULT = ResultCache()
+            except sqlite3.Error as ex:
+                logger.warning(f'Result cache disabled ({DEFAULT_PATH}): {ex}')
+                return None
+        return _DEFAULT
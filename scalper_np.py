@@ -0,0 +1,154 @@
+"""
+Vectorised ATV Scalper
+======================
+NumPy path for strategy_scalper.AtvScalperM1: the Triple-Confluence
+conditions (EMA stack, RSI zone, fresh stochastic cross, EMA8 bounce, candle
+colour) are boolean arrays over every bar, combined in one pass, and the
+backtest tally (wins, streaks, monthly and session breakdowns) is done with
+grouped array reductions.  Only the last 200 trades returned to the UI are formatted.
+
+Indicators come from indicators_np (ema / rsi / stoch match the list
+versions in strategy_scalper), so signals and stats are the same as the
+pure-Python path.  AtvScalperM1 uses this module automatically when NumPy is
+installed; tests/test_scalper_np.py compares the two.
+
+    vec = signal_vector(AtvScalperM1(), frame)    # int8: +1 CALL / -1 PUT / 0
+    res = backtest(AtvScalperM1(), frame, payout=0.82)
+"""
+
+import numpy as np
+
+import indicators_np as K
+from candle_frame import as_frame
+from sessions import breakdown, time_buckets
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# SIGNALS
+# ══════════════════════════════════════════════════════════════════════════════
+
+def indicator_arrays(strategy, candles) -> dict:
+    """Column and indicator arrays of candles for strategy's parameters."""
+    candles = as_frame(candles)
+    closes = np.asarray(candles.close, dtype=np.float64)
+    highs  = np.asarray(candles.high,  dtype=np.float64)
+    lows   = np.asarray(candles.low,   dtype=np.float64)
+    stk, std = K.stoch(highs, lows, closes,
+                       strategy.STOCH_K, strategy.STOCH_KS, strategy.STOCH_DS)
+    return {
+        'times':  np.asarray(candles.time, dtype=np.int64),
+        'opens':  np.asarray(candles.open, dtype=np.float64),
+        'closes': closes,
+        'ema3':   K.ema(closes, strategy.EMA_FAST),
+        'ema8':   K.ema(closes, strategy.EMA_MID),
+        'ema50':  K.ema(closes, strategy.EMA_SLOW),
+        'rsi':    K.rsi(closes, strategy.RSI_PERIOD),
+        'stk':    stk,
+        'std':    std,
+    }
+
+
+def signal_vector(strategy, candles, ind: dict = None) -> np.ndarray:
+    """
+    +1 (call) / -1 (put) / 0 for every bar, the whole-array form of
+    AtvScalperM1._signal_at.  Bars outside generate_signals' range
+    (warm-up and the last bar, which has no next candle) are 0.
+    """
+    if ind is None:
+        ind = indicator_arrays(strategy, candles)
+    n = len(ind['closes'])
+    out = np.zeros(n, dtype=np.int8)
+    start = strategy.EMA_SLOW + 10
+    if n - 1 <= start:
+        return out
+
+    # [i] and [i-1] views for i in start .. n-2
+    cur  = {k: v[start:n - 1] for k, v in ind.items()}
+    prev = {k: v[start - 1:n - 2] for k, v in ind.items()}
+    e3, e8, e50 = cur['ema3'], cur['ema8'], cur['ema50']
+    rsi, stk, std = cur['rsi'], cur['stk'], cur['std']
+    cls, opn = cur['closes'], cur['opens']
+
+    valid = ~np.isnan(np.stack([e3, e8, e50, rsi, stk, std, prev['ema3'],
+                                prev['ema8'], prev['stk'], prev['std']])).any(axis=0)
+
+    call = (valid & (cls > opn)
+            & (e3 > e8) & (e8 > e50)
+            & (rsi >= strategy.RSI_CALL_LO) & (rsi <= strategy.RSI_CALL_HI)
+            & (stk > std) & (prev['stk'] <= prev['std']) & (stk < strategy.STOCH_CALL_MAX)
+            & (prev['closes'] <= prev['ema8'] * (1 + strategy.BOUNCE_TOL)) & (cls > e8))
+    put = (valid & (cls < opn)
+           & (e3 < e8) & (e8 < e50)
+           & (rsi >= strategy.RSI_PUT_LO) & (rsi <= strategy.RSI_PUT_HI)
+           & (stk < std) & (prev['stk'] >= prev['std']) & (stk > strategy.STOCH_PUT_MIN)
+           & (prev['closes'] >= prev['ema8'] * (1 - strategy.BOUNCE_TOL)) & (cls < e8))
+
+    body = out[start:n - 1]
+    body[put] = -1
+    body[call] = 1          # _signal_at checks CALL first
+    return out
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# BACKTEST
+# ══════════════════════════════════════════════════════════════════════════════
+
+def _max_run(mask: np.ndarray) -> int:
+    """Length of the longest run of True values."""
+    if not mask.any():
+        return 0
+    edges = np.diff(np.concatenate(([0], mask.view(np.int8), [0])))
+    return int((np.flatnonzero(edges == -1) - np.flatnonzero(edges == 1)).max())
+
+
+def backtest(strategy, candles, payout: float = 0.82, expiries=None) -> dict:
+    """AtvScalperM1.backtest on arrays; returns the same stats dict."""
+    ind = indicator_arrays(strategy, candles)
+    vec = signal_vector(strategy, candles, ind)
+    idx = np.flatnonzero(vec)
+
+    entry   = ind['opens'][idx + 1]
+    exit_px = ind['closes'][idx + 1]
+    is_call = vec[idx] > 0
+    won     = np.where(is_call, exit_px > entry, exit_px < entry)
+
+    wins   = int(np.count_nonzero(won))
+    losses = len(won) - wins
+
+    # Monthly breakdown: group trades by UTC calendar month of the signal bar
+    months = ind['times'][idx].astype('datetime64[s]').astype('datetime64[M]')
+    keys, group = np.unique(months, return_inverse=True)
+    month_wins  = np.bincount(group, weights=won, minlength=len(keys))
+    month_total = np.bincount(group, minlength=len(keys))
+    monthly_stats = [strategy._month_stats(str(ym), int(w), int(tot))
+                     for ym, w, tot in zip(keys, month_wins, month_total)]
+
+    # Hour / weekday / session breakdown, grouped by the entry bar's buckets
+    by_session = breakdown(idx + 1, won, payout, time_buckets(ind['times']))
+
+    tail = slice(max(0, len(idx) - 200), len(idx))
+    trade_log = [strategy._trade_record(int(t), 'call' if c else 'put', float(en), float(ex), bool(w), payout)
+                 for t, c, en, ex, w in zip(ind['times'][idx][tail], is_call[tail],
+                                            entry[tail], exit_px[tail], won[tail])]
+
+    result = strategy._result(payout, wins, losses, _max_run(won), _max_run(~won),
+                              monthly_stats, by_session, trade_log)
+    if expiries:
+        result['expiries'] = _expiry_table(strategy, ind, idx, is_call, entry,
+                                           sorted(set(expiries)), payout)
+    return result
+
+
+def _expiry_table(strategy, ind, idx, is_call, entry, expiries, payout) -> list:
+    """Per-expiry stats of the signals at idx, all expiries in one 2-D gather."""
+    closes = ind['closes']
+    n = len(closes)
+    exp = np.asarray(expiries)
+    exits = closes[np.minimum(idx[:, None] + exp[None, :], n - 1)]
+    won = np.where(is_call[:, None], exits > entry[:, None], exits < entry[:, None])
+    out = []
+    for j, e in enumerate(expiries):
+        w = won[idx + e < n, j]
+        out.append(strategy._expiry_stats(e, payout, int(np.count_nonzero(w)), len(w),
+                                          _max_run(w), _max_run(~w)))
+    return out
@@ -0,0 +1,138 @@
+"""
+Indicator Series DAG
+====================
+Declares which composite indicator series are built from which primitive
+series, so a primitive (EMA(close, 14), ATR(14), rolling max of highs, ...) is
+computed once per dataset and shared by every indicator, strategy and
+generator iteration that needs it.
+
+A series is named by a spec tuple (function_name, *args):
+    str args    name a dataset column ('closes', 'highs', ...)
+    tuple args  are nested specs (a series computed from another series)
+    anything else is a scalar parameter
+Function names are those of strategy_generator's INDICATOR MATH LIBRARY;
+indicators_np.KERNELS maps the same names to the NumPy kernels.
+
+DAG[name](*args) rewrites a composite into its combine step, whose series
+arguments are the primitives it depends on.  Both engines resolve the specs
+through the dataset's SeriesCache (strategy_generator._series,
+signals_np.array_series), so the cache key of a primitive is the same whether
+an indicator asks for it directly or a composite depends on it.
+
+    expand(('_keltner', 'highs', 'lows', 'closes', 20, 2.0))
+    → ('_keltner_from', ('_ema', 'closes', 20),
+                        ('_atr', 'highs', 'lows', 'closes', 20), 2.0)
+"""
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# COMPOSITE → PRIMITIVES
+# ══════════════════════════════════════════════════════════════════════════════
+
+def _hma(v, p):
+    return ('_hma_from', ('_wma', v, max(2, p // 2)), ('_wma', v, p), p)
+
+
+def _dema(v, p):
+    return ('_dema_from', ('_ema', v, p), p)
+
+
+def _tema(v, p):
+    return ('_tema_from', ('_ema', v, p), p)
+
+
+def _trix(c, p):
+    return ('_trix_from', ('_ema', c, p), p)
+
+
+def _macd(c, fast, slow, sig):
+    return ('_macd_from', ('_ema', c, fast), ('_ema', c, slow), sig)
+
+
+def _stoch(hi, lo, c, kp, ks=3, ds=3):
+    return ('_stoch_from', ('_rolling_max', hi, kp), ('_rolling_min', lo, kp), c, kp, ks, ds)
+
+
+def _williams_r(hi, lo, c, p):
+    return ('_williams_r_from', ('_rolling_max', hi, p), ('_rolling_min', lo, p), c)
+
+
+def _fisher(hi, lo, p):
+    return ('_fisher_from', hi, ('_rolling_max', hi, p), ('_rolling_min', lo, p))
+
+
+def _donchian(hi, lo, p):
+    return ('_pair', ('_rolling_max', hi, p), ('_rolling_min', lo, p))
+
+
+def _ichimoku(hi, lo, tenkan_p, kijun_p):
+    return ('_ichimoku_from',
+            ('_rolling_max', hi, tenkan_p), ('_rolling_min', lo, tenkan_p),
+            ('_rolling_max', hi, kijun_p), ('_rolling_min', lo, kijun_p))
+
+
+def _choppiness(hi, lo, c, p):
+    return ('_choppiness_from', hi, lo, c, ('_rolling_max', hi, p), ('_rolling_min', lo, p), p)
+
+
+def _awesome_osc(hi, lo):
+    mid = ('_median_price', hi, lo)
+    return ('_awesome_osc_from', ('_sma', mid, 5), ('_sma', mid, 34))
+
+
+def _elder_ray(c, p):
+    return ('_elder_ray_from', c, ('_ema', c, p))
+
+
+def _bollinger(c, p, m=2.0):
+    return ('_bollinger_from', c, ('_sma', c, p), p, m)
+
+
+def _keltner(hi, lo, c, p, mult=2.0):
+    return ('_keltner_from', ('_ema', c, p), ('_atr', hi, lo, c, p), mult)
+
+
+def _natr(hi, lo, c, p):
+    return ('_natr_from', ('_atr', hi, lo, c, p), c)
+
+
+def _adx(hi, lo, c, p):
+    return ('_adx_from', hi, lo, ('_atr', hi, lo, c, p), p)
+
+
+def _supertrend(hi, lo, c, p, mult):
+    return ('_supertrend_from', hi, lo, c, ('_atr', hi, lo, c, p), mult)
+
+
+def _squeeze(hi, lo, c, p, boll_m=2.0, kelt_m=1.5):
+    return ('_squeeze_from', c, ('_bollinger', c, p, boll_m), ('_keltner', hi, lo, c, p, kelt_m))
+
+
+def _obv_ma(c, vol, p):
+    obv = ('_obv', c, vol)
+    return ('_pair', obv, ('_ema', obv, p))
+
+
+DAG = {fn.__name__: fn for fn in (
+    _hma, _dema, _tema, _trix, _macd, _stoch, _williams_r, _fisher, _donchian,
+    _ichimoku, _choppiness, _awesome_osc, _elder_ray, _bollinger, _keltner,
+    _natr, _adx, _supertrend, _squeeze, _obv_ma,
+)}
+
+
+def expand(spec: tuple):
+    """The combine spec of a composite series, or None for a primitive."""
+    node = DAG.get(spec[0])
+    return node(*spec[1:]) if node is not None else None
+
+
+def primitives(spec: tuple) -> set:
+    """Every primitive (leaf) series spec that `spec` ultimately depends on."""
+    combine = expand(spec)
+    if combine is None:
+        return {spec}
+    out = set()
+    for arg in combine[1:]:
+        if isinstance(arg, tuple):
+            out |= primitives(arg)
+    return out
@@ -0,0 +1,188 @@
+"""
+Trading-Session Breakdown
+=========================
+Win / loss / P&L of a backtest grouped by hour of day, weekday and forex
+trading session, so users can see when a strategy actually works.
+
+Every candle gets three bucket indices, computed once per candle range from
+its timestamps (UTC) and kept on the dataset:
+
+  hour      0..23
+  weekday   0 = Monday .. 6 = Sunday
+  session   bitmask of the SESSIONS open at that hour — the windows the
+            dashboard clock shows; they overlap (London / New York 13-17 UTC)
+
+A trade is bucketed by its entry bar (signal bar + 1).  The breakdown of a
+backtest is then a few grouped reductions over the trades' bucket indices
+(np.bincount, or one counting pass without NumPy) — no per-trade datetime
+formatting.  P&L is in stake units like net_pnl: +payout per win, -1 per loss.
+
+    buckets = dataset_buckets(D)
+    breakdown([i + 1 for i in outcomes.bars], outcomes.won, 0.82, buckets)
+    session_mask(['London', 'New York'])            # bits for in_sessions()
+
+Streaming engines keep a SessionTally instead: constant size, fed one trade
+at a time, same rows.
+"""
+
+from typing import Optional
+
+try:
+    import numpy as np
+except ImportError:        # pure-Python counting only
+    np = None
+
+# name → (open, close) hour UTC; close is exclusive, open > close wraps midnight
+SESSIONS = {
+    'Sydney':   (21, 6),
+    'Tokyo':    (0, 9),
+    'London':   (8, 17),
+    'New York': (13, 22),
+}
+_SESSION_NAMES = tuple(SESSIONS)
+
+
+def _hour_bits(hour: int) -> int:
+    bits = 0
+    for b, (lo, hi) in enumerate(SESSIONS.values()):
+        if (lo <= hour < hi) if lo < hi else (hour >= lo or hour < hi):
+            bits |= 1 << b
+    return bits
+
+
+_HOUR_SESSIONS = [_hour_bits(h) for h in range(24)]
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# BUCKET INDICES
+# ══════════════════════════════════════════════════════════════════════════════
+
+def time_buckets(times) -> dict:
+    """{'hour', 'weekday', 'session'} index per timestamp (arrays with NumPy, else lists)."""
+    if np is not None:
+        t = np.asarray(times, dtype=np.int64)
+        hour = (t // 3600 % 24).astype(np.int8)
+        return {
+            'hour':    hour,
+            'weekday': ((t // 86400 + 3) % 7).astype(np.int8),     # 1970-01-01 was a Thursday
+            'session': np.asarray(_HOUR_SESSIONS, dtype=np.int8)[hour],
+        }
+    hour = [t // 3600 % 24 for t in times]
+    return {
+        'hour':    hour,
+        'weekday': [(t // 86400 + 3) % 7 for t in times],
+        'session': [_HOUR_SESSIONS[h] for h in hour],
+    }
+
+
+def dataset_buckets(D: dict) -> dict:
+    """time_buckets of a build_dataset D, computed on first use and kept on D."""
+    buckets = D.get('buckets')
+    if buckets is None:
+        buckets = D['buckets'] = time_buckets(D['times'])
+    return buckets
+
+
+def session_mask(sessions) -> int:
+    """Bitmask of the named sessions (keys of SESSIONS)."""
+    mask = 0
+    for name in sessions:
+        if name not in SESSIONS:
+            raise ValueError(f'Unknown trading session: {name}')
+        mask |= 1 << _SESSION_NAMES.index(name)
+    return mask
+
+
+def in_sessions(bars, buckets: dict, mask: int) -> list:
+    """For each bar index, whether it falls in one of the sessions of mask."""
+    ses = buckets['session']
+    if np is not None and not isinstance(ses, list):
+        return ((ses[np.asarray(bars, dtype=np.int64)] & mask) != 0).tolist()
+    return [bool(ses[i] & mask) for i in bars]
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# GROUPED STATS
+# ══════════════════════════════════════════════════════════════════════════════
+
+def _rows(key, labels, wins, totals, payout) -> list:
+    out = []
+    for label, w, n in zip(labels, wins, totals):
+        w, n = int(w), int(n)
+        out.append({
+            key:        label,
+            'wins':     w,
+            'losses':   n - w,
+            'total':    n,
+            'win_rate': round(w / n * 100, 1) if n else 0,
+            'pnl':      round(w * payout - (n - w), 2),
+        })
+    return out
+
+
+def _shape(counts: dict, payout: float) -> dict:
+    return {
+        'hour':    _rows('hour', range(24), *counts['hour'], payout),
+        'weekday': _rows('weekday', range(7), *counts['weekday'], payout),
+        'session': _rows('session', _SESSION_NAMES, *counts['session'], payout),
+    }
+
+
+def breakdown(bars, won, payout: float, buckets: dict) -> dict:
+    """
+    Per-hour, per-weekday and per-session stats of the trades entered at
+    `bars` (indices into the candles of `buckets`) with outcomes `won`.
+    Every bucket is listed, empty ones with zero trades.
+    """
+    if np is not None and not isinstance(buckets['hour'], list):
+        b = np.asarray(bars, dtype=np.int64)
+        w = np.asarray(won, dtype=bool)
+
+        def grouped(col, size):
+            idx = buckets[col][b]
+            return (np.bincount(idx, weights=w, minlength=size),
+                    np.bincount(idx, minlength=size))
+
+        ses = buckets['session'][b]
+        bits = [(ses & (1 << k)) != 0 for k in range(len(SESSIONS))]
+        counts = {
+            'hour':    grouped('hour', 24),
+            'weekday': grouped('weekday', 7),
+            'session': ([np.count_nonzero(w & m) for m in bits],
+                        [np.count_nonzero(m) for m in bits]),
+        }
+        return _shape(counts, payout)
+
+    tally = SessionTally()
+    hour, weekday, session = buckets['hour'], buckets['weekday'], buckets['session']
+    for i, ok in zip(bars, won):
+        tally._add(hour[i], weekday[i], session[i], ok)
+    return tally.as_dict(payout)
+
+
+class SessionTally:
+    """Running breakdown for streaming backtests: add(time, won) per trade."""
+
+    def __init__(self, state: Optional[list] = None):
+        # [wins, totals] per group, as plain lists (JSON-friendly for checkpoints)
+        self.counts = state or [[[0] * 24, [0] * 24], [[0] * 7, [0] * 7],
+                                [[0] * len(SESSIONS), [0] * len(SESSIONS)]]
+
+    def add(self, t: int, won: bool) -> None:
+        h = t // 3600 % 24
+        self._add(h, (t // 86400 + 3) % 7, _HOUR_SESSIONS[h], won)
+
+    def _add(self, hour, weekday, bits, won) -> None:
+        (hw, hn), (dw, dn), (sw, sn) = self.counts
+        hn[hour] += 1
+        dn[weekday] += 1
+        if won:
+            hw[hour] += 1
+            dw[weekday] += 1
+        for k in range(len(sn)):
+            if bits >> k & 1:
+                sn[k] += 1
+                sw[k] += bool(won)
+
+    def as_dict(self, payout: float) -> dict:
+        return _shape(dict(zip(('hour', 'weekday', 'session'), self.counts)), payout)
@@ -0,0 +1,629 @@
+"""
+Whole-Array Signal Vectors
+==========================
+Companion to strategy_generator.get_signal_at: instead of deciding one bar at
+a time, signal_vector() returns the +1 (CALL) / -1 (PUT) / 0 decision for an
+IndicatorConfig over the whole dataset as one int8 array, with exactly the
+same rule per catalog entry (RSI 35/65 bands, Fibonacci zones, candle
+patterns, ...).  Bar 0 is always neutral.
+
+Vectors and the indicator arrays behind them are kept in the dataset's
+SeriesCache, so strategies sharing an indicator share its vector.
+
+    D    = build_dataset(candles)
+    vec  = signal_vector(IndicatorConfig('RSI', {'period': 7}), D)
+    ent  = entry_vector(strategy, D)      # min_agreement vote per bar
+"""
+
+import numpy as np
+
+import indicators_np as K
+from series_dag import expand
+
+_COLUMNS = ('closes', 'highs', 'lows', 'opens', 'volumes')
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# DATASET ACCESS
+# ══════════════════════════════════════════════════════════════════════════════
+
+def dataset_arrays(D) -> dict:
+    """float64 column arrays of D (built once and stored on the dataset)."""
+    arrays = D.get('arrays')
+    if arrays is None:
+        arrays = D['arrays'] = {k: np.asarray(D[k], dtype=np.float64) for k in _COLUMNS}
+    return arrays
+
+
+def array_series(D, kernel, *args):
+    """
+    kernel(*args) on D's arrays through its SeriesCache; str args name columns,
+    tuple args are nested series specs.  Composites declared in series_dag are
+    built from their cached primitive arrays.
+    """
+    cache = D.get('cache')
+    if cache is None:
+        return _compute_array(D, kernel, args)
+    return cache.get((kernel,) + args, lambda: _compute_array(D, kernel, args))
+
+
+def _compute_array(D, kernel, args):
+    name = K.NAMES.get(kernel)
+    combine = expand((name,) + args) if name else None
+    if combine is not None:
+        kernel, args = K.KERNELS[combine[0]], combine[1:]
+    arrays = dataset_arrays(D)
+    return kernel(*[arrays[a] if isinstance(a, str)
+                    else array_series(D, K.KERNELS[a[0]], *a[1:]) if isinstance(a, tuple)
+                    else a for a in args])
+
+
+def _prev(x):
+    """x shifted one bar to the right (value at i is x[i-1])."""
+    out = np.empty_like(x, dtype=np.float64)
+    out[0] = np.nan
+    out[1:] = x[:-1]
+    return out
+
+
+def _ok(*xs):
+    m = ~np.isnan(xs[0])
+    for x in xs[1:]:
+        m &= ~np.isnan(x)
+    return m
+
+
+def _vote(call, put):
+    """CALL wins ties, as in get_signal_at where the CALL test comes first."""
+    out = np.zeros(len(call), dtype=np.int8)
+    out[put] = -1
+    out[call] = 1
+    out[0] = 0
+    return out
+
+
+def _candle_dir(c, ok):
+    """1 if close rose vs the previous bar else -1, where ok."""
+    up = c > _prev(c)
+    return _vote(ok & up, ok & ~up)
+
+
+def _lookback_extremes(D, lb):
+    """max(hi[i-lb:i]) / min(lo[i-lb:i]) per bar (NaN for i < lb)."""
+    return (_prev(array_series(D, K.rolling_max, 'highs', lb)),
+            _prev(array_series(D, K.rolling_min, 'lows', lb)))
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# SIGNAL RULES  (one per INDICATOR_CATALOG entry)
+# ══════════════════════════════════════════════════════════════════════════════
+
+def _trend_ma(kernel):
+    def rule(D, p, a):
+        ma = array_series(D, kernel, 'closes', p['period'])
+        ok = _ok(ma, _prev(ma))
+        return _vote(ok & (a['closes'] > ma), ok & (a['closes'] < ma))
+    return rule
+
+
+def _cross(kernel):
+    def rule(D, p, a):
+        f = array_series(D, kernel, 'closes', p['fast'])
+        s = array_series(D, kernel, 'closes', p['slow'])
+        ok = _ok(f, s)
+        return _vote(ok & (f > s), ok & (f < s))
+    return rule
+
+
+def _stack(lines):
+    """(all strictly rising, all strictly falling) for lines fast → slow."""
+    ok = _ok(*lines)
+    up, dn = ok.copy(), ok.copy()
+    for a, b in zip(lines, lines[1:]):
+        up &= a > b
+        dn &= a < b
+    return up, dn
+
+
+def _triple_ema(D, p, a):
+    up, dn = _stack([array_series(D, K.ema, 'closes', p[k]) for k in ('fast', 'mid', 'slow')])
+    return _vote(up, dn)
+
+
+def _ichimoku(D, p, a):
+    ten, kij = array_series(D, K.ichimoku, 'highs', 'lows', p['tenkan'], p['kijun'])
+    c, ok = a['closes'], _ok(ten, kij)
+    return _vote(ok & (ten > kij) & (c > kij), ok & (ten < kij) & (c < kij))
+
+
+def _psar(D, p, a):
+    sar = array_series(D, K.parabolic_sar, 'highs', 'lows', 'closes')
+    ok, up = _ok(sar), a['closes'] > sar
+    return _vote(ok & up, ok & ~up)
+
+
+def _supertrend(D, p, a):
+    _, d = array_series(D, K.supertrend, 'highs', 'lows', 'closes', p['period'], p['mult'] / 10.0)
+    return _vote(d == -1, d == 1)
+
+
+def _ema_bounce(D, p, a):
+    ma = array_series(D, K.ema, 'closes', p['period'])
+    c, ma1, c1 = a['closes'], _prev(ma), _prev(a['closes'])
+    ok, tol = _ok(ma, ma1), 0.0008
+    return _vote(ok & (c1 <= ma1 * (1 + tol)) & (c > ma),
+                 ok & (c1 >= ma1 * (1 - tol)) & (c < ma))
+
+
+def _ma_ribbon(D, p, a):
+    up, dn = _stack([array_series(D, K.ema, 'closes', q) for q in (5, 10, 20, 50)])
+    return _vote(up, dn)
+
+
+def _band(x, call_below, put_above):
+    ok = _ok(x)
+    return _vote(ok & (x < call_below), ok & (x > put_above))
+
+
+def _level(x, call_above, put_below):
+    ok = _ok(x)
+    return _vote(ok & (x > call_above), ok & (x < put_below))
+
+
+def _rising(x):
+    x1 = _prev(x)
+    ok = _ok(x, x1)
+    return _vote(ok & (x > 0) & (x > x1), ok & (x < 0) & (x < x1))
+
+
+def _macd(D, p, a):
+    _, _, h = array_series(D, K.macd, 'closes', p['fast'], p['slow'], p['signal'])
+    ok = _ok(h, _prev(h))
+    return _vote(ok & (h > 0), ok & (h < 0))
+
+
+def _stoch_pair(D, kp, ks=3, ds=3):
+    return array_series(D, K.stoch, 'highs', 'lows', 'closes', kp, ks, ds)
+
+
+def _stoch(D, p, a):
+    sk, sd = _stoch_pair(D, p['k_period'], p['k_smooth'], p['d_smooth'])
+    ok = _ok(sk, sd)
+    return _vote(ok & (sk > sd) & (sk < 80), ok & (sk < sd) & (sk > 20))
+
+
+def _elder_ray(D, p, a):
+    bull, bear = array_series(D, K.elder_ray, 'closes', p['period'])
+    ok = _ok(bull)
+    return _vote(ok & (bull > 0) & (bear > 0), ok & (bull < 0) & (bear < 0))
+
+
+def _vortex(D, p, a):
+    vp, vm = array_series(D, K.vortex, 'highs', 'lows', 'closes', p['period'])
+    ok = _ok(vp, vm)
+    return _vote(ok & (vp > vm), ok & (vm > vp))
+
+
+def _channel_touch(upper, lower, c):
+    ok = _ok(upper)
+    return _vote(ok & (c <= lower), ok & (c >= upper))
+
+
+def _bollinger(D, p, a):
+    upper, _, lower = array_series(D, K.bollinger, 'closes', p['period'])
+    return _channel_touch(upper, lower, a['closes'])
+
+
+def _atr(D, p, a):
+    v = array_series(D, K.atr, 'highs', 'lows', 'closes', p['period'])
+    v1 = _prev(v)
+    ok = _ok(v, v1)
+    return _vote(ok & (v > v1), np.zeros(len(v), dtype=bool))
+
+
+def _natr(D, p, a):
+    v = array_series(D, K.natr, 'highs', 'lows', 'closes', p['period'])
+    return _candle_dir(a['closes'], _ok(v) & (v > 0.5))
+
+
+def _keltner(D, p, a):
+    upper, _, lower = array_series(D, K.keltner, 'highs', 'lows', 'closes', p['period'])
+    return _channel_touch(upper, lower, a['closes'])
+
+
+def _squeeze(D, p, a):
+    sq, mom = array_series(D, K.squeeze, 'highs', 'lows', 'closes', p['period'])
+    live = _ok(sq, mom) & (sq == 0)
+    return _vote(live & (mom > 0), live & ~(mom > 0))
+
+
+def _stdev(D, p, a):
+    v = array_series(D, K.stdev, 'closes', p['period'])
+    v1 = _prev(v)
+    return _candle_dir(a['closes'], _ok(v, v1) & (v > v1 * 1.1))
+
+
+def _choppiness(D, p, a):
+    v = array_series(D, K.choppiness, 'highs', 'lows', 'closes', p['period'])
+    return _candle_dir(a['closes'], _ok(v) & (v < 38.2))
+
+
+def _obv(D, p, a):
+    obv, ma = array_series(D, K.obv_ma, 'closes', 'volumes', p['period'])
+    ok = _ok(ma)
+    return _vote(ok & (obv > ma), ok & (obv < ma))
+
+
+def _donchian(D, p, a):
+    upper, lower = array_series(D, K.donchian, 'highs', 'lows', p['period'])
+    c, ok = a['closes'], _ok(upper)
+    return _vote(ok & (c >= upper), ok & (c <= lower))
+
+
+def _breakout(key):
+    def rule(D, p, a):
+        res, sup = _lookback_extremes(D, p[key])
+        c, ok = a['closes'], _ok(res)
+        return _vote(ok & (c > res), ok & (c < sup))
+    return rule
+
+
+def _pivot(D, p, a):
+    pv = array_series(D, K.pivot_points, 'highs', 'lows', 'closes')
+    c, ok = a['closes'], _ok(pv)
+    return _vote(ok & (c > pv), ok & (c < pv))
+
+
+def _fractal(D, p, a):
+    bars = p['bars']
+    bull, bear = array_series(D, K.williams_fractal, 'highs', 'lows', bars)
+    n = len(bull)
+    call, put = np.zeros(n, dtype=bool), np.zeros(n, dtype=bool)
+    call[bars:] = bull[:n - bars]
+    put[bars:] = bear[:n - bars]
+    return _vote(call, put)
+
+
+def _fibonacci(D, p, a):
+    sh, sl = _lookback_extremes(D, p['lookback'])
+    c = a['closes']
+    diff = sh - sl
+    ok = _ok(sh) & (diff != 0)
+    f618 = sh - 0.618 * diff
+    f382 = sh - 0.382 * diff
+    return _vote(ok & (c < f618) & (c > f382 * 0.99),
+                 ok & (c > f382) & (c < f618 * 1.01))
+
+
+def _keltner_break(D, p, a):
+    upper, _, lower = array_series(D, K.keltner, 'highs', 'lows', 'closes', p['period'])
+    c, c1, u1, l1 = a['closes'], _prev(a['closes']), _prev(upper), _prev(lower)
+    ok = _ok(upper, l1)
+    return _vote(ok & (c > upper) & (c1 <= u1), ok & (c < lower) & (c1 >= l1))
+
+
+def _adx(D, p, a):
+    adx, di_p, di_m = array_series(D, K.adx, 'highs', 'lows', 'closes', p['period'])
+    live = _ok(adx, di_p) & (adx >= p.get('threshold', 25))
+    return _vote(live & (di_p > di_m), live & (di_m > di_p))
+
+
+def _rsi_of(D, period):
+    return array_series(D, K.rsi, 'closes', period)
+
+
+def _stoch_rsi(D, p, a):
+    r = _rsi_of(D, p['rsi_period'])
+    sk, sd = _stoch_pair(D, p['stoch_k'])
+    ok = _ok(r, sk, sd)
+    return _vote(ok & (r < 50) & (sk > sd) & (sk < 80),
+                 ok & (r > 50) & (sk < sd) & (sk > 20))
+
+
+def _macd_rsi(D, p, a):
+    _, _, h = array_series(D, K.macd, 'closes', p['macd_fast'], p['macd_slow'], 9)
+    r = _rsi_of(D, p['rsi_period'])
+    ok = _ok(h, r)
+    return _vote(ok & (h > 0) & (r > 40) & (r < 70),
+                 ok & (h < 0) & (r < 60) & (r > 30))
+
+
+def _triple_ema_stoch(D, p, a):
+    up, dn = _stack([array_series(D, K.ema, 'closes', p[k]) for k in ('fast', 'mid', 'slow')])
+    sk, sd = _stoch_pair(D, p['stoch_k'])
+    ok = _ok(sk, sd)
+    return _vote(up & ok & (sk > sd) & (sk < 80), dn & ok & (sk < sd) & (sk > 20))
+
+
+def _multi_ema_momentum(D, p, a):
+    f = array_series(D, K.ema, 'closes', p['fast'])
+    s = array_series(D, K.ema, 'closes', p['slow'])
+    r = _rsi_of(D, p['rsi_p'])
+    ok = _ok(f, s, r)
+    return _vote(ok & (f > s) & (r < 60), ok & (f < s) & (r > 40))
+
+
+def _squeeze_breakout(D, p, a):
+    sq, mom = array_series(D, K.squeeze, 'highs', 'lows', 'closes', p['period'])
+    r = _rsi_of(D, p['rsi_p'])
+    live = _ok(sq, mom, r) & (sq == 0)
+    return _vote(live & (mom > 0) & (r > 45), live & (mom < 0) & (r < 55))
+
+
+def _supertrend_rsi(D, p, a):
+    _, d = array_series(D, K.supertrend, 'highs', 'lows', 'closes', p['st_period'], p['st_mult'] / 10.0)
+    r = _rsi_of(D, p['rsi_p'])
+    ok = _ok(d, r)
+    return _vote(ok & (d == -1) & (r < 65), ok & (d == 1) & (r > 35))
+
+
+def _adx_macd(D, p, a):
+    adx, di_p, di_m = array_series(D, K.adx, 'highs', 'lows', 'closes', p['adx_p'])
+    _, _, h = array_series(D, K.macd, 'closes', p['macd_fast'], p['macd_slow'], 9)
+    live = _ok(adx, h) & (adx >= p['adx_th'])
+    return _vote(live & (h > 0) & (di_p > di_m), live & (h < 0) & (di_m > di_p))
+
+
+def _ichimoku_rsi(D, p, a):
+    ten, kij = array_series(D, K.ichimoku, 'highs', 'lows', p['tenkan'], p['kijun'])
+    r = _rsi_of(D, p['rsi_p'])
+    c, ok = a['closes'], _ok(ten, kij, r)
+    return _vote(ok & (ten > kij) & (c > kij) & (r < 65),
+                 ok & (ten < kij) & (c < kij) & (r > 35))
+
+
+def _bollinger_rsi(D, p, a):
+    upper, _, lower = array_series(D, K.bollinger, 'closes', p['bb_period'])
+    r = _rsi_of(D, p['rsi_period'])
+    c, ok = a['closes'], _ok(upper, r)
+    return _vote(ok & (c <= lower) & (r < 40), ok & (c >= upper) & (r > 60))
+
+
+def _vortex_adx(D, p, a):
+    adx, _, _ = array_series(D, K.adx, 'highs', 'lows', 'closes', p['period'])
+    vp, vm = array_series(D, K.vortex, 'highs', 'lows', 'closes', p['period'])
+    live = _ok(adx, vp) & (adx >= p['adx_th'])
+    return _vote(live & (vp > vm), live & (vm > vp))
+
+
+def _candle_pattern(D, p, a):
+    c, o, hi, lo = a['closes'], a['opens'], a['highs'], a['lows']
+    c1, o1 = _prev(c), _prev(o)
+    bull = c > o
+    bull_engulf = (c1 < o1) & bull & (o <= c1) & (c >= o1)
+    bear_engulf = (c1 > o1) & (c < o) & (o >= c1) & (c <= o1)
+    body = np.abs(c - o)
+    lower_wick = np.where(bull, o - lo, c - lo)
+    upper_wick = np.where(bull, hi - c, hi - o)
+    hammer  = (body > 0) & (lower_wick > 2 * body) & (upper_wick < 0.5 * body)
+    shooter = (body > 0) & (upper_wick > 2 * body) & (lower_wick < 0.5 * body)
+    out = np.select([bull_engulf, bear_engulf, hammer, shooter], [1, -1, 1, -1], 0).astype(np.int8)
+    out[:2] = 0
+    return out
+
+
+SIGNAL_RULES = {
+    # ── Trend ────────────────────────────────────────────────────────────────
+    'SMA':           _trend_ma(K.sma),
+    'EMA':           _trend_ma(K.ema),
+    'WMA':           _trend_ma(K.wma),
+    'HMA':           _trend_ma(K.hma),
+    'DEMA':          _trend_ma(K.dema),
+    'TEMA':          _trend_ma(K.tema),
+    'ZLEMA':         _trend_ma(K.zlema),
+    'MCGINLEY':      _trend_ma(K.mcginley),
+    'EMA_CROSS':     _cross(K.ema),
+    'SMA_CROSS':     _cross(K.sma),
+    'HMA_CROSS':     _cross(K.hma),
+    'TRIPLE_EMA':    _triple_ema,
+    'ICHIMOKU':      _ichimoku,
+    'PARABOLIC_SAR': _psar,
+    'SUPERTREND':    _supertrend,
+    'EMA_BOUNCE':    _ema_bounce,
+    'MA_RIBBON':     _ma_ribbon,
+    # ── Oscillator ───────────────────────────────────────────────────────────
+    'RSI':          lambda D, p, a: _band(_rsi_of(D, p['period']), 35, 65),
+    'MACD':         _macd,
+    'STOCH':        _stoch,
+    'CCI':          lambda D, p, a: _level(array_series(D, K.cci, 'highs', 'lows', 'closes', p['period']), 100, -100),
+    'WILLIAMS_R':   lambda D, p, a: _band(array_series(D, K.williams_r, 'highs', 'lows', 'closes', p['period']), -80, -20),
+    'ROC':          lambda D, p, a: _level(array_series(D, K.roc, 'closes', p['period']), 0, 0),
+    'TRIX':         lambda D, p, a: _rising(array_series(D, K.trix, 'closes', p['period'])),
+    'DEMARKER':     lambda D, p, a: _band(array_series(D, K.demarker, 'highs', 'lows', 'closes', p['period']), 0.3, 0.7),
+    'ULTIMATE_OSC': lambda D, p, a: _level(array_series(D, K.ultimate_osc, 'highs', 'lows', 'closes', p['p1'], p['p2'], p['p3']), 70, 30),
+    'AWESOME_OSC':  lambda D, p, a: _rising(array_series(D, K.awesome_osc, 'highs', 'lows')),
+    'ELDER_RAY':    _elder_ray,
+    'FISHER':       lambda D, p, a: _rising(array_series(D, K.fisher, 'highs', 'lows', p['period'])),
+    'TSI':          lambda D, p, a: _level(array_series(D, K.tsi, 'closes', p['r_period'], p['s_period']), 25, -25),
+    'VORTEX':       _vortex,
+    # ── Volatility & Volume ──────────────────────────────────────────────────
+    'BOLLINGER':    _bollinger,
+    'ATR':          _atr,
+    'NATR':         _natr,
+    'KELTNER':      _keltner,
+    'SQUEEZE':      _squeeze,
+    'STDEV':        _stdev,
+    'CHOPPINESS':   _choppiness,
+    'MFI':          lambda D, p, a: _band(array_series(D, K.mfi, 'highs', 'lows', 'closes', 'volumes', p['period']), 20, 80),
+    'CHAIKIN_MF':   lambda D, p, a: _level(array_series(D, K.chaikin_mf, 'highs', 'lows', 'closes', 'volumes', p['period']), 0.1, -0.1),
+    'OBV':          _obv,
+    # ── Level / Channel ──────────────────────────────────────────────────────
+    'DONCHIAN':           _donchian,
+    'SUPPORT_RESISTANCE': _breakout('lookback'),
+    'PIVOT':              _pivot,
+    'FRACTAL':            _fractal,
+    'PRICE_CHANNEL':      _breakout('period'),
+    'FIBONACCI':          _fibonacci,
+    'KELTNER_BREAK':      _keltner_break,
+    # ── Advanced / Custom ────────────────────────────────────────────────────
+    'ADX':                _adx,
+    'STOCH_RSI':          _stoch_rsi,
+    'MACD_RSI':           _macd_rsi,
+    'TRIPLE_EMA_STOCH':   _triple_ema_stoch,
+    'MULTI_EMA_MOMENTUM': _multi_ema_momentum,
+    'SQUEEZE_BREAKOUT':   _squeeze_breakout,
+    'SUPERTREND_RSI':     _supertrend_rsi,
+    'ADX_MACD':           _adx_macd,
+    'ICHIMOKU_RSI':       _ichimoku_rsi,
+    'BOLLINGER_RSI':      _bollinger_rsi,
+    'VORTEX_ADX':         _vortex_adx,
+    'CANDLE_PATTERN':     _candle_pattern,
+}
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# PUBLIC API
+# ══════════════════════════════════════════════════════════════════════════════
+
+def params_key(params: dict) -> tuple:
+    """Canonical, hashable form of an indicator's params."""
+    return tuple(sorted(params.items()))
+
+
+def signal_vector(ind, D) -> np.ndarray:
+    """
+    int8 array, one +1 / -1 / 0 per bar, equal to
+    [get_signal_at(i, ind.indicator_id, ind.params, D) for i in range(n)].
+    Unknown indicator ids give all zeros; bad params raise like get_signal_at.
+    """
+    rule = SIGNAL_RULES.get(ind.indicator_id)
+    n = len(D['closes'])
+    if rule is None or n == 0:
+        return np.zeros(n, dtype=np.int8)
+    compute = lambda: rule(D, ind.params, dataset_arrays(D))
+    cache = D.get('cache')
+    if cache is None:
+        return compute()
+    return cache.get(('signal', ind.indicator_id, params_key(ind.params)), compute)
+
+
+def safe_signal_vector(ind, D) -> np.ndarray:
+    """signal_vector, with a failing indicator treated as never voting."""
+    try:
+        return signal_vector(ind, D)
+    except Exception:
+        return np.zeros(len(D['closes']), dtype=np.int8)
+
+
+def vote_counts(strategy, D):
+    """(call_votes, put_votes) per bar as int16 arrays."""
+    n = len(D['closes'])
+    call = np.zeros(n, dtype=np.int16)
+    put  = np.zeros(n, dtype=np.int16)
+    for ind in strategy.indicators:
+        v = safe_signal_vector(ind, D)
+        call += v == 1
+        put  += v == -1
+    return call, put
+
+
+def entry_vector(strategy, D, bits: tuple = None) -> np.ndarray:
+    """
+    int8 per bar: +1 when at least min_agreement indicators vote CALL and CALL
+    votes outnumber PUT votes, -1 for the mirror case, else 0.
+    bits: the strategy's entry_bits, when the caller already has them.
+    """
+    n = len(D['closes'])
+    call, put = bits if bits is not None else entry_bits(strategy, D)
+    return unpack(call, n).view(np.int8) - unpack(put, n).view(np.int8)
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# BITSET VOTES
+# ══════════════════════════════════════════════════════════════════════════════
+# Each indicator's CALL and PUT masks are packed 64 bars per uint64 word.  A
+# strategy's vote counts are kept bit-sliced (plane j holds bit j of every
+# bar's count), so adding a mask is a ripple-carry of ANDs / XORs and the
+# min_agreement / CALL-vs-PUT tests are word-wise comparators: a 4-indicator
+# combination over 500k bars is a few dozen operations on ~8k words.
+
+def pack(mask: np.ndarray) -> np.ndarray:
+    """bool per bar → uint64 words, bar i at bit i % 64 of word i // 64."""
+    b = np.packbits(np.asarray(mask, dtype=bool), bitorder='little')
+    pad = -len(b) % 8
+    if pad:
+        b = np.concatenate((b, np.zeros(pad, dtype=np.uint8)))
+    return b.view('<u8')
+
+
+def unpack(words: np.ndarray, n: int) -> np.ndarray:
+    """Inverse of pack: bool array of the first n bars."""
+    return np.unpackbits(words.view(np.uint8), count=n, bitorder='little').view(bool)
+
+
+def popcount(words: np.ndarray, start: int = 0, stop: int = None) -> int:
+    """Number of set bits (bars) of a packed mask in bars [start, stop)."""
+    stop = len(words) * 64 if stop is None else min(stop, len(words) * 64)
+    if start >= stop:
+        return 0
+    w = words[start // 64:-(-stop // 64)]
+    if start % 64 or stop % 64:
+        w = w.copy()
+        w[0] &= ~np.uint64((1 << (start % 64)) - 1)
+        if stop % 64:
+            w[-1] &= np.uint64((1 << (stop % 64)) - 1)
+    if hasattr(np, 'bitwise_count'):
+        return int(np.bitwise_count(w).sum())
+    return int(np.unpackbits(w.view(np.uint8)).sum())
+
+
+def vote_bits(ind, D) -> tuple:
+    """(call_words, put_words) of one IndicatorConfig, cached on D."""
+    def compute():
+        v = safe_signal_vector(ind, D)
+        return pack(v == 1), pack(v == -1)
+    cache = D.get('cache')
+    if cache is None:
+        return compute()
+    return cache.get(('bits', ind.indicator_id, params_key(ind.params)), compute)
+
+
+def _bit_count(masks, nwords) -> list:
+    """Bit-sliced per-bar count of set bits across masks (planes, LSB first)."""
+    planes = [np.zeros(nwords, dtype=np.uint64) for _ in range(max(1, len(masks)).bit_length())]
+    for carry in masks:
+        for j, plane in enumerate(planes):
+            planes[j] = plane ^ carry
+            carry = plane & carry
+    return planes
+
+
+def _at_least(planes, m, nwords) -> np.ndarray:
+    """Words with bit i set where the bit-sliced count at i is >= m."""
+    if m <= 0:
+        return ~np.zeros(nwords, dtype=np.uint64)
+    if m >= 1 << len(planes):
+        return np.zeros(nwords, dtype=np.uint64)
+    gt = np.zeros(nwords, dtype=np.uint64)
+    eq = ~gt
+    for j in reversed(range(len(planes))):
+        if (m >> j) & 1:
+            eq = eq & planes[j]
+        else:
+            gt = gt | (eq & planes[j])
+            eq = eq & ~planes[j]
+    return gt | eq
+
+
+def _greater(a, b, nwords) -> np.ndarray:
+    """Words with bit i set where bit-sliced count a > count b at i."""
+    gt = np.zeros(nwords, dtype=np.uint64)
+    eq = ~gt
+    for x, y in zip(reversed(a), reversed(b)):
+        gt = gt | (eq & x & ~y)
+        eq = eq & ~(x ^ y)
+    return gt
+
+
+def entry_bits(strategy, D) -> tuple:
+    """
+    (call_words, put_words): packed entry masks of the strategy — at least
+    min_agreement votes on a side and more votes than the other side.
+    """
+    nwords = -(-len(D['closes']) // 64)
+    bits = [vote_bits(ind, D) for ind in strategy.indicators]
+    call = _bit_count([c for c, _ in bits], nwords)
+    put  = _bit_count([p for _, p in bits], nwords)
+    m = strategy.min_agreement
+    return (_at_least(call, m, nwords) & _greater(call, put, nwords),
+            _at_least(put, m, nwords) & _greater(put, call, nwords))
@@ -16,23 +16,139 @@ Runs an unlimited backtest loop until the user stops it.
 
 import random
 import math
+import operator
 import logging
 import time
-from dataclasses import dataclass
-from typing import List, Optional, Callable
+import itertools
+import multiprocessing
+import queue
+import threading
+from bisect import bisect_left
+from collections import OrderedDict, deque
+from dataclasses import dataclass, replace
+from typing import List, Optional, Callable, Union
+
+import series_dag
+import sessions as _sessions
+from candle_frame import CandleFrame, as_frame, attach_frame, share_frame
 
 logger = logging.getLogger(__name__)
 
+try:
+    import indicators_np as _np_engine
+    import signals_np as _signals_np
+except ImportError:          # NumPy not installed → pure-Python engine only
+    _np_engine = None
+    _signals_np = None
+
+try:
+    import monte_carlo as _monte_carlo
+except ImportError:          # needs NumPy → no Monte Carlo risk for results
+    _monte_carlo = None
+
+ENGINES = ('python', 'numpy')
+DEFAULT_ENGINE = 'numpy' if _np_engine is not None else 'python'
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# ROLLING WINDOW PRIMITIVES
+# ══════════════════════════════════════════════════════════════════════════════
+# All return a list as long as the input, result[i] covering v[i-p+1 : i+1]
+# and None for i < p-1.  Each bar costs O(1) amortised whatever the period.
+
+def _rolling_extreme(v, p, evict):
+    """Monotonic deque: evict(back, x) drops back values x dominates."""
+    n = len(v)
+    out = [None] * n
+    if p <= 0:
+        return out
+    dq = deque()
+    for i in range(n):
+        x = v[i]
+        while dq and evict(v[dq[-1]], x):
+            dq.pop()
+        dq.append(i)
+        if dq[0] <= i - p:
+            dq.popleft()
+        if i >= p - 1:
+            out[i] = v[dq[0]]
+    return out
+
+def _rolling_max(v, p):
+    return _rolling_extreme(v, p, operator.le)
+
+def _rolling_min(v, p):
+    return _rolling_extreme(v, p, operator.ge)
+
+def _rolling_sum(v, p):
+    """
+    Running window sum, re-anchored with an exact sum() every p bars so float
+    drift stays within one window.  A window holding only zeros sums to
+    exactly 0.0 (several indicators test `if s:` on these sums).
+    """
+    n = len(v)
+    out = [None] * n
+    if p <= 0 or n < p:
+        return out
+    nz = sum(1 for x in v[:p - 1] if x)
+    s = 0.0
+    for i in range(p - 1, n):
+        if v[i]: nz += 1
+        start = i - p + 1
+        if start and v[start - 1]: nz -= 1
+        if start % p == 0:
+            s = sum(v[start:i + 1])
+        else:
+            s += v[i] - v[start - 1]
+        out[i] = s if nz else 0.0
+    return out
+
+def _rolling_wsum(v, p):
+    """Linearly weighted window sum, weights 1 (oldest) .. p (newest)."""
+    n = len(v)
+    out = [None] * n
+    if p <= 0 or n < p:
+        return out
+    sums = _rolling_sum(v, p)
+    w = 0.0
+    for i in range(p - 1, n):
+        start = i - p + 1
+        if start % p == 0:
+            w = sum((j + 1) * v[start + j] for j in range(p))
+        else:
+            w += p * v[i] - sums[i - 1]
+        out[i] = w
+    return out
+
+def _rolling_count(flags, p):
+    """Number of truthy values per window."""
+    n = len(flags)
+    out = [None] * n
+    if p <= 0:
+        return out
+    k = 0
+    for i in range(n):
+        if flags[i]: k += 1
+        if i >= p and flags[i - p]: k -= 1
+        if i >= p - 1:
+            out[i] = k
+    return out
+
+def _rolling_mean_from(x, first, p):
+    """Mean of each length-p window of x[first:] (x[:first] may be None)."""
+    out = [None] * len(x)
+    for k, s in enumerate(_rolling_sum(x[first:], p)):
+        if s is not None:
+            out[first + k] = s / p
+    return out
+
 
 # ══════════════════════════════════════════════════════════════════════════════
 # INDICATOR MATH LIBRARY
 # ══════════════════════════════════════════════════════════════════════════════
 
 def _sma(v, p):
-    r = [None] * (p - 1)
-    for i in range(p - 1, len(v)):
-        r.append(sum(v[i - p + 1: i + 1]) / p)
-    return r
+    return [None] * (p - 1) + [s / p for s in _rolling_sum(v, p)[p - 1:]]
 
 def _ema(v, p):
     if len(v) < p:
@@ -46,12 +162,8 @@ def _ema(v, p):
     return r
 
 def _wma(v, p):
-    r = [None] * (p - 1)
-    w = list(range(1, p + 1))
-    d = sum(w)
-    for i in range(p - 1, len(v)):
-        r.append(sum(w[j] * v[i - p + 1 + j] for j in range(p)) / d)
-    return r
+    d = p * (p + 1) / 2
+    return [None] * (p - 1) + [s / d for s in _rolling_wsum(v, p)[p - 1:]]
 
 def _rma(v, p):
     """Wilder's Smoothed MA (used in RSI, ATR)."""
@@ -66,10 +178,10 @@ def _rma(v, p):
 
 def _hma(v, p):
     """Hull Moving Average = WMA(2*WMA(n/2) - WMA(n), sqrt(n))."""
-    half = max(2, p // 2)
+    return _hma_from(_wma(v, max(2, p // 2)), _wma(v, p), p)
+
+def _hma_from(w1, w2, p):
     sqr  = max(2, int(math.sqrt(p)))
-    w1 = _wma(v, half)
-    w2 = _wma(v, p)
     diff = []
     for a, b in zip(w1, w2):
         if a is None or b is None:
@@ -78,33 +190,37 @@ def _hma(v, p):
             diff.append(2 * a - b)
     valid = [x for x in diff if x is not None]
     if len(valid) < sqr:
-        return [None] * len(v)
+        return [None] * len(w1)
     raw = _wma(valid, sqr)
-    pad = len(v) - len(raw)
+    pad = len(w1) - len(raw)
     return [None] * pad + raw
 
 def _dema(v, p):
-    e1 = _ema(v, p)
+    return _dema_from(_ema(v, p), p)
+
+def _dema_from(e1, p):
     val = [x for x in e1 if x is not None]
     if len(val) < p:
-        return [None] * len(v)
+        return [None] * len(e1)
     e2r = _ema(val, p)
-    pad = len(v) - len(e2r)
+    pad = len(e1) - len(e2r)
     e2 = [None] * pad + e2r
     return [2 * a - b if (a is not None and b is not None) else None for a, b in zip(e1, e2)]
 
 def _tema(v, p):
-    e1 = _ema(v, p)
+    return _tema_from(_ema(v, p), p)
+
+def _tema_from(e1, p):
     v1 = [x for x in e1 if x is not None]
     if len(v1) < p:
-        return [None] * len(v)
+        return [None] * len(e1)
     e2r = _ema(v1, p)
     v2 = [x for x in e2r if x is not None]
     if len(v2) < p:
-        return [None] * len(v)
+        return [None] * len(e1)
     e3r = _ema(v2, p)
     n = len(e3r)
-    pad1 = len(v) - n
+    pad1 = len(e1) - n
     pad2 = len(v1) - n
     result = [None] * pad1
     for i in range(n):
@@ -157,8 +273,9 @@ def _rsi(c, p):
     return r
 
 def _macd(c, fast, slow, sig):
-    ef = _ema(c, fast)
-    es = _ema(c, slow)
+    return _macd_from(_ema(c, fast), _ema(c, slow), sig)
+
+def _macd_from(ef, es, sig):
     ml = [f - s if (f and s) else None for f, s in zip(ef, es)]
     val = [x for x in ml if x is not None]
     if len(val) < sig:
@@ -169,26 +286,14 @@ def _macd(c, fast, slow, sig):
     hist = [m - s if (m is not None and s is not None) else None for m, s in zip(ml, sg)]
     return ml, sg, hist
 
-def _stoch(hi, lo, c, kp, ks, ds):
-    rk = []
-    for i in range(len(c)):
-        if i < kp - 1:
-            rk.append(None); continue
-        h = max(hi[i-kp+1:i+1])
-        l = min(lo[i-kp+1:i+1])
-        rk.append(50.0 if h == l else 100*(c[i]-l)/(h-l))
-    sk = []
-    for i in range(len(rk)):
-        if i < kp + ks - 2:
-            sk.append(None); continue
-        w = [rk[j] for j in range(i-ks+1, i+1) if rk[j] is not None]
-        sk.append(sum(w)/len(w) if w else None)
-    sd = []
-    for i in range(len(sk)):
-        if i < kp + ks + ds - 3:
-            sd.append(None); continue
-        w = [sk[j] for j in range(i-ds+1, i+1) if sk[j] is not None]
-        sd.append(sum(w)/len(w) if w else None)
+def _stoch(hi, lo, c, kp, ks=3, ds=3):
+    return _stoch_from(_rolling_max(hi, kp), _rolling_min(lo, kp), c, kp, ks, ds)
+
+def _stoch_from(hh, ll, c, kp, ks=3, ds=3):
+    rk = [None if h is None else (50.0 if h == l else 100*(c[i]-l)/(h-l))
+          for i, (h, l) in enumerate(zip(hh, ll))]
+    sk = _rolling_mean_from(rk, kp - 1, ks)
+    sd = _rolling_mean_from(sk, kp + ks - 2, ds)
     return sk, sd
 
 def _cci(hi, lo, c, p):
@@ -201,12 +306,11 @@ def _cci(hi, lo, c, p):
     return r
 
 def _williams_r(hi, lo, c, p):
-    r = [None]*(p-1)
-    for i in range(p-1, len(c)):
-        h = max(hi[i-p+1:i+1])
-        l = min(lo[i-p+1:i+1])
-        r.append(-100*(h-c[i])/(h-l) if h != l else -50.0)
-    return r
+    return _williams_r_from(_rolling_max(hi, p), _rolling_min(lo, p), c)
+
+def _williams_r_from(hh, ll, c):
+    return [None if h is None else (-100*(h-c[i])/(h-l) if h != l else -50.0)
+            for i, (h, l) in enumerate(zip(hh, ll))]
 
 def _roc(c, p):
     r = [None]*p
@@ -217,24 +321,28 @@ def _roc(c, p):
 def _mfi(hi, lo, c, vol, p):
     tp = [(hi[i]+lo[i]+c[i])/3 for i in range(len(c))]
     mf = [tp[i]*vol[i] for i in range(len(c))]
+    up = [False] + [tp[j] >= tp[j-1] for j in range(1, len(c))]
+    pos_s = _rolling_sum([m if u else 0.0 for m, u in zip(mf, up)], p)
+    neg_s = _rolling_sum([0.0 if u else m for m, u in zip(mf, up)], p)
     r = [None]*p
     for i in range(p, len(c)):
-        pos = sum(mf[j] for j in range(i-p+1, i+1) if tp[j] >= tp[j-1])
-        neg = sum(mf[j] for j in range(i-p+1, i+1) if tp[j] < tp[j-1])
+        pos, neg = pos_s[i], neg_s[i]
         r.append(100.0 if neg == 0 else 100 - 100/(1+pos/neg))
     return r
 
 def _trix(c, p):
     """TRIX: 1-period percent change of triple-smoothed EMA."""
-    e1 = _ema(c, p)
+    return _trix_from(_ema(c, p), p)
+
+def _trix_from(e1, p):
     v1 = [x for x in e1 if x is not None]
-    if len(v1) < p: return [None]*len(c)
+    if len(v1) < p: return [None]*len(e1)
     e2r = _ema(v1, p)
     v2 = [x for x in e2r if x is not None]
-    if len(v2) < p: return [None]*len(c)
+    if len(v2) < p: return [None]*len(e1)
     e3r = _ema(v2, p)
     n = len(e3r)
-    pad = len(c) - n
+    pad = len(e1) - n
     result = [None]*pad
     prev = None
     for x in e3r:
@@ -270,36 +378,45 @@ def _ultimate_osc(hi, lo, c, p1, p2, p3):
         tl = min(lc, pc)
         bp.append(c[i] - tl)
         tr.append(max(hi[i], pc) - min(lc, pc))
+    sums = {p: (_rolling_sum(bp, p), _rolling_sum(tr, p)) for p in (p1, p2, p3)}
+    def ratio(p):
+        s_bp, s_tr = sums[p][0][i], sums[p][1][i]
+        return s_bp/s_tr if s_tr else 0
     r = [None]*max(p1, p2, p3)
     for i in range(max(p1, p2, p3) - 1, len(bp)):
-        def ratio(p):
-            s_bp = sum(bp[i-p+1:i+1])
-            s_tr = sum(tr[i-p+1:i+1])
-            return s_bp/s_tr if s_tr else 0
         r.append(100*(4*ratio(p1) + 2*ratio(p2) + ratio(p3))/7)
     return [None] + r
 
+def _median_price(hi, lo):
+    return [(hi[i]+lo[i])/2 for i in range(len(hi))]
+
 def _awesome_osc(hi, lo):
     """Awesome Oscillator: SMA5 - SMA34 of midpoints."""
-    mid = [(hi[i]+lo[i])/2 for i in range(len(hi))]
-    s5  = _sma(mid, 5)
-    s34 = _sma(mid, 34)
+    mid = _median_price(hi, lo)
+    return _awesome_osc_from(_sma(mid, 5), _sma(mid, 34))
+
+def _awesome_osc_from(s5, s34):
     return [a - b if (a and b) else None for a, b in zip(s5, s34)]
 
 def _elder_ray(c, p):
     """Elder Ray Bull/Bear Power."""
-    ma = _ema(c, p)
+    return _elder_ray_from(c, _ema(c, p))
+
+def _elder_ray_from(c, ma):
     bull = [c[i] - ma[i] if ma[i] is not None else None for i in range(len(c))]
     bear = [c[i] - ma[i] if ma[i] is not None else None for i in range(len(c))]
     return bull, bear
 
 def _fisher(hi, lo, p):
     """Fisher Transform."""
-    r = [None]*(p-1)
+    return _fisher_from(hi, _rolling_max(hi, p), _rolling_min(lo, p))
+
+def _fisher_from(hi, hh, ll):
+    r = []
     prev = 0.0
-    for i in range(p-1, len(hi)):
-        h = max(hi[i-p+1:i+1])
-        l = min(lo[i-p+1:i+1])
+    for i, (h, l) in enumerate(zip(hh, ll)):
+        if h is None:
+            r.append(None); continue
         val = 2*(hi[i] - l)/(h - l) - 1 if h != l else 0
         val = max(-0.999, min(0.999, val))
         fish = 0.5*math.log((1+val)/(1-val)) + 0.5*prev
@@ -314,12 +431,14 @@ def _vortex(hi, lo, c, p):
     tr = [0.0]
     for i in range(1, len(c)):
         tr.append(max(hi[i]-lo[i], abs(hi[i]-c[i-1]), abs(lo[i]-c[i-1])))
+    s_trs = _rolling_sum(tr, p)
+    s_vp, s_vm = _rolling_sum(vm_plus, p), _rolling_sum(vm_minus, p)
     vi_plus  = [None]*(p-1)
     vi_minus = [None]*(p-1)
     for i in range(p-1, len(c)):
-        s_tr = sum(tr[i-p+1:i+1])
-        vi_plus.append(sum(vm_plus[i-p+1:i+1])/s_tr if s_tr else None)
-        vi_minus.append(sum(vm_minus[i-p+1:i+1])/s_tr if s_tr else None)
+        s_tr = s_trs[i]
+        vi_plus.append(s_vp[i]/s_tr if s_tr else None)
+        vi_minus.append(s_vm[i]/s_tr if s_tr else None)
     return vi_plus, vi_minus
 
 def _tsi(c, r_p, s_p):
@@ -339,7 +458,9 @@ def _tsi(c, r_p, s_p):
     return [100*m/a if (m is not None and a) else None for m, a in zip(ds_mom, ds_abs)]
 
 def _bollinger(c, p, m=2.0):
-    mid = _sma(c, p)
+    return _bollinger_from(c, _sma(c, p), p, m)
+
+def _bollinger_from(c, mid, p, m):
     upper, lower = [], []
     for i in range(len(c)):
         if mid[i] is None:
@@ -353,8 +474,9 @@ def _bollinger(c, p, m=2.0):
 
 def _keltner(hi, lo, c, p, mult=2.0):
     """Keltner Channel: EMA ± mult×ATR."""
-    ema_c = _ema(c, p)
-    atr   = _atr(hi, lo, c, p)
+    return _keltner_from(_ema(c, p), _atr(hi, lo, c, p), mult)
+
+def _keltner_from(ema_c, atr, mult):
     upper = [e + mult*a if (e and a) else None for e, a in zip(ema_c, atr)]
     lower = [e - mult*a if (e and a) else None for e, a in zip(ema_c, atr)]
     return upper, ema_c, lower
@@ -373,30 +495,36 @@ def _atr(hi, lo, c, p):
 
 def _natr(hi, lo, c, p):
     """Normalised ATR = ATR/Close × 100."""
-    atr = _atr(hi, lo, c, p)
+    return _natr_from(_atr(hi, lo, c, p), c)
+
+def _natr_from(atr, c):
     return [a/c[i]*100 if (a and c[i]) else None for i, a in enumerate(atr)]
 
 def _adx(hi, lo, c, p):
-    dm_p = [None] + [max(hi[i]-hi[i-1], 0) if hi[i]-hi[i-1] > lo[i-1]-lo[i] else 0 for i in range(1, len(c))]
-    dm_m = [None] + [max(lo[i-1]-lo[i], 0) if lo[i-1]-lo[i] > hi[i]-hi[i-1] else 0 for i in range(1, len(c))]
-    atr  = _atr(hi, lo, c, p)
+    return _adx_from(hi, lo, _atr(hi, lo, c, p), p)
+
+def _adx_from(hi, lo, atr, p):
+    n = len(hi)
+    dm_p = [None] + [max(hi[i]-hi[i-1], 0) if hi[i]-hi[i-1] > lo[i-1]-lo[i] else 0 for i in range(1, n)]
+    dm_m = [None] + [max(lo[i-1]-lo[i], 0) if lo[i-1]-lo[i] > hi[i]-hi[i-1] else 0 for i in range(1, n)]
     di_p = [100*dp/at if (dp is not None and at) else None for dp, at in zip(_rma([x if x else 0 for x in dm_p], p), atr)]
     di_m = [100*dm/at if (dm is not None and at) else None for dm, at in zip(_rma([x if x else 0 for x in dm_m], p), atr)]
     dx_vals = [abs(dp-dm)/(dp+dm)*100 if (dp and dm and dp+dm) else None for dp, dm in zip(di_p, di_m)]
     valid_dx = [x for x in dx_vals if x is not None]
-    if len(valid_dx) < p: return [None]*len(c), di_p, di_m
+    if len(valid_dx) < p: return [None]*n, di_p, di_m
     adx_r = _rma(valid_dx, p)
-    pad = len(c) - len(adx_r)
+    pad = n - len(adx_r)
     return [None]*pad + adx_r, di_p, di_m
 
 def _chaikin_mf(hi, lo, c, vol, p):
     """Chaikin Money Flow."""
     mfm = [(c[i]-lo[i]-(hi[i]-c[i]))/(hi[i]-lo[i]) if hi[i] != lo[i] else 0 for i in range(len(c))]
     mfv = [m*v for m, v in zip(mfm, vol)]
+    s_vol, s_mfv = _rolling_sum(vol, p), _rolling_sum(mfv, p)
     r = [None]*(p-1)
     for i in range(p-1, len(c)):
-        sv = sum(vol[i-p+1:i+1])
-        r.append(sum(mfv[i-p+1:i+1])/sv if sv else 0.0)
+        sv = s_vol[i]
+        r.append(s_mfv[i]/sv if sv else 0.0)
     return r
 
 def _obv(c, vol):
@@ -409,11 +537,15 @@ def _obv(c, vol):
 
 def _choppiness(hi, lo, c, p):
     """Choppiness Index — 100=chop, 0=trending."""
+    return _choppiness_from(hi, lo, c, _rolling_max(hi, p), _rolling_min(lo, p), p)
+
+def _choppiness_from(hi, lo, c, hh, ll, p):
     atr1 = [max(hi[i]-lo[i], abs(hi[i]-c[i-1]) if i>0 else 0, abs(lo[i]-c[i-1]) if i>0 else 0) for i in range(len(c))]
+    tr_sums = _rolling_sum(atr1, p)
     r = [None]*(p-1)
     for i in range(p-1, len(c)):
-        tr_sum = sum(atr1[i-p+1:i+1])
-        range_hl = max(hi[i-p+1:i+1]) - min(lo[i-p+1:i+1])
+        tr_sum = tr_sums[i]
+        range_hl = hh[i] - ll[i]
         if range_hl and tr_sum:
             r.append(100*math.log10(tr_sum/range_hl)/math.log10(p))
         else:
@@ -429,12 +561,7 @@ def _stdev(c, p):
     return r
 
 def _donchian(hi, lo, p):
-    upper = [None]*(p-1)
-    lower = [None]*(p-1)
-    for i in range(p-1, len(hi)):
-        upper.append(max(hi[i-p+1:i+1]))
-        lower.append(min(lo[i-p+1:i+1]))
-    return upper, lower
+    return _rolling_max(hi, p), _rolling_min(lo, p)
 
 def _parabolic_sar(hi, lo, c, af0=0.02, af_step=0.02, af_max=0.2):
     sar = [None]*len(c)
@@ -462,7 +589,9 @@ def _parabolic_sar(hi, lo, c, af0=0.02, af_step=0.02, af_max=0.2):
 
 def _supertrend(hi, lo, c, p, mult):
     """Supertrend indicator."""
-    atr = _atr(hi, lo, c, p)
+    return _supertrend_from(hi, lo, c, _atr(hi, lo, c, p), mult)
+
+def _supertrend_from(hi, lo, c, atr, mult):
     upper_band = [(hi[i]+lo[i])/2 + mult*atr[i] if atr[i] else None for i in range(len(c))]
     lower_band = [(hi[i]+lo[i])/2 - mult*atr[i] if atr[i] else None for i in range(len(c))]
     trend = [None]*len(c)
@@ -489,17 +618,21 @@ def _supertrend(hi, lo, c, p, mult):
 
 def _ichimoku(hi, lo, tenkan_p, kijun_p):
     """Ichimoku — returns (tenkan, kijun, above_cloud)."""
-    def _midpoint(h, l, p, i):
-        if i < p-1: return None
-        return (max(h[i-p+1:i+1]) + min(l[i-p+1:i+1])) / 2
-    tenkan = [_midpoint(hi, lo, tenkan_p, i) for i in range(len(hi))]
-    kijun  = [_midpoint(hi, lo, kijun_p,  i) for i in range(len(hi))]
-    return tenkan, kijun
+    return _ichimoku_from(_rolling_max(hi, tenkan_p), _rolling_min(lo, tenkan_p),
+                          _rolling_max(hi, kijun_p), _rolling_min(lo, kijun_p))
+
+def _ichimoku_from(th, tl, kh, kl):
+    def _midpoint(hh, ll):
+        return [None if h is None else (h + l) / 2 for h, l in zip(hh, ll)]
+    return _midpoint(th, tl), _midpoint(kh, kl)
 
 def _squeeze(hi, lo, c, p, boll_m=2.0, kelt_m=1.5):
     """Squeeze Momentum: True when BB is inside KC (low volatility)."""
-    bbu, _, bbl = _bollinger(c, p, boll_m)
-    kcu, _, kcl = _keltner(hi, lo, c, p, kelt_m)
+    return _squeeze_from(c, _bollinger(c, p, boll_m), _keltner(hi, lo, c, p, kelt_m))
+
+def _squeeze_from(c, boll, kelt):
+    bbu, _, bbl = boll
+    kcu, _, kcl = kelt
     squeeze = []
     for bu, bl, ku, kl in zip(bbu, bbl, kcu, kcl):
         if any(x is None for x in [bu, bl, ku, kl]):
@@ -911,6 +1044,152 @@ INDICATOR_CATALOG = {
 }
 
 
+# ══════════════════════════════════════════════════════════════════════════════
+# INDICATOR SERIES CACHE
+# ══════════════════════════════════════════════════════════════════════════════
+
+def _approx_bytes(value) -> int:
+    """Rough memory footprint of a cached series (list slot + float object)."""
+    if isinstance(value, (list, tuple)):
+        if value and isinstance(value[0], (list, tuple)):
+            return sum(_approx_bytes(v) for v in value)
+        return 32 * len(value)
+    nbytes = getattr(value, 'nbytes', None)
+    return nbytes if nbytes is not None else 64
+
+
+class SeriesCache:
+    """
+    LRU cache of full indicator series for ONE candle dataset.
+    Keyed by (indicator function, canonical args) so a series is computed once
+    and every later bar lookup is an O(1) index.  Bounded by entry count and an
+    approximate byte budget — the generator tries thousands of parameter sets
+    against the same candles, so old series are evicted least-recently-used.
+    """
+
+    def __init__(self, max_entries: int = 512, max_bytes: int = 256 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes   = max_bytes
+        self.bytes       = 0
+        self.hits        = 0
+        self.misses      = 0
+        self._data: OrderedDict = OrderedDict()
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def get(self, key, compute: Callable):
+        """Return the cached value for key, computing (and storing) it on a miss."""
+        entry = self._data.get(key)
+        if entry is not None:
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+        self.misses += 1
+        value = compute()
+        size  = _approx_bytes(value)
+        self._data[key] = (value, size)
+        self.bytes += size
+        self._evict()
+        return value
+
+    def _evict(self):
+        # Always keep the newest entry, even if it alone exceeds the budget
+        while len(self._data) > 1 and (len(self._data) > self.max_entries
+                                       or self.bytes > self.max_bytes):
+            _, (_, size) = self._data.popitem(last=False)
+            self.bytes -= size
+
+    def clear(self):
+        self._data.clear()
+        self.bytes = 0
+
+    def stats(self) -> dict:
+        return {'entries': len(self._data), 'bytes': self.bytes,
+                'hits': self.hits, 'misses': self.misses}
+
+
+def build_dataset(candles, cache: Optional[SeriesCache] = None,
+                  engine: Optional[str] = None) -> dict:
+    """
+    Build the column dataset `D` consumed by get_signal_at, with a SeriesCache
+    bound to it.  Reuse the same D for every bar / strategy on these candles.
+    candles: a CandleFrame (its typed columns are used as-is) or candle dicts.
+    engine: 'python' (list kernels below) or 'numpy' (indicators_np kernels;
+    falls back to 'python' when NumPy is not installed).  Defaults to
+    DEFAULT_ENGINE, i.e. NumPy whenever it is available.
+    """
+    engine = engine or DEFAULT_ENGINE
+    if engine not in ENGINES:
+        raise ValueError(f'Unknown indicator engine: {engine}')
+    if engine == 'numpy' and _np_engine is None:
+        logger.warning('NumPy not available, using the python indicator engine')
+        engine = 'python'
+    frame = as_frame(candles)
+    D = {
+        'closes':  frame.close,
+        'highs':   frame.high,
+        'lows':    frame.low,
+        'opens':   frame.open,
+        'volumes': frame.volume,
+        'times':   frame.time,
+        'cache':   cache if cache is not None else SeriesCache(),
+        'engine':  engine,
+    }
+    if engine == 'numpy':
+        D['arrays'] = {k: _np_engine.np.asarray(D[k], dtype=float)
+                       for k in ('closes', 'highs', 'lows', 'opens', 'volumes')}
+    return D
+
+
+def _series(D, fn, *args):
+    """
+    fn(*args) through the dataset's SeriesCache.  String args name a column of
+    D ('closes', 'highs', ...), tuple args are nested series specs
+    (series_dag), everything else is a scalar parameter.  Composites declared
+    in series_dag.DAG are built from their cached primitives, so e.g. MACD and
+    an EMA crossover on the same periods share one EMA.  On a numpy-engine
+    dataset the matching indicators_np kernel runs instead (its raw array is
+    cached too, for signals_np) and the result is converted back to the list
+    shape get_signal_at expects.
+    """
+    if D.get('engine') == 'numpy':
+        kernel = _np_engine.KERNELS[fn.__name__]
+        compute = lambda: _np_engine.to_py(_signals_np.array_series(D, kernel, *args))
+    else:
+        compute = lambda: _compute_series(D, fn, args)
+    cache = D.get('cache')
+    if cache is None:
+        return compute()
+    return cache.get((fn,) + args, compute)
+
+
+def _compute_series(D, fn, args):
+    combine = series_dag.expand((fn.__name__,) + args)
+    if combine is not None:
+        fn, args = globals()[combine[0]], combine[1:]
+    return fn(*[_series_arg(D, a) for a in args])
+
+
+def _series_arg(D, a):
+    if isinstance(a, str):
+        return D[a]
+    if isinstance(a, tuple):
+        return _series(D, globals()[a[0]], *a[1:])
+    return a
+
+
+def _obv_ma(c, vol, p):
+    obv = _obv(c, vol)
+    return obv, _ema(obv, p)
+
+def _pair(a, b):
+    return a, b
+
+
 # ══════════════════════════════════════════════════════════════════════════════
 # SIGNAL FUNCTIONS
 # ══════════════════════════════════════════════════════════════════════════════
@@ -928,440 +1207,513 @@ def _cross_signal(fast, slow, i):
     if fast[i] < slow[i]: return -1
     return 0
 
-def get_signal_at(i, indicator_id, params, D):
-    """Return +1 (CALL), -1 (PUT), 0 (neutral)."""
-    c, hi, lo, vol = D['closes'], D['highs'], D['lows'], D['volumes']
-    opens = D['opens']
-
-    # ── Trend ────────────────────────────────────────────────────────────────
-    if indicator_id == 'SMA':
-        return _trend_ma_signal(c, _sma(c, params['period']), i)
-
-    if indicator_id == 'EMA':
-        return _trend_ma_signal(c, _ema(c, params['period']), i)
+# ── Trend ────────────────────────────────────────────────────────────────────
+
+def _hma_first(p):
+    """First bar index where _hma(v, p) is defined."""
+    return p + max(2, int(math.sqrt(p))) - 2
+
+def _trend_ma(fn, first):
+    """Price vs one moving average of closes; `first` = first defined bar."""
+    return (lambda p: [(fn, 'closes', p['period'])],
+            lambda i, s, p, D: _trend_ma_signal(D['closes'], s[0], i),
+            lambda p: first(p['period']) + 1)
+
+def _ma_cross(fn, first):
+    return (lambda p: [(fn, 'closes', p['fast']), (fn, 'closes', p['slow'])],
+            lambda i, s, p, D: _cross_signal(s[0], s[1], i),
+            lambda p: max(first(p['fast']), first(p['slow'])))
+
+def _stacked(e, i):
+    """+1 when the lines are strictly descending (fast on top), -1 ascending."""
+    vals = [x[i] for x in e]
+    if any(v is None for v in vals): return 0
+    if all(a > b for a, b in zip(vals, vals[1:])): return 1
+    if all(a < b for a, b in zip(vals, vals[1:])): return -1
+    return 0
 
-    if indicator_id == 'WMA':
-        return _trend_ma_signal(c, _wma(c, params['period']), i)
+def _ichimoku_rule(i, s, p, D):
+    c = D['closes']
+    ten, kij = s[0]
+    if ten[i] is None or kij[i] is None: return 0
+    if ten[i] > kij[i] and c[i] > kij[i]: return 1
+    if ten[i] < kij[i] and c[i] < kij[i]: return -1
+    return 0
 
-    if indicator_id == 'HMA':
-        return _trend_ma_signal(c, _hma(c, params['period']), i)
+def _psar_rule(i, s, p, D):
+    sar = s[0]
+    if sar[i] is None: return 0
+    return 1 if D['closes'][i] > sar[i] else -1
 
-    if indicator_id == 'DEMA':
-        return _trend_ma_signal(c, _dema(c, params['period']), i)
+def _supertrend_rule(i, s, p, D):
+    _, direction = s[0]
+    if direction[i] is None: return 0
+    return -direction[i]  # direction=-1 means above supertrend → CALL
 
-    if indicator_id == 'TEMA':
-        return _trend_ma_signal(c, _tema(c, params['period']), i)
+def _ema_bounce_rule(i, s, p, D):
+    c, ma = D['closes'], s[0]
+    if ma[i] is None or ma[i-1] is None: return 0
+    tol = 0.0008
+    if c[i-1] <= ma[i-1]*(1+tol) and c[i] > ma[i]: return 1
+    if c[i-1] >= ma[i-1]*(1-tol) and c[i] < ma[i]: return -1
+    return 0
 
-    if indicator_id == 'ZLEMA':
-        return _trend_ma_signal(c, _zlema(c, params['period']), i)
+# ── Oscillator ───────────────────────────────────────────────────────────────
 
-    if indicator_id == 'MCGINLEY':
-        return _trend_ma_signal(c, _mcginley(c, params['period']), i)
+def _band(s, i, call_below, put_above):
+    """Mean-reversion band: CALL under the low band, PUT over the high one."""
+    v = s[i]
+    if v is None: return 0
+    if v < call_below: return 1
+    if v > put_above: return -1
+    return 0
 
-    if indicator_id == 'EMA_CROSS':
-        return _cross_signal(_ema(c, params['fast']), _ema(c, params['slow']), i)
+def _level(s, i, call_above, put_below):
+    """Momentum level: CALL over the upper level, PUT under the lower one."""
+    v = s[i]
+    if v is None: return 0
+    if v > call_above: return 1
+    if v < put_below: return -1
+    return 0
 
-    if indicator_id == 'SMA_CROSS':
-        return _cross_signal(_sma(c, params['fast']), _sma(c, params['slow']), i)
+def _rising(v, i):
+    """CALL when positive and rising, PUT when negative and falling."""
+    if v[i] is None or v[i-1] is None: return 0
+    if v[i] > 0 and v[i] > v[i-1]: return 1
+    if v[i] < 0 and v[i] < v[i-1]: return -1
+    return 0
 
-    if indicator_id == 'HMA_CROSS':
-        return _cross_signal(_hma(c, params['fast']), _hma(c, params['slow']), i)
+def _macd_rule(i, s, p, D):
+    _, _, hist = s[0]
+    if hist[i] is None or hist[i-1] is None: return 0
+    if hist[i] > 0: return 1
+    if hist[i] < 0: return -1
+    return 0
 
-    if indicator_id == 'TRIPLE_EMA':
-        e1 = _ema(c, params['fast'])
-        e2 = _ema(c, params['mid'])
-        e3 = _ema(c, params['slow'])
-        if any(v is None for v in [e1[i], e2[i], e3[i]]): return 0
-        if e1[i] > e2[i] > e3[i]: return 1
-        if e1[i] < e2[i] < e3[i]: return -1
-        return 0
+def _stoch_rule(i, s, p, D):
+    sk, sd = s[0]
+    if sk[i] is None or sd[i] is None: return 0
+    if sk[i] > sd[i] and sk[i] < 80: return 1
+    if sk[i] < sd[i] and sk[i] > 20: return -1
+    return 0
 
-    if indicator_id == 'ICHIMOKU':
-        ten, kij = _ichimoku(hi, lo, params['tenkan'], params['kijun'])
-        if ten[i] is None or kij[i] is None: return 0
-        if ten[i] > kij[i] and c[i] > kij[i]: return 1
-        if ten[i] < kij[i] and c[i] < kij[i]: return -1
-        return 0
+def _roc_rule(i, s, p, D):
+    v = s[0]
+    if v[i] is None: return 0
+    return 1 if v[i] > 0 else (-1 if v[i] < 0 else 0)
 
-    if indicator_id == 'PARABOLIC_SAR':
-        sar = _parabolic_sar(hi, lo, c)
-        if sar[i] is None: return 0
-        return 1 if c[i] > sar[i] else -1
-
-    if indicator_id == 'SUPERTREND':
-        _, direction = _supertrend(hi, lo, c, params['period'], params['mult']/10.0)
-        if direction[i] is None: return 0
-        return -direction[i]  # direction=-1 means above supertrend → CALL
-
-    if indicator_id == 'EMA_BOUNCE':
-        ma = _ema(c, params['period'])
-        if ma[i] is None or ma[i-1] is None: return 0
-        tol = 0.0008
-        if c[i-1] <= ma[i-1]*(1+tol) and c[i] > ma[i]: return 1
-        if c[i-1] >= ma[i-1]*(1-tol) and c[i] < ma[i]: return -1
-        return 0
+def _elder_ray_rule(i, s, p, D):
+    bull, bear = s[0]
+    if bull[i] is None: return 0
+    if bull[i] > 0 and bear[i] > 0: return 1
+    if bull[i] < 0 and bear[i] < 0: return -1
+    return 0
 
-    if indicator_id == 'MA_RIBBON':
-        e5  = _ema(c, 5)
-        e10 = _ema(c, 10)
-        e20 = _ema(c, 20)
-        e50 = _ema(c, 50)
-        if any(v is None for v in [e5[i], e10[i], e20[i], e50[i]]): return 0
-        if e5[i] > e10[i] > e20[i] > e50[i]: return 1
-        if e5[i] < e10[i] < e20[i] < e50[i]: return -1
-        return 0
+def _vortex_rule(i, s, p, D):
+    vp, vm = s[0]
+    if vp[i] is None or vm[i] is None: return 0
+    if vp[i] > vm[i]: return 1
+    if vm[i] > vp[i]: return -1
+    return 0
 
-    # ── Oscillator ───────────────────────────────────────────────────────────
-    if indicator_id == 'RSI':
-        r = _rsi(c, params['period'])
-        if r[i] is None: return 0
-        if r[i] < 35: return 1
-        if r[i] > 65: return -1
-        return 0
+# ── Volatility & Volume ──────────────────────────────────────────────────────
 
-    if indicator_id == 'MACD':
-        _, _, hist = _macd(c, params['fast'], params['slow'], params['signal'])
-        if hist[i] is None or hist[i-1] is None: return 0
-        if hist[i] > 0: return 1
-        if hist[i] < 0: return -1
-        return 0
+def _channel_rule(i, s, p, D):
+    """Mean reversion off a (upper, mid, lower) channel."""
+    c = D['closes']
+    upper, _, lower = s[0]
+    if upper[i] is None: return 0
+    if c[i] <= lower[i]: return 1
+    if c[i] >= upper[i]: return -1
+    return 0
 
-    if indicator_id == 'STOCH':
-        sk, sd = _stoch(hi, lo, c, params['k_period'], params['k_smooth'], params['d_smooth'])
-        if sk[i] is None or sd[i] is None: return 0
-        if sk[i] > sd[i] and sk[i] < 80: return 1
-        if sk[i] < sd[i] and sk[i] > 20: return -1
-        return 0
+def _atr_rule(i, s, p, D):
+    v = s[0]
+    if v[i] is None or v[i-1] is None: return 0
+    return 1 if v[i] > v[i-1] else 0  # expanding range
+
+def _natr_rule(i, s, p, D):
+    c, v = D['closes'], s[0]
+    if v[i] is None: return 0
+    # low natr → choppy, skip; high natr → trending signal
+    if v[i] > 0.5:
+        return 1 if c[i] > c[i-1] else -1
+    return 0
 
-    if indicator_id == 'CCI':
-        v = _cci(hi, lo, c, params['period'])
-        if v[i] is None: return 0
-        if v[i] > 100: return 1
-        if v[i] < -100: return -1
-        return 0
+def _squeeze_rule(i, s, p, D):
+    sq, mom = s[0]
+    if sq[i] is None or mom[i] is None: return 0
+    if not sq[i]:  # not in squeeze → in momentum
+        return 1 if mom[i] > 0 else -1
+    return 0
 
-    if indicator_id == 'WILLIAMS_R':
-        v = _williams_r(hi, lo, c, params['period'])
-        if v[i] is None: return 0
-        if v[i] < -80: return 1
-        if v[i] > -20: return -1
-        return 0
+def _stdev_rule(i, s, p, D):
+    c, v = D['closes'], s[0]
+    if v[i] is None or v[i-1] is None: return 0
+    # rising stdev → breakout; use candle direction
+    if v[i] > v[i-1] * 1.1:
+        return 1 if c[i] > c[i-1] else -1
+    return 0
 
-    if indicator_id == 'ROC':
-        v = _roc(c, params['period'])
-        if v[i] is None: return 0
-        return 1 if v[i] > 0 else (-1 if v[i] < 0 else 0)
+def _choppiness_rule(i, s, p, D):
+    c, v = D['closes'], s[0]
+    if v[i] is None: return 0
+    # below 38.2 → strong trend
+    if v[i] < 38.2:
+        return 1 if c[i] > c[i-1] else -1
+    return 0
 
-    if indicator_id == 'TRIX':
-        v = _trix(c, params['period'])
-        if v[i] is None or v[i-1] is None: return 0
-        if v[i] > 0 and v[i] > v[i-1]: return 1
-        if v[i] < 0 and v[i] < v[i-1]: return -1
-        return 0
+def _obv_rule(i, s, p, D):
+    obv, ma = s[0]
+    if ma[i] is None: return 0
+    if obv[i] > ma[i]: return 1
+    if obv[i] < ma[i]: return -1
+    return 0
 
-    if indicator_id == 'DEMARKER':
-        v = _demarker(hi, lo, c, params['period'])
-        if v[i] is None: return 0
-        if v[i] < 0.3: return 1
-        if v[i] > 0.7: return -1
-        return 0
+# ── Level / Channel ──────────────────────────────────────────────────────────
 
-    if indicator_id == 'ULTIMATE_OSC':
-        v = _ultimate_osc(hi, lo, c, params['p1'], params['p2'], params['p3'])
-        if v[i] is None: return 0
-        if v[i] > 70: return 1
-        if v[i] < 30: return -1
-        return 0
+def _extremes(p, key):
+    return [(_rolling_max, 'highs', p[key]), (_rolling_min, 'lows', p[key])]
 
-    if indicator_id == 'AWESOME_OSC':
-        v = _awesome_osc(hi, lo)
-        if v[i] is None or v[i-1] is None: return 0
-        if v[i] > 0 and v[i] > v[i-1]: return 1
-        if v[i] < 0 and v[i] < v[i-1]: return -1
-        return 0
+def _donchian_rule(i, s, p, D):
+    c = D['closes']
+    upper, lower = s[0]
+    if upper[i] is None: return 0
+    if c[i] >= upper[i]: return 1
+    if c[i] <= lower[i]: return -1
+    return 0
 
-    if indicator_id == 'ELDER_RAY':
-        bull, bear = _elder_ray(c, params['period'])
-        if bull[i] is None: return 0
-        if bull[i] > 0 and bear[i] > 0: return 1
-        if bull[i] < 0 and bear[i] < 0: return -1
+def _breakout(key):
+    """Close beyond the previous `key`-bar high / low."""
+    def rule(i, s, p, D):
+        if i < p[key]: return 0
+        c = D['closes'][i]
+        if c > s[0][i-1]: return 1
+        if c < s[1][i-1]: return -1
         return 0
+    return rule
 
-    if indicator_id == 'FISHER':
-        v = _fisher(hi, lo, params['period'])
-        if v[i] is None or v[i-1] is None: return 0
-        if v[i] > 0 and v[i] > v[i-1]: return 1
-        if v[i] < 0 and v[i] < v[i-1]: return -1
-        return 0
+def _pivot_rule(i, s, p, D):
+    c, pv = D['closes'], s[0]
+    if pv[i] is None: return 0
+    if c[i] > pv[i]: return 1
+    if c[i] < pv[i]: return -1
+    return 0
 
-    if indicator_id == 'TSI':
-        v = _tsi(c, params['r_period'], params['s_period'])
-        if v[i] is None: return 0
-        if v[i] > 25: return 1
-        if v[i] < -25: return -1
-        return 0
+def _fractal_rule(i, s, p, D):
+    n = p['bars']
+    bf, brf = s[0]
+    if i >= n and bf[i-n]: return 1
+    if i >= n and brf[i-n]: return -1
+    return 0
 
-    if indicator_id == 'VORTEX':
-        vp, vm = _vortex(hi, lo, c, params['period'])
-        if vp[i] is None or vm[i] is None: return 0
-        if vp[i] > vm[i]: return 1
-        if vm[i] > vp[i]: return -1
-        return 0
+def _fibonacci_rule(i, s, p, D):
+    if i < p['lookback']: return 0
+    c = D['closes']
+    swing_hi, swing_lo = s[0][i-1], s[1][i-1]
+    diff = swing_hi - swing_lo
+    if diff == 0: return 0
+    fib618 = swing_hi - 0.618 * diff
+    fib382 = swing_hi - 0.382 * diff
+    if c[i] < fib618 and c[i] > fib382 * 0.99: return 1
+    if c[i] > fib382 and c[i] < fib618 * 1.01: return -1
+    return 0
 
-    # ── Volatility & Volume ──────────────────────────────────────────────────
-    if indicator_id == 'BOLLINGER':
-        upper, _, lower = _bollinger(c, params['period'])
-        if upper[i] is None: return 0
-        if c[i] <= lower[i]: return 1
-        if c[i] >= upper[i]: return -1
-        return 0
+def _keltner_break_rule(i, s, p, D):
+    c = D['closes']
+    upper, _, lower = s[0]
+    if upper[i] is None or lower[i-1] is None: return 0
+    if c[i] > upper[i] and c[i-1] <= upper[i-1]: return 1
+    if c[i] < lower[i] and c[i-1] >= lower[i-1]: return -1
+    return 0
 
-    if indicator_id == 'ATR':
-        v = _atr(hi, lo, c, params['period'])
-        if v[i] is None or v[i-1] is None: return 0
-        return 1 if v[i] > v[i-1] else 0  # expanding range: direction from candle
-        # actually let's use candle direction as confirmation
-        if v[i] > v[i-1]:
-            return 1 if c[i] > c[i-1] else -1
-        return 0
+# ── Advanced / Custom ────────────────────────────────────────────────────────
 
-    if indicator_id == 'NATR':
-        v = _natr(hi, lo, c, params['period'])
-        if v[i] is None: return 0
-        # low natr → choppy, skip; high natr → trending signal
-        if v[i] > 0.5:
-            return 1 if c[i] > c[i-1] else -1
-        return 0
+def _adx_rule(i, s, p, D):
+    adx, di_p, di_m = s[0]
+    if adx[i] is None or di_p[i] is None: return 0
+    if adx[i] >= p.get('threshold', 25):
+        if di_p[i] > di_m[i]: return 1
+        if di_m[i] > di_p[i]: return -1
+    return 0
 
-    if indicator_id == 'KELTNER':
-        upper, mid, lower = _keltner(hi, lo, c, params['period'])
-        if upper[i] is None: return 0
-        if c[i] <= lower[i]: return 1
-        if c[i] >= upper[i]: return -1
-        return 0
+def _stoch_rsi_rule(i, s, p, D):
+    rsi, (sk, sd) = s
+    if rsi[i] is None or sk[i] is None or sd[i] is None: return 0
+    if rsi[i] < 50 and sk[i] > sd[i] and sk[i] < 80: return 1
+    if rsi[i] > 50 and sk[i] < sd[i] and sk[i] > 20: return -1
+    return 0
 
-    if indicator_id == 'SQUEEZE':
-        sq, mom = _squeeze(hi, lo, c, params['period'])
-        if sq[i] is None or mom[i] is None: return 0
-        if not sq[i]:  # not in squeeze → in momentum
-            return 1 if mom[i] > 0 else -1
-        return 0
+def _macd_rsi_rule(i, s, p, D):
+    (_, _, hist), rsi = s
+    if hist[i] is None or rsi[i] is None: return 0
+    if hist[i] > 0 and rsi[i] > 40 and rsi[i] < 70: return 1
+    if hist[i] < 0 and rsi[i] < 60 and rsi[i] > 30: return -1
+    return 0
 
-    if indicator_id == 'STDEV':
-        v = _stdev(c, params['period'])
-        if v[i] is None or v[i-1] is None: return 0
-        # rising stdev → breakout; use candle direction
-        if v[i] > v[i-1] * 1.1:
-            return 1 if c[i] > c[i-1] else -1
-        return 0
+def _triple_ema_stoch_rule(i, s, p, D):
+    e1, e2, e3, (sk, sd) = s
+    if any(v is None for v in [e1[i], e2[i], e3[i], sk[i], sd[i]]): return 0
+    if e1[i] > e2[i] > e3[i] and sk[i] > sd[i] and sk[i] < 80: return 1
+    if e1[i] < e2[i] < e3[i] and sk[i] < sd[i] and sk[i] > 20: return -1
+    return 0
 
-    if indicator_id == 'CHOPPINESS':
-        v = _choppiness(hi, lo, c, params['period'])
-        if v[i] is None: return 0
-        # below 38.2 → strong trend
-        if v[i] < 38.2:
-            return 1 if c[i] > c[i-1] else -1
-        return 0
+def _multi_ema_momentum_rule(i, s, p, D):
+    fast, slow, rsi = s
+    if any(v is None for v in [fast[i], slow[i], rsi[i]]): return 0
+    if fast[i] > slow[i] and rsi[i] < 60: return 1
+    if fast[i] < slow[i] and rsi[i] > 40: return -1
+    return 0
 
-    if indicator_id == 'MFI':
-        v = _mfi(hi, lo, c, vol, params['period'])
-        if v[i] is None: return 0
-        if v[i] < 20: return 1
-        if v[i] > 80: return -1
-        return 0
+def _squeeze_breakout_rule(i, s, p, D):
+    (sq, mom), rsi = s
+    if sq[i] is None or mom[i] is None or rsi[i] is None: return 0
+    if not sq[i] and mom[i] > 0 and rsi[i] > 45: return 1
+    if not sq[i] and mom[i] < 0 and rsi[i] < 55: return -1
+    return 0
 
-    if indicator_id == 'CHAIKIN_MF':
-        v = _chaikin_mf(hi, lo, c, vol, params['period'])
-        if v[i] is None: return 0
-        if v[i] > 0.1: return 1
-        if v[i] < -0.1: return -1
-        return 0
+def _supertrend_rsi_rule(i, s, p, D):
+    (_, direction), rsi = s
+    if direction[i] is None or rsi[i] is None: return 0
+    if direction[i] == -1 and rsi[i] < 65: return 1
+    if direction[i] == 1  and rsi[i] > 35: return -1
+    return 0
 
-    if indicator_id == 'OBV':
-        obv = _obv(c, vol)
-        ma  = _ema(obv, params['period'])
-        if ma[i] is None: return 0
-        if obv[i] > ma[i]: return 1
-        if obv[i] < ma[i]: return -1
-        return 0
+def _adx_macd_rule(i, s, p, D):
+    (adx, di_p, di_m), (_, _, hist) = s
+    if adx[i] is None or hist[i] is None: return 0
+    if adx[i] >= p['adx_th']:
+        if hist[i] > 0 and di_p[i] is not None and di_p[i] > di_m[i]: return 1
+        if hist[i] < 0 and di_m[i] is not None and di_m[i] > di_p[i]: return -1
+    return 0
 
-    # ── Level / Channel ──────────────────────────────────────────────────────
-    if indicator_id == 'DONCHIAN':
-        upper, lower = _donchian(hi, lo, params['period'])
-        if upper[i] is None: return 0
-        if c[i] >= upper[i]: return 1
-        if c[i] <= lower[i]: return -1
-        return 0
+def _ichimoku_rsi_rule(i, s, p, D):
+    c = D['closes']
+    (ten, kij), rsi = s
+    if ten[i] is None or kij[i] is None or rsi[i] is None: return 0
+    if ten[i] > kij[i] and c[i] > kij[i] and rsi[i] < 65: return 1
+    if ten[i] < kij[i] and c[i] < kij[i] and rsi[i] > 35: return -1
+    return 0
 
-    if indicator_id == 'SUPPORT_RESISTANCE':
-        lb = params['lookback']
-        if i < lb: return 0
-        res = max(hi[i-lb:i])
-        sup = min(lo[i-lb:i])
-        if c[i] > res: return 1
-        if c[i] < sup: return -1
-        return 0
+def _bollinger_rsi_rule(i, s, p, D):
+    c = D['closes']
+    (upper, _, lower), rsi = s
+    if upper[i] is None or rsi[i] is None: return 0
+    if c[i] <= lower[i] and rsi[i] < 40: return 1
+    if c[i] >= upper[i] and rsi[i] > 60: return -1
+    return 0
 
-    if indicator_id == 'PIVOT':
-        pv = _pivot_points(hi, lo, c)
-        if pv[i] is None: return 0
-        if c[i] > pv[i]: return 1
-        if c[i] < pv[i]: return -1
-        return 0
+def _vortex_adx_rule(i, s, p, D):
+    (adx, _, _), (vp, vm) = s
+    if adx[i] is None or vp[i] is None: return 0
+    if adx[i] >= p['adx_th']:
+        if vp[i] > vm[i]: return 1
+        if vm[i] > vp[i]: return -1
+    return 0
 
-    if indicator_id == 'FRACTAL':
-        p = params['bars']
-        bf, brf = _williams_fractal(hi, lo, p)
-        if i >= p and bf[i-p]: return 1
-        if i >= p and brf[i-p]: return -1
-        return 0
+def _candle_pattern_rule(i, s, p, D):
+    if i < 2: return 0
+    c, opens, hi, lo = D['closes'], D['opens'], D['highs'], D['lows']
+    # Bullish Engulfing
+    if (c[i-1] < opens[i-1] and      # prev bearish
+        c[i]   > opens[i]   and      # curr bullish
+        opens[i] <= c[i-1]  and      # opens below prev close
+        c[i] >= opens[i-1]):         # closes above prev open
+        return 1
+    # Bearish Engulfing
+    if (c[i-1] > opens[i-1] and
+        c[i]   < opens[i]   and
+        opens[i] >= c[i-1]  and
+        c[i] <= opens[i-1]):
+        return -1
+    # Hammer (bullish)
+    body = abs(c[i] - opens[i])
+    lower_wick = opens[i] - lo[i] if c[i] > opens[i] else c[i] - lo[i]
+    upper_wick = hi[i] - c[i] if c[i] > opens[i] else hi[i] - opens[i]
+    if body > 0 and lower_wick > 2*body and upper_wick < 0.5*body: return 1
+    if body > 0 and upper_wick > 2*body and lower_wick < 0.5*body: return -1
+    return 0
 
-    if indicator_id == 'PRICE_CHANNEL':
-        p = params['period']
-        if i < p: return 0
-        res = max(hi[i-p:i])
-        sup = min(lo[i-p:i])
-        if c[i] > res: return 1
-        if c[i] < sup: return -1
-        return 0
 
-    if indicator_id == 'FIBONACCI':
-        lb = params['lookback']
-        if i < lb: return 0
-        swing_hi = max(hi[i-lb:i])
-        swing_lo = min(lo[i-lb:i])
-        diff = swing_hi - swing_lo
-        if diff == 0: return 0
-        fib618 = swing_hi - 0.618 * diff
-        fib382 = swing_hi - 0.382 * diff
-        if c[i] < fib618 and c[i] > fib382 * 0.99: return 1
-        if c[i] > fib382 and c[i] < fib618 * 1.01: return -1
-        return 0
+_HLC = ('highs', 'lows', 'closes')
+
+def _one(fn, *cols, keys=('period',)):
+    """Series spec list for fn(*cols, *params[keys])."""
+    return lambda p: [(fn, *cols, *(p[k] for k in keys))]
+
+def _with_rsi(series, key):
+    return lambda p: series(p) + [(_rsi, 'closes', p[key])]
+
+def _macd9(p):
+    return (_macd, 'closes', p['macd_fast'], p['macd_slow'], 9)
+
+def _stoch33(p):
+    return (_stoch, *_HLC, p['stoch_k'], 3, 3)
+
+def _emas(*keys):
+    return lambda p: [(_ema, 'closes', p[k]) for k in keys]
+
+
+# indicator_id → (series(params), rule(i, series, params, D), lookback(params))
+# series() lists the (fn, *args) series the rule reads, resolved through
+# _series in that order.  lookback() is the first bar index at which the rule
+# can return non-zero: every series it reads (including [i-1]) is defined.
+_RULES = {
+    # Trend
+    'SMA':      _trend_ma(_sma, lambda n: n - 1),
+    'EMA':      _trend_ma(_ema, lambda n: n - 1),
+    'WMA':      _trend_ma(_wma, lambda n: n - 1),
+    'HMA':      _trend_ma(_hma, _hma_first),
+    'DEMA':     _trend_ma(_dema, lambda n: 2 * n - 2),
+    'TEMA':     _trend_ma(_tema, lambda n: 3 * n - 3),
+    'ZLEMA':    _trend_ma(_zlema, lambda n: n - 1),
+    'MCGINLEY': _trend_ma(_mcginley, lambda n: n - 1),
+    'EMA_CROSS': _ma_cross(_ema, lambda n: n - 1),
+    'SMA_CROSS': _ma_cross(_sma, lambda n: n - 1),
+    'HMA_CROSS': _ma_cross(_hma, _hma_first),
+    'TRIPLE_EMA': (_emas('fast', 'mid', 'slow'), lambda i, s, p, D: _stacked(s, i),
+                   lambda p: max(p['fast'], p['mid'], p['slow']) - 1),
+    'ICHIMOKU': (_one(_ichimoku, 'highs', 'lows', keys=('tenkan', 'kijun')), _ichimoku_rule,
+                 lambda p: max(p['tenkan'], p['kijun']) - 1),
+    'PARABOLIC_SAR': (lambda p: [(_parabolic_sar, *_HLC)], _psar_rule, lambda p: 1),
+    'SUPERTREND': (lambda p: [(_supertrend, *_HLC, p['period'], p['mult']/10.0)], _supertrend_rule,
+                   lambda p: p['period']),
+    'EMA_BOUNCE': (_one(_ema, 'closes'), _ema_bounce_rule, lambda p: p['period']),
+    'MA_RIBBON': (lambda p: [(_ema, 'closes', q) for q in (5, 10, 20, 50)],
+                  lambda i, s, p, D: _stacked(s, i), lambda p: 49),
+
+    # Oscillator
+    'RSI':     (_one(_rsi, 'closes'), lambda i, s, p, D: _band(s[0], i, 35, 65), lambda p: p['period']),
+    'MACD':    (_one(_macd, 'closes', keys=('fast', 'slow', 'signal')), _macd_rule,
+                lambda p: max(p['fast'], p['slow']) + p['signal'] - 1),
+    'STOCH':   (_one(_stoch, *_HLC, keys=('k_period', 'k_smooth', 'd_smooth')), _stoch_rule,
+                lambda p: p['k_period'] + p['k_smooth'] + p['d_smooth'] - 3),
+    'CCI':     (_one(_cci, *_HLC), lambda i, s, p, D: _level(s[0], i, 100, -100), lambda p: p['period'] - 1),
+    'WILLIAMS_R': (_one(_williams_r, *_HLC), lambda i, s, p, D: _band(s[0], i, -80, -20),
+                   lambda p: p['period'] - 1),
+    'ROC':     (_one(_roc, 'closes'), _roc_rule, lambda p: p['period']),
+    'TRIX':    (_one(_trix, 'closes'), lambda i, s, p, D: _rising(s[0], i), lambda p: 3 * p['period'] - 2),
+    'DEMARKER': (_one(_demarker, *_HLC), lambda i, s, p, D: _band(s[0], i, 0.3, 0.7),
+                 lambda p: p['period'] - 1),
+    'ULTIMATE_OSC': (_one(_ultimate_osc, *_HLC, keys=('p1', 'p2', 'p3')),
+                     lambda i, s, p, D: _level(s[0], i, 70, 30),
+                     lambda p: max(p['p1'], p['p2'], p['p3']) + 1),
+    'AWESOME_OSC': (lambda p: [(_awesome_osc, 'highs', 'lows')], lambda i, s, p, D: _rising(s[0], i),
+                    lambda p: 34),
+    'ELDER_RAY': (_one(_elder_ray, 'closes'), _elder_ray_rule, lambda p: p['period'] - 1),
+    'FISHER':  (_one(_fisher, 'highs', 'lows'), lambda i, s, p, D: _rising(s[0], i), lambda p: p['period']),
+    'TSI':     (_one(_tsi, 'closes', keys=('r_period', 's_period')), lambda i, s, p, D: _level(s[0], i, 25, -25),
+                lambda p: p['r_period'] + p['s_period'] - 2),
+    'VORTEX':  (_one(_vortex, *_HLC), _vortex_rule, lambda p: p['period'] - 1),
+
+    # Volatility & Volume
+    'BOLLINGER':  (_one(_bollinger, 'closes'), _channel_rule, lambda p: p['period'] - 1),
+    'ATR':        (_one(_atr, *_HLC), _atr_rule, lambda p: p['period'] + 1),
+    'NATR':       (_one(_natr, *_HLC), _natr_rule, lambda p: p['period']),
+    'KELTNER':    (_one(_keltner, *_HLC), _channel_rule, lambda p: p['period']),
+    'SQUEEZE':    (_one(_squeeze, *_HLC), _squeeze_rule, lambda p: p['period']),
+    'STDEV':      (_one(_stdev, 'closes'), _stdev_rule, lambda p: p['period']),
+    'CHOPPINESS': (_one(_choppiness, *_HLC), _choppiness_rule, lambda p: p['period'] - 1),
+    'MFI':        (_one(_mfi, *_HLC, 'volumes'), lambda i, s, p, D: _band(s[0], i, 20, 80),
+                   lambda p: p['period']),
+    'CHAIKIN_MF': (_one(_chaikin_mf, *_HLC, 'volumes'), lambda i, s, p, D: _level(s[0], i, 0.1, -0.1),
+                   lambda p: p['period'] - 1),
+    'OBV':        (_one(_obv_ma, 'closes', 'volumes'), _obv_rule, lambda p: p['period'] - 1),
+
+    # Level / Channel
+    'DONCHIAN':   (_one(_donchian, 'highs', 'lows'), _donchian_rule, lambda p: p['period'] - 1),
+    'SUPPORT_RESISTANCE': (lambda p: _extremes(p, 'lookback'), _breakout('lookback'),
+                           lambda p: p['lookback']),
+    'PIVOT':      (lambda p: [(_pivot_points, *_HLC)], _pivot_rule, lambda p: 1),
+    'FRACTAL':    (_one(_williams_fractal, 'highs', 'lows', keys=('bars',)), _fractal_rule,
+                   lambda p: 2 * p['bars']),
+    'PRICE_CHANNEL': (lambda p: _extremes(p, 'period'), _breakout('period'), lambda p: p['period']),
+    'FIBONACCI':  (lambda p: _extremes(p, 'lookback'), _fibonacci_rule, lambda p: p['lookback']),
+    'KELTNER_BREAK': (_one(_keltner, *_HLC), _keltner_break_rule, lambda p: p['period'] + 1),
+
+    # Advanced / Custom
+    'ADX':        (_one(_adx, *_HLC), _adx_rule, lambda p: 2 * p['period'] - 1),
+    'STOCH_RSI':  (lambda p: [(_rsi, 'closes', p['rsi_period']), _stoch33(p)], _stoch_rsi_rule,
+                   lambda p: max(p['rsi_period'], p['stoch_k'] + 3)),
+    'MACD_RSI':   (lambda p: [_macd9(p), (_rsi, 'closes', p['rsi_period'])], _macd_rsi_rule,
+                   lambda p: max(max(p['macd_fast'], p['macd_slow']) + 7, p['rsi_period'])),
+    'TRIPLE_EMA_STOCH': (lambda p: _emas('fast', 'mid', 'slow')(p) + [_stoch33(p)], _triple_ema_stoch_rule,
+                         lambda p: max(p['fast'] - 1, p['mid'] - 1, p['slow'] - 1, p['stoch_k'] + 3)),
+    'MULTI_EMA_MOMENTUM': (_with_rsi(_emas('fast', 'slow'), 'rsi_p'), _multi_ema_momentum_rule,
+                           lambda p: max(p['fast'] - 1, p['slow'] - 1, p['rsi_p'])),
+    'SQUEEZE_BREAKOUT': (_with_rsi(_one(_squeeze, *_HLC), 'rsi_p'), _squeeze_breakout_rule,
+                         lambda p: max(p['period'], p['rsi_p'])),
+    'SUPERTREND_RSI': (_with_rsi(lambda p: [(_supertrend, *_HLC, p['st_period'], p['st_mult']/10.0)], 'rsi_p'),
+                       _supertrend_rsi_rule, lambda p: max(p['st_period'], p['rsi_p'])),
+    'ADX_MACD':   (lambda p: [(_adx, *_HLC, p['adx_p']), _macd9(p)], _adx_macd_rule,
+                   lambda p: max(2 * p['adx_p'] - 1, max(p['macd_fast'], p['macd_slow']) + 7)),
+    'ICHIMOKU_RSI': (_with_rsi(_one(_ichimoku, 'highs', 'lows', keys=('tenkan', 'kijun')), 'rsi_p'),
+                     _ichimoku_rsi_rule, lambda p: max(p['tenkan'] - 1, p['kijun'] - 1, p['rsi_p'])),
+    'BOLLINGER_RSI': (_with_rsi(_one(_bollinger, 'closes', keys=('bb_period',)), 'rsi_period'),
+                      _bollinger_rsi_rule, lambda p: max(p['bb_period'] - 1, p['rsi_period'])),
+    'VORTEX_ADX': (lambda p: [(_adx, *_HLC, p['period']), (_vortex, *_HLC, p['period'])], _vortex_adx_rule,
+                   lambda p: 2 * p['period'] - 1),
+    'CANDLE_PATTERN': (lambda p: [], _candle_pattern_rule, lambda p: 2),
+}
 
-    if indicator_id == 'KELTNER_BREAK':
-        upper, _, lower = _keltner(hi, lo, c, params['period'])
-        if upper[i] is None or lower[i-1] is None: return 0
-        if c[i] > upper[i] and c[i-1] <= upper[i-1]: return 1
-        if c[i] < lower[i] and c[i-1] >= lower[i-1]: return -1
-        return 0
 
-    # ── Advanced / Custom ────────────────────────────────────────────────────
-    if indicator_id == 'ADX':
-        adx, di_p, di_m = _adx(hi, lo, c, params['period'])
-        if adx[i] is None or di_p[i] is None: return 0
-        if adx[i] >= params.get('threshold', 25):
-            if di_p[i] > di_m[i]: return 1
-            if di_m[i] > di_p[i]: return -1
-        return 0
+# ══════════════════════════════════════════════════════════════════════════════
+# INDICATOR REGISTRY
+# ══════════════════════════════════════════════════════════════════════════════
 
-    if indicator_id == 'STOCH_RSI':
-        rsi = _rsi(c, params['rsi_period'])
-        sk, sd = _stoch(hi, lo, c, params['stoch_k'])
-        if rsi[i] is None or sk[i] is None or sd[i] is None: return 0
-        if rsi[i] < 50 and sk[i] > sd[i] and sk[i] < 80: return 1
-        if rsi[i] > 50 and sk[i] < sd[i] and sk[i] > 20: return -1
-        return 0
+@dataclass(frozen=True)
+class IndicatorSpec:
+    """
+    Registry entry for one INDICATOR_CATALOG indicator: its metadata and
+    parameter schema, the series it computes, its per-bar signal rule and its
+    exact lookback (first bar with a possible signal) as a function of params.
+    """
+    indicator_id: str
+    category: str
+    label: str
+    params: dict                 # name → (lo, hi)
+    defaults: dict
+    series: Callable             # params → [(fn, *args), ...]
+    rule: Callable               # (i, resolved series, params, D) → +1 / -1 / 0
+    lookback_fn: Callable        # params → first bar index
 
-    if indicator_id == 'MACD_RSI':
-        _, _, hist = _macd(c, params['macd_fast'], params['macd_slow'], 9)
-        rsi = _rsi(c, params['rsi_period'])
-        if hist[i] is None or rsi[i] is None: return 0
-        if hist[i] > 0 and rsi[i] > 40 and rsi[i] < 70: return 1
-        if hist[i] < 0 and rsi[i] < 60 and rsi[i] > 30: return -1
-        return 0
+    def resolve(self, params: dict, D: dict) -> list:
+        """The indicator's series on D (through its SeriesCache)."""
+        return [_series(D, *key) for key in self.series(params)]
 
-    if indicator_id == 'TRIPLE_EMA_STOCH':
-        e1 = _ema(c, params['fast'])
-        e2 = _ema(c, params['mid'])
-        e3 = _ema(c, params['slow'])
-        sk, sd = _stoch(hi, lo, c, params['stoch_k'])
-        if any(v is None for v in [e1[i], e2[i], e3[i], sk[i], sd[i]]): return 0
-        if e1[i] > e2[i] > e3[i] and sk[i] > sd[i] and sk[i] < 80: return 1
-        if e1[i] < e2[i] < e3[i] and sk[i] < sd[i] and sk[i] > 20: return -1
-        return 0
+    def signal(self, i: int, params: dict, D: dict) -> int:
+        return self.rule(i, self.resolve(params, D), params, D)
 
-    if indicator_id == 'MULTI_EMA_MOMENTUM':
-        fast = _ema(c, params['fast'])
-        slow = _ema(c, params['slow'])
-        rsi  = _rsi(c, params['rsi_p'])
-        if any(v is None for v in [fast[i], slow[i], rsi[i]]): return 0
-        if fast[i] > slow[i] and rsi[i] < 60: return 1
-        if fast[i] < slow[i] and rsi[i] > 40: return -1
-        return 0
+    def lookback(self, params: Optional[dict] = None) -> int:
+        return self.lookback_fn({**self.defaults, **(params or {})})
 
-    if indicator_id == 'SQUEEZE_BREAKOUT':
-        sq, mom = _squeeze(hi, lo, c, params['period'])
-        rsi = _rsi(c, params['rsi_p'])
-        if sq[i] is None or mom[i] is None or rsi[i] is None: return 0
-        if not sq[i] and mom[i] > 0 and rsi[i] > 45: return 1
-        if not sq[i] and mom[i] < 0 and rsi[i] < 55: return -1
-        return 0
 
-    if indicator_id == 'SUPERTREND_RSI':
-        _, direction = _supertrend(hi, lo, c, params['st_period'], params['st_mult']/10.0)
-        rsi = _rsi(c, params['rsi_p'])
-        if direction[i] is None or rsi[i] is None: return 0
-        if direction[i] == -1 and rsi[i] < 65: return 1
-        if direction[i] == 1  and rsi[i] > 35: return -1
-        return 0
+INDICATORS = {
+    iid: IndicatorSpec(iid, cat['category'], cat['label'], cat['params'], cat['defaults'], *_RULES[iid])
+    for iid, cat in INDICATOR_CATALOG.items()
+}
 
-    if indicator_id == 'ADX_MACD':
-        adx, di_p, di_m = _adx(hi, lo, c, params['adx_p'])
-        _, _, hist = _macd(c, params['macd_fast'], params['macd_slow'], 9)
-        if adx[i] is None or hist[i] is None: return 0
-        if adx[i] >= params['adx_th']:
-            if hist[i] > 0 and di_p[i] is not None and di_p[i] > di_m[i]: return 1
-            if hist[i] < 0 and di_m[i] is not None and di_m[i] > di_p[i]: return -1
-        return 0
 
-    if indicator_id == 'ICHIMOKU_RSI':
-        ten, kij = _ichimoku(hi, lo, params['tenkan'], params['kijun'])
-        rsi = _rsi(c, params['rsi_p'])
-        if ten[i] is None or kij[i] is None or rsi[i] is None: return 0
-        if ten[i] > kij[i] and c[i] > kij[i] and rsi[i] < 65: return 1
-        if ten[i] < kij[i] and c[i] < kij[i] and rsi[i] > 35: return -1
-        return 0
+def get_signal_at(i, indicator_id, params, D):
+    """
+    Return +1 (CALL), -1 (PUT), 0 (neutral).
+    D should come from build_dataset() so indicator series are computed once
+    and cached; a plain column dict still works but recomputes on every call.
+    """
+    spec = INDICATORS.get(indicator_id)
+    return spec.signal(i, params, D) if spec is not None else 0
 
-    if indicator_id == 'BOLLINGER_RSI':
-        upper, _, lower = _bollinger(c, params['bb_period'])
-        rsi = _rsi(c, params['rsi_period'])
-        if upper[i] is None or rsi[i] is None: return 0
-        if c[i] <= lower[i] and rsi[i] < 40: return 1
-        if c[i] >= upper[i] and rsi[i] > 60: return -1
-        return 0
 
-    if indicator_id == 'VORTEX_ADX':
-        adx, _, _ = _adx(hi, lo, c, params['period'])
-        vp, vm    = _vortex(hi, lo, c, params['period'])
-        if adx[i] is None or vp[i] is None: return 0
-        if adx[i] >= params['adx_th']:
-            if vp[i] > vm[i]: return 1
-            if vm[i] > vp[i]: return -1
-        return 0
+def indicator_lookback(indicator_id: str, params: Optional[dict] = None) -> int:
+    """First bar index at which indicator_id(params) can signal (0 if unknown)."""
+    spec = INDICATORS.get(indicator_id)
+    return spec.lookback(params) if spec is not None else 0
 
-    if indicator_id == 'CANDLE_PATTERN':
-        if i < 2: return 0
-        # Bullish Engulfing
-        if (c[i-1] < opens[i-1] and      # prev bearish
-            c[i]   > opens[i]   and      # curr bullish
-            opens[i] <= c[i-1]  and      # opens below prev close
-            c[i] >= opens[i-1]):         # closes above prev open
-            return 1
-        # Bearish Engulfing
-        if (c[i-1] > opens[i-1] and
-            c[i]   < opens[i]   and
-            opens[i] >= c[i-1]  and
-            c[i] <= opens[i-1]):
-            return -1
-        # Hammer (bullish)
-        body = abs(c[i] - opens[i])
-        lower_wick = opens[i] - lo[i] if c[i] > opens[i] else c[i] - lo[i]
-        upper_wick = hi[i] - c[i] if c[i] > opens[i] else hi[i] - opens[i]
-        if body > 0 and lower_wick > 2*body and upper_wick < 0.5*body: return 1
-        if body > 0 and upper_wick > 2*body and lower_wick < 0.5*body: return -1
-        return 0
 
-    return 0
+def strategy_lookback(strategy) -> int:
+    """First bar index at which every indicator of the strategy is warmed up."""
+    return max((indicator_lookback(ind.indicator_id, ind.params)
+                for ind in strategy.indicators), default=0)
 
 
 # ══════════════════════════════════════════════════════════════════════════════
@@ -1407,27 +1759,340 @@ class StrategyResult:
     sim_final_balance: float = 0.0
     sim_max_drawdown: float = 0.0
     trades: list = None  # List of individual trade records
+    expiry: int = 1      # candles per trade (entry at bar+1 open, exit at bar+expiry close)
+    breakdown: dict = None  # by hour / weekday / session (sessions.breakdown), with trade records
 
     def __post_init__(self):
         if self.trades is None:
             self.trades = []
 
 
+@dataclass
+class Outcomes:
+    """
+    Money-independent result of a strategy's signals: one entry per trade
+    signal, in bar order.  bars[k] is the signal bar (the trade opens at
+    bar + 1 and closes at the close of bar + expiry), votes[k] is +1 CALL /
+    -1 PUT, won[k] whether it finished in the money.
+    """
+    bars: list
+    votes: list
+    won: list
+    expiry: int = 1
+
+    def __len__(self):
+        return len(self.bars)
+
+    @property
+    def nbytes(self) -> int:      # SeriesCache accounting
+        return 3 * 32 * len(self.bars)
+
+
 # ══════════════════════════════════════════════════════════════════════════════
 # BACKTEST ENGINE
 # ══════════════════════════════════════════════════════════════════════════════
 
-def backtest_strategy(candles: list, strategy: StrategyConfig,
-                      trading: TradingConfig, warmup: int = 70) -> Optional[StrategyResult]:
-    if len(candles) < warmup + 10:
+MIN_TRADES = 10   # fewer trades than this → no StrategyResult
+
+def _signal_column(ind: IndicatorConfig, D: dict) -> list:
+    """
+    get_signal_at for every bar of D, cached on D's SeriesCache so each
+    distinct IndicatorConfig is evaluated once however many strategies use
+    it.  A bar where the indicator raises counts as no vote.
+    """
+    def compute():
+        col = []
+        for i in range(len(D['closes'])):
+            try:
+                col.append(get_signal_at(i, ind.indicator_id, ind.params, D))
+            except Exception:
+                col.append(0)
+        return col
+    cache = D.get('cache')
+    if cache is None:
+        return compute()
+    return cache.get(('votes', ind.indicator_id, tuple(sorted(ind.params.items()))), compute)
+
+
+def entry_signals(strategy: StrategyConfig, D: dict,
+                  start: int = 0, stop: Optional[int] = None) -> list:
+    """
+    [(bar, +1 | -1)] for every bar in [start, stop) where the strategy's
+    indicators agree.  With NumPy the whole-array signal vectors are combined
+    in one pass (and cached on D); otherwise the per-bar get_signal_at columns
+    (also cached on D) are combined bar by bar.
+    """
+    n = len(D['closes'])
+    stop = n if stop is None else min(stop, n)
+    start = max(start, 0)
+    if start >= stop:
+        return []
+    if _signals_np is None:
+        return _combine_columns(strategy, D, start, stop)
+    return _vector_entries(_signals_np.entry_vector(strategy, D), start, stop)
+
+
+def _combine_columns(strategy: StrategyConfig, D: dict, start: int, stop: int) -> list:
+    """Pure-Python entry_signals: per-bar vote over the cached signal columns."""
+    cols = [_signal_column(ind, D) for ind in strategy.indicators]
+    m = strategy.min_agreement
+    out = []
+    for i in range(start, stop):
+        call_v = put_v = 0
+        for col in cols:
+            v = col[i]
+            if v > 0:
+                call_v += 1
+            elif v < 0:
+                put_v += 1
+        if call_v >= m and call_v > put_v:
+            out.append((i, 1))
+        elif put_v >= m and put_v > call_v:
+            out.append((i, -1))
+    return out
+
+
+def _vector_entries(vec, start: int, stop: int) -> list:
+    """[(bar, vote)] of the non-zero bars of an entry vector in [start, stop)."""
+    entries = vec[start:stop]
+    bars = _np_engine.np.flatnonzero(entries)
+    return list(zip((bars + start).tolist(), entries[bars].tolist()))
+
+
+def _candidate_entries(strategy: StrategyConfig, D: dict, start: int, stop: int,
+                       min_trades: int = MIN_TRADES):
+    """
+    entry_signals, or None when fewer than min_trades entries exist — with
+    NumPy that is decided by a popcount of the entry bitsets, before the
+    entry list is built.
+    """
+    if _signals_np is None:
+        entries = entry_signals(strategy, D, start, stop)
+        return entries if len(entries) >= min_trades else None
+    bits = _signals_np.entry_bits(strategy, D)
+    if _signals_np.popcount(bits[0] | bits[1], start, stop) < min_trades:
+        return None
+    return _vector_entries(_signals_np.entry_vector(strategy, D, bits), start, stop)
+
+
+def _strategy_key(strategy: StrategyConfig) -> tuple:
+    return (strategy.min_agreement,
+            tuple((ind.indicator_id, tuple(sorted(ind.params.items())))
+                  for ind in strategy.indicators))
+
+
+def _outcomes(strategy: StrategyConfig, D: dict, warmup: int, expiries,
+              min_trades: int) -> dict:
+    """
+    {expiry: Outcomes or None} from one entry scan: the entries in
+    [warmup, n-1) are found once and every expiry's win column is read off
+    the same bars (a single 2-D gather with NumPy).  An expiry keeps the
+    entries whose exit bar exists.
+    """
+    n = len(D['closes'])
+    none = dict.fromkeys(expiries)
+    if n < warmup + 10:
+        return none
+    entries = _candidate_entries(strategy, D, warmup, n - 1, min_trades)
+    if entries is None:
+        return none
+    bars  = [i for i, _ in entries]
+    votes = [v for _, v in entries]
+    out = {}
+    if _signals_np is not None:
+        np = _np_engine.np
+        arrays = _signals_np.dataset_arrays(D)
+        b, calls = np.asarray(bars), np.asarray(votes) > 0
+        exp = np.asarray(expiries)
+        o = arrays['opens'][b + 1][:, None]
+        c = arrays['closes'][np.minimum(b[:, None] + exp[None, :], n - 1)]
+        won = np.where(calls[:, None], c > o, c < o)
+        for j, e in enumerate(expiries):
+            k = bisect_left(bars, n - e)          # entries with bar + e <= n - 1
+            out[e] = Outcomes(bars[:k], votes[:k], won[:k, j].tolist(), e) if k >= min_trades else None
+    else:
+        opens, closes = D['opens'], D['closes']
+        for e in expiries:
+            k = bisect_left(bars, n - e)
+            won = [(closes[i + e] > opens[i + 1]) if v > 0 else (closes[i + e] < opens[i + 1])
+                   for i, v in entries[:k]]
+            out[e] = Outcomes(bars[:k], votes[:k], won, e) if k >= min_trades else None
+    return out
+
+
+def outcome_sequence(strategy: StrategyConfig, D: dict, warmup: Optional[int] = None,
+                     cache: bool = True, min_trades: int = MIN_TRADES,
+                     expiry: int = 1) -> Optional[Outcomes]:
+    """
+    Stage one of a backtest: the strategy's entries in [warmup, n-1) and
+    whether each one won at `expiry` candles — everything that depends on
+    indicators and none of TradingConfig.  None when there are fewer than
+    min_trades entries.  Cached on D (unless cache=False), so re-simulating
+    the same strategy with other money settings skips all indicator work.
+    """
+    return outcome_expiries(strategy, D, (expiry,), warmup, cache, min_trades)[expiry]
+
+
+def outcome_expiries(strategy: StrategyConfig, D: dict, expiries=(1, 2, 3, 5),
+                     warmup: Optional[int] = None, cache: bool = True,
+                     min_trades: int = MIN_TRADES) -> dict:
+    """
+    outcome_sequence for several expiries at once: {expiry: Outcomes or None},
+    computed in one pass over the shared entries (see _outcomes).  Each
+    expiry is cached on D under the same key outcome_sequence uses.
+    """
+    if warmup is None:
+        warmup = strategy_lookback(strategy)
+    expiries = sorted(set(expiries))
+    store = D.get('cache') if cache else None
+    if store is None:
+        return _outcomes(strategy, D, warmup, expiries, min_trades)
+    sk = _strategy_key(strategy)
+    keys = {e: ('outcomes', sk, warmup, min_trades, e) for e in expiries}
+    missing = [e for e in expiries if keys[e] not in store]
+    fresh = _outcomes(strategy, D, warmup, missing, min_trades) if missing else {}
+
+    def compute(e):
+        if e in fresh:
+            return fresh[e]
+        return _outcomes(strategy, D, warmup, (e,), min_trades)[e]    # evicted meanwhile
+    return {e: store.get(keys[e], lambda e=e: compute(e)) for e in expiries}
+
+
+def backtest_strategy(candles, strategy: StrategyConfig,
+                      trading: TradingConfig, warmup: Optional[int] = None,
+                      dataset: Optional[dict] = None,
+                      record_trades: bool = True,
+                      min_win_rate: Optional[float] = None,
+                      expiry: int = 1,
+                      sessions: Optional[List[str]] = None,
+                      validation: Optional[str] = None,
+                      folds: int = 5) -> Union[StrategyResult, 'ValidationResult', None]:
+    """
+    Simulate strategy over candles: outcome_sequence (signals, cached on the
+    dataset) then the money-management walk.  expiry: candles per trade
+    (1 = the signal's next candle, close vs open).  Pass `dataset` (from
+    build_dataset) when backtesting many strategies — or one strategy under
+    several TradingConfigs — on the same candles, so indicator series and
+    outcomes are shared through its SeriesCache instead of rebuilt per call.
+    warmup defaults to strategy_lookback(strategy): the first bar at which
+    every indicator of the strategy is defined.
+    candles: a CandleFrame (or candle dicts, converted once here).
+    record_trades=False keeps only the statistics (result.trades stays empty);
+    the same call with record_trades=True rebuilds the identical trade log.
+    min_win_rate: pruning bound (percent).  The simulation stops and returns
+    None as soon as the final win rate provably stays below it.
+    sessions: trade only entries inside these SESSIONS (e.g. ['London']);
+    the cached outcome sequence is filtered, indicators are not re-run.
+    validation: 'walk_forward' | 'kfold' returns a ValidationResult instead,
+    the strategy's train- and test-range figures on each of `folds`
+    validation_folds.  Nothing is selected on the train ranges, so for a
+    fixed strategy this is a stability check (does the win rate hold from
+    one period to the next?) rather than an out-of-sample score; see
+    StrategyGenerator(validation=...) for that.
+    """
+    D = dataset if dataset is not None else build_dataset(candles)
+    if validation:
+        return _fixed_folds(strategy, D, trading, validation, folds, warmup, expiry, sessions)
+    outcomes = _outcomes_in_sessions(outcome_sequence(strategy, D, warmup, expiry=expiry),
+                                     D, sessions)
+    if outcomes is None:
         return None
+    return _simulate(strategy, outcomes, D, trading, record_trades, min_win_rate)
+
+
+def backtest_expiries(candles, strategy: StrategyConfig, trading: TradingConfig,
+                      expiries=(1, 2, 3, 5), warmup: Optional[int] = None,
+                      dataset: Optional[dict] = None,
+                      record_trades: bool = False,
+                      sessions: Optional[List[str]] = None) -> dict:
+    """
+    backtest_strategy at several expiries from one signal pass:
+    {expiry: StrategyResult or None}.  Trades of longer expiries may overlap
+    in time; the money walk still takes them one after another.
+    """
+    D = dataset if dataset is not None else build_dataset(candles)
+    outs = outcome_expiries(strategy, D, expiries, warmup).items()
+    return {e: None if o is None else _simulate(strategy, o, D, trading, record_trades)
+            for e, o in ((e, _outcomes_in_sessions(o, D, sessions)) for e, o in outs)}
+
+
+def _best_result(results) -> Optional[StrategyResult]:
+    """The result the generator ranks highest (win rate, then trade count)."""
+    results = [r for r in results if r is not None]
+    return min(results, key=lambda r: (-r.win_rate, -r.total_trades), default=None)
+
+
+def backtest_many(candles, strategies: List[StrategyConfig], trading: TradingConfig,
+                  dataset: Optional[dict] = None,
+                  record_trades: bool = True,
+                  min_win_rate: Optional[float] = None,
+                  expiries=(1,),
+                  sessions: Optional[List[str]] = None) -> List[Optional[StrategyResult]]:
+    """
+    backtest_strategy for a batch of candidates on the same candles: the
+    dataset and OHLC columns are prepared once, each distinct IndicatorConfig
+    is evaluated once across the batch (its signal vector / column is cached
+    on the dataset), and only the vote combination and trade simulation run
+    per candidate.  Returns one StrategyResult (or None) per strategy, in order.
+    record_trades / min_win_rate: as for backtest_strategy.
+    expiries: each candidate is simulated at every expiry (one signal pass)
+    and its best result is returned; result.expiry tells which.
+    sessions: score only the entries inside these trading sessions.
+    """
+    D = dataset if dataset is not None else build_dataset(candles)
+    results = []
+    for strategy in strategies:
+        # one-off candidates: keep their outcomes out of the series cache
+        outs = [_outcomes_in_sessions(o, D, sessions)
+                for o in outcome_expiries(strategy, D, expiries, cache=False).values()]
+        results.append(_best_result(
+            _simulate(strategy, o, D, trading, record_trades, min_win_rate)
+            for o in outs if o is not None))
+    return results
+
+
+def sweep_trading(candles, strategy: StrategyConfig, tradings: List[TradingConfig],
+                  dataset: Optional[dict] = None, expiry: int = 1,
+                  sessions: Optional[List[str]] = None) -> List[Optional[StrategyResult]]:
+    """
+    One strategy under many money-management settings: the outcome sequence
+    is computed (or fetched from the dataset cache) once and only the
+    balance walk runs per TradingConfig.  Results carry no trade records.
+    """
+    D = dataset if dataset is not None else build_dataset(candles)
+    outcomes = _outcomes_in_sessions(outcome_sequence(strategy, D, expiry=expiry), D, sessions)
+    if outcomes is None:
+        return [None] * len(tradings)
+    return [_simulate(strategy, outcomes, D, t, record_trades=False) for t in tradings]
+
+
+def trading_grid(base: TradingConfig, **axes) -> List[TradingConfig]:
+    """
+    Every combination of the given TradingConfig fields on top of base, e.g.
+    trading_grid(cfg, martingale_steps=[0, 1, 2, 3], martingale_multiplier=[1.5, 2.0]).
+    """
+    names = list(axes)
+    return [replace(base, **dict(zip(names, values)))
+            for values in itertools.product(*(axes[k] for k in names))]
+
 
-    c   = [x['close']           for x in candles]
-    hi  = [x['high']            for x in candles]
-    lo  = [x['low']             for x in candles]
-    op  = [x['open']            for x in candles]
-    vol = [x.get('volume', 1)   for x in candles]
-    D   = {'closes': c, 'highs': hi, 'lows': lo, 'opens': op, 'volumes': vol}
+def _simulate(strategy: StrategyConfig, outcomes: Outcomes, D: dict,
+              trading: TradingConfig, record_trades: bool = True,
+              min_win_rate: Optional[float] = None,
+              min_trades: int = MIN_TRADES) -> Optional[StrategyResult]:
+    """
+    Stage two of a backtest: walk the outcome sequence with trading's money
+    management (stake, martingale, stop-win / stop-loss); None when fewer
+    than min_trades (at least one) trades were taken.  D supplies prices and
+    times for the trade records; record_trades=False skips them and keeps
+    only the statistics.  With min_win_rate, each loss
+    checks the best reachable win rate — every remaining entry winning,
+    (wins + left) / (wins + losses + left) — and gives up (None) once even
+    that rounds below the bound.
+    """
+    opens, closes, times = D['opens'], D['closes'], D['times']
+    expiry = outcomes.expiry
 
     wins = losses = 0
     consec_w = consec_l = max_cw = max_cl = 0
@@ -1439,36 +2104,10 @@ def backtest_strategy(candles: list, strategy: StrategyConfig,
     max_drawdown  = 0.0
     peak          = trading.modal
     trade_records = []
+    left = len(outcomes)
 
-    for i in range(warmup, len(candles) - 1):
-        votes = []
-        for ind in strategy.indicators:
-            try:
-                s = get_signal_at(i, ind.indicator_id, ind.params, D)
-                if s != 0:
-                    votes.append(s)
-            except Exception:
-                pass
-
-        if len(votes) < strategy.min_agreement:
-            continue
-
-        call_v = votes.count(1)
-        put_v  = votes.count(-1)
-
-        if call_v >= strategy.min_agreement and call_v > put_v:
-            direction = 'call'
-        elif put_v >= strategy.min_agreement and put_v > call_v:
-            direction = 'put'
-        else:
-            continue
-
-        entry   = candles[i + 1]['open']
-        exit_px = candles[i + 1]['close']
-        candle_time = candles[i + 1].get('time', i + 1)
-        won = ((direction == 'call' and exit_px > entry) or
-               (direction == 'put'  and exit_px < entry))
-
+    for i, vote, won in zip(outcomes.bars, outcomes.votes, outcomes.won):
+        left -= 1
         bet = min(cur_amount, balance)
         if won:
             profit = bet * trading.payout
@@ -1487,6 +2126,9 @@ def backtest_strategy(candles: list, strategy: StrategyConfig,
             consec_l += 1; consec_w = 0
             max_cl = max(max_cl, consec_l)
             trade_pnl = round(-bet, 4)
+            if min_win_rate is not None and \
+                    round((wins + left) / (wins + losses + left) * 100, 2) < min_win_rate:
+                return None
             if mrt_step < trading.martingale_steps:
                 mrt_step  += 1
                 cur_amount = trading.amount * (trading.martingale_multiplier ** mrt_step)
@@ -1499,38 +2141,58 @@ def backtest_strategy(candles: list, strategy: StrategyConfig,
         max_drawdown = max(max_drawdown, dd)
 
         # Record individual trade
-        trade_records.append({
-            'no':        len(trade_records) + 1,
-            'time':      candle_time,
-            'direction': direction.upper(),
-            'entry':     round(entry, 6),
-            'exit':      round(exit_px, 6),
-            'bet':       round(bet, 2),
-            'pnl':       trade_pnl,
-            'won':       won,
-            'balance':   round(balance, 2),
-            'mrt_step':  mrt_step,
-        })
+        if record_trades:
+            trade_records.append({
+                'no':        len(trade_records) + 1,
+                'time':      times[i + 1],
+                'direction': 'CALL' if vote > 0 else 'PUT',
+                'entry':     round(opens[i + 1], 6),
+                'exit':      round(closes[i + expiry], 6),
+                'bet':       round(bet, 2),
+                'pnl':       trade_pnl,
+                'won':       won,
+                'balance':   round(balance, 2),
+                'mrt_step':  mrt_step,
+            })
 
         if total_profit >= trading.stop_win:
             break
         if total_profit <= -trading.stop_loss:
             break
 
-    total = wins + losses
-    if total < 10:
-        return None
+    by_session = None
+    if record_trades and wins + losses >= max(1, min_trades):
+        taken = wins + losses                 # stop-win / stop-loss may end the walk early
+        by_session = _sessions.breakdown([i + 1 for i in outcomes.bars[:taken]],
+                                         outcomes.won[:taken], trading.payout,
+                                         _sessions.dataset_buckets(D))
+    return _sim_result(strategy, trading, wins, losses, max_cw, max_cl, total_profit,
+                       balance, max_drawdown, trade_records, min_trades, expiry, by_session)
 
-    win_rate = wins / total * 100
-    net_pnl  = wins * trading.payout - losses
-    score    = win_rate * math.log1p(total)
 
-    indicators_desc = '; '.join(
+def _indicators_desc(strategy: StrategyConfig) -> str:
+    """'Exponential MA (EMA)(period=21); ...' — the strategy's indicators for display."""
+    return '; '.join(
         f"{INDICATOR_CATALOG.get(ind.indicator_id, {}).get('label', ind.indicator_id)}"
         f"({', '.join(f'{k}={v}' for k, v in ind.params.items())})"
         for ind in strategy.indicators
     )
 
+
+def _sim_result(strategy: StrategyConfig, trading: TradingConfig, wins: int, losses: int,
+                max_cw: int, max_cl: int, total_profit: float, balance: float,
+                max_drawdown: float, trade_records: list,
+                min_trades: int = MIN_TRADES, expiry: int = 1,
+                breakdown: Optional[dict] = None) -> Optional[StrategyResult]:
+    """StrategyResult from the totals of a money walk (None below min_trades)."""
+    total = wins + losses
+    if total < max(1, min_trades):
+        return None
+
+    win_rate = wins / total * 100
+    net_pnl  = wins * trading.payout - losses
+    score    = win_rate * math.log1p(total)
+
     return StrategyResult(
         config=strategy,
         win_rate=round(win_rate, 2),
@@ -1541,14 +2203,313 @@ def backtest_strategy(candles: list, strategy: StrategyConfig,
         max_consec_loss=max_cl,
         max_consec_win=max_cw,
         score=round(score, 2),
-        indicators_desc=indicators_desc,
+        indicators_desc=_indicators_desc(strategy),
         sim_profit=round(total_profit, 2),
         sim_final_balance=round(balance, 2),
         sim_max_drawdown=round(max_drawdown, 2),
         trades=trade_records,
+        expiry=expiry,
+        breakdown=breakdown,
     )
 
 
+# ══════════════════════════════════════════════════════════════════════════════
+# OUT-OF-SAMPLE VALIDATION
+# ══════════════════════════════════════════════════════════════════════════════
+# The generator scores candidates on the candles it searched, so its win
+# rates are in-sample.  With validation on, every candidate the search draws
+# is also scored on each fold's train range alone, and each fold keeps its
+# own top-N of train results; afterwards those fold winners are replayed on
+# that fold's test range only.  The test figures are out-of-sample: neither
+# the selection nor the parameters ever saw the test bars.
+#   walk_forward  k rolling windows — train on segment j, test on segment j+1
+#   kfold         k contiguous test segments, each trained on the rest
+# Indicators are causal, so a fold's outcomes are a slice of the candidate's
+# outcomes on the full history: the fold search costs no extra signal pass.
+# A trade counts in a range only if it also settles there (_outcomes_in), so
+# with expiry > 1 the last expiry - 1 bars before a test range stay unused by
+# training.  The test replay runs on the search workers' shared candles when
+# workers > 1, one process per group of folds.
+
+VALIDATION_MODES = ('walk_forward', 'kfold')
+
+
+def validation_folds(n: int, mode: str = 'walk_forward', k: int = 5) -> list:
+    """
+    [(train_ranges, test_range)] bar ranges ([start, stop) tuples) of the k
+    folds over n candles.
+    """
+    if mode not in VALIDATION_MODES:
+        raise ValueError(f'Unknown validation mode: {mode}')
+    k = max(1, k)
+    if mode == 'walk_forward':
+        seg = n // (k + 1)
+        return [([(j * seg, (j + 1) * seg)], ((j + 1) * seg, (j + 2) * seg if j < k - 1 else n))
+                for j in range(k)]
+    seg = n // k
+    bounds = [j * seg for j in range(k)] + [n]
+    folds = []
+    for j in range(k):
+        test = (bounds[j], bounds[j + 1])
+        train = [r for r in ((0, test[0]), (test[1], n)) if r[0] < r[1]]
+        folds.append((train, test))
+    return folds
+
+
+@dataclass
+class FoldResult:
+    """One strategy selected on a fold's train range, and how it did on the test range."""
+    fold: int
+    train: list             # [(start_bar, stop_bar)]
+    test: tuple             # (start_bar, stop_bar)
+    config: StrategyConfig
+    indicators_desc: str = ''
+    expiry: int = 1
+    train_trades: int = 0
+    train_wins: int = 0
+    test_trades: int = 0
+    test_wins: int = 0
+    test_profit: float = 0.0
+    test_max_drawdown: float = 0.0
+
+    @property
+    def train_win_rate(self) -> float:
+        return round(self.train_wins / self.train_trades * 100, 2) if self.train_trades else 0.0
+
+    @property
+    def test_win_rate(self) -> float:
+        return round(self.test_wins / self.test_trades * 100, 2) if self.test_trades else 0.0
+
+
+def _win_rate(rows: List[FoldResult], side: str) -> float:
+    t = sum(getattr(f, f'{side}_trades') for f in rows)
+    return round(sum(getattr(f, f'{side}_wins') for f in rows) / t * 100, 2) if t else 0.0
+
+
+@dataclass
+class ValidationResult:
+    """
+    Validation report: folds[j] holds the strategies of fold j, each scored
+    on fold j's test range — a generator run's top-N chosen on that fold's
+    train range (best first, out-of-sample), or the one fixed strategy of
+    backtest_strategy(validation=...).
+    """
+    mode: str
+    folds: List[List[FoldResult]]
+    candidates: int = 0     # candidates searched, each scored on every fold (1 = fixed strategy)
+
+    @property
+    def rows(self) -> List[FoldResult]:
+        return [f for fold in self.folds for f in fold]
+
+    @property
+    def test_trades(self) -> int:
+        return sum(f.test_trades for f in self.rows)
+
+    @property
+    def test_win_rate(self) -> float:
+        """Combined test win rate of every fold's selected strategies."""
+        return _win_rate(self.rows, 'test')
+
+    @property
+    def train_win_rate(self) -> float:
+        """The same strategies on the ranges they were selected on (in-sample)."""
+        return _win_rate(self.rows, 'train')
+
+    @property
+    def top_test_win_rate(self) -> float:
+        """Combined test win rate of each fold's single best train strategy."""
+        return _win_rate([fold[0] for fold in self.folds if fold], 'test')
+
+    def as_dict(self) -> dict:
+        return {
+            'mode':              self.mode,
+            'candidates':        self.candidates,
+            'train_win_rate':    self.train_win_rate,
+            'test_win_rate':     self.test_win_rate,
+            'top_test_win_rate': self.top_test_win_rate,
+            'test_trades':       self.test_trades,
+            'test_profit':       round(sum(f.test_profit for f in self.rows), 2),
+            'folds': [{
+                'fold':           j,
+                'train':          fold[0].train if fold else [],
+                'test':           fold[0].test if fold else None,
+                'selected':       len(fold),
+                'train_win_rate': _win_rate(fold, 'train'),
+                'test_win_rate':  _win_rate(fold, 'test'),
+                'test_trades':    sum(f.test_trades for f in fold),
+                'test_profit':    round(sum(f.test_profit for f in fold), 2),
+                'strategies': [{
+                    'indicators_desc':   f.indicators_desc,
+                    'min_agreement':     f.config.min_agreement,
+                    'expiry':            f.expiry,
+                    'train_trades':      f.train_trades,
+                    'train_win_rate':    f.train_win_rate,
+                    'test_trades':       f.test_trades,
+                    'test_win_rate':     f.test_win_rate,
+                    'test_profit':       f.test_profit,
+                    'test_max_drawdown': f.test_max_drawdown,
+                } for f in fold],
+            } for j, fold in enumerate(self.folds)],
+        }
+
+
+def _fold_test(row: FoldResult, outcomes: Optional[Outcomes], D: dict,
+               trading: TradingConfig) -> FoldResult:
+    """Fill row's test figures from outcomes (whole history) cut to its test range."""
+    if outcomes is not None:
+        te = _outcomes_in(outcomes, [row.test])
+        row.test_trades, row.test_wins = len(te), sum(te.won)
+        sim = _simulate(row.config, te, D, trading, record_trades=False, min_trades=1)
+        if sim is not None:
+            row.test_profit, row.test_max_drawdown = sim.sim_profit, sim.sim_max_drawdown
+    return row
+
+
+def _fixed_folds(strategy: StrategyConfig, D: dict, trading: TradingConfig, mode: str,
+                 k: int, warmup: Optional[int], expiry: int,
+                 sessions: Optional[List[str]]) -> ValidationResult:
+    """backtest_strategy(validation=mode): one strategy's figures on every fold."""
+    outcomes = _outcomes_in_sessions(
+        outcome_sequence(strategy, D, warmup, min_trades=1, expiry=expiry), D, sessions)
+    desc = _indicators_desc(strategy)
+    folds = []
+    for j, (train, test) in enumerate(validation_folds(len(D['closes']), mode, k)):
+        row = FoldResult(j, train, test, strategy, desc, expiry)
+        if outcomes is not None:
+            tr = _outcomes_in(outcomes, train)
+            row.train_trades, row.train_wins = len(tr), sum(tr.won)
+        folds.append([_fold_test(row, outcomes, D, trading)])
+    return ValidationResult(mode, folds, candidates=1)
+
+
+def pool_context():
+    """
+    multiprocessing context for worker pools: fork (workers inherit data
+    without copying) from a single-threaded process; forkserver / spawn when
+    other threads are running (the web app), where forking can deadlock.
+    """
+    methods = multiprocessing.get_all_start_methods()
+    if 'fork' in methods and threading.active_count() == 1:
+        return multiprocessing.get_context('fork')
+    return multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+
+
+def _outcomes_in(outcomes: Outcomes, ranges) -> Outcomes:
+    """
+    The outcomes whose trade opens (signal bar + 1) and settles (signal bar +
+    expiry) inside one of ranges.  A train trade opened in the last expiry - 1
+    bars before a test range would settle on test bars, so those are dropped:
+    the selection never sees a test close.
+    """
+    bars, votes, won = [], [], []
+    for start, stop in ranges:
+        a = bisect_left(outcomes.bars, start - 1)
+        b = bisect_left(outcomes.bars, stop - outcomes.expiry)
+        bars += outcomes.bars[a:b]; votes += outcomes.votes[a:b]; won += outcomes.won[a:b]
+    return Outcomes(bars, votes, won, outcomes.expiry)
+
+
+def _outcomes_in_sessions(outcomes: Optional[Outcomes], D: dict,
+                          sessions: Optional[List[str]]) -> Optional[Outcomes]:
+    """The outcomes whose trade bar falls in one of the named trading sessions."""
+    if outcomes is None or not sessions:
+        return outcomes
+    keep = _sessions.in_sessions([i + 1 for i in outcomes.bars], _sessions.dataset_buckets(D),
+                                 _sessions.session_mask(sessions))
+    return Outcomes([b for b, k in zip(outcomes.bars, keep) if k],
+                    [v for v, k in zip(outcomes.votes, keep) if k],
+                    [w for w, k in zip(outcomes.won, keep) if k], outcomes.expiry)
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# PARALLEL SEARCH
+# ══════════════════════════════════════════════════════════════════════════════
+# StrategyGenerator(workers=N) runs the random search in N processes.  The
+# candles go into one shared-memory block (candle_frame.share_frame) that
+# every worker attaches to, so months of M1 data are not copied per worker;
+# each worker builds its own dataset and series cache on it.  Workers seed
+# the random module with their own string seed (hashed by random.seed into
+# an independent stream), draw candidates exactly as the serial loop does and
+# send (iterations, results, per-fold train results) to the coordinator about
+# every _REPORT_INTERVAL seconds.  The coordinator keeps the global and the
+# per-fold top-N, calls progress_cb, and publishes the top-N's worst win rate
+# in a shared value the workers prune against (fold results are pruned
+# against each worker's own fold top-N).  The stop event is checked before every
+# candidate, so stop() reaches the workers within one backtest.
+
+_REPORT_INTERVAL = 0.25      # seconds between progress reports / worker → coordinator messages
+
+
+def _search_worker(spec, params: dict, seed: str, quota: int, stop, bound, out):
+    """One search process: random candidates until stop is set or quota (0 = no limit) is used."""
+    frame, shm = attach_frame(spec)
+    try:
+        random.seed(seed)
+        gen = StrategyGenerator(frame, **params)
+        done, sent, found = 0, 0, []
+        fold_found = [[] for _ in gen.fold_ranges]
+        last = time.monotonic()
+        while not stop.is_set() and (not quota or done < quota):
+            strategy = gen._random_strategy()
+            floor = bound.value
+            try:
+                result, train = gen._score(strategy, floor if floor >= 0 else None)
+                if result is not None:
+                    found.append(result)
+                for j, r in enumerate(train):
+                    if r is not None:
+                        gen._update_fold(j, r)          # local fold top-N: pruning bound
+                        fold_found[j].append(r)
+            except Exception as ex:
+                logger.debug(f'Generator worker error: {ex}')
+            done += 1
+            if time.monotonic() - last >= _REPORT_INTERVAL:
+                out.put((done - sent, found, fold_found))
+                sent, found, last = done, [], time.monotonic()
+                fold_found = [[] for _ in gen.fold_ranges]
+        out.put((done - sent, found, fold_found))
+    finally:
+        # the dataset's columns are views of the block; drop them before closing it
+        gen = frame = None
+        try:
+            shm.close()
+        except BufferError:      # a view is still alive — the mapping goes with the process
+            pass
+
+
+def _fold_worker(spec, params: dict, tasks: list, out):
+    """Validation replay in one process: each (fold, chosen) task → (fold, rows) on out."""
+    frame, shm = attach_frame(spec)
+    try:
+        gen = StrategyGenerator(frame, **params)
+        memo = {}
+        for j, chosen in tasks:
+            out.put((j, gen._fold_rows(j, chosen, memo)))
+    finally:
+        gen = memo = frame = None
+        try:
+            shm.close()
+        except BufferError:
+            pass
+
+
+def _join_workers(procs, shm):
+    """Join (or terminate) the worker processes that started, then free the shared candle block."""
+    try:
+        for p in procs:
+            if p.pid is None:         # start() failed or never reached
+                continue
+            p.join(timeout=5)
+            if p.is_alive():
+                p.terminate()
+    finally:
+        try:
+            shm.close()
+        finally:
+            shm.unlink()
+
+
 # ══════════════════════════════════════════════════════════════════════════════
 # STRATEGY GENERATOR ENGINE
 # ══════════════════════════════════════════════════════════════════════════════
@@ -1558,26 +2519,47 @@ class StrategyGenerator:
     Unlimited random-search loop over indicator combinations.
     Periods are chosen randomly within the range for each indicator on
     every single iteration — giving true parameter diversity.
+    workers > 1 runs the search in that many processes (see PARALLEL SEARCH).
     """
 
-    def __init__(self, candles: list, trading: TradingConfig,
+    def __init__(self, candles, trading: TradingConfig,
                  allowed_indicators: Optional[List[str]] = None,
                  min_indicators: int = 2,
                  max_indicators: int = 4,
                  top_n: int = 20,
-                 min_agreement_ratio: float = 0.6):
-        self.candles  = candles
+                 min_agreement_ratio: float = 0.6,
+                 validation: Optional[str] = None,
+                 folds: int = 5,
+                 expiries: Optional[List[int]] = None,
+                 monte_carlo_sims: int = 10000,
+                 sessions: Optional[List[str]] = None,
+                 workers: int = 1):
+        self.candles  = as_frame(candles)
         self.trading  = trading
         self.allowed  = allowed_indicators or list(INDICATOR_CATALOG.keys())
         self.min_ind  = min_indicators
         self.max_ind  = max_indicators
         self.top_n    = top_n
         self.ratio    = min_agreement_ratio
+        self.validation_mode = validation      # None | 'walk_forward' | 'kfold'
+        self.folds    = folds
+        self.fold_ranges = (validation_folds(len(self.candles), validation, folds)
+                            if validation else [])
+        self.fold_best: List[List[StrategyResult]] = [[] for _ in self.fold_ranges]
+        self.validation: Optional[ValidationResult] = None
+        self.expiries = sorted(set(expiries or [1]))   # candidates ranked at their best expiry
+        self.mc_sims  = monte_carlo_sims if _monte_carlo is not None else 0   # 0 = off
+        self.monte_carlo: dict = {}            # strategy key → MonteCarloResult
+        self.sessions = list(sessions or [])   # trade only in these SESSIONS ([] = all hours)
+        self.workers  = max(1, workers)        # search processes (1 = this thread)
+        self._stop_event = None                # set by stop() during a parallel run
 
         self.running    = False
         self.iterations = 0
         self.best: List[StrategyResult] = []
         self.start_time = None
+        # One dataset + series cache shared by every candidate on these candles
+        self.dataset    = build_dataset(self.candles)
 
     def _random_strategy(self) -> StrategyConfig:
         n = random.randint(self.min_ind, min(self.max_ind, len(self.allowed)))
@@ -1613,40 +2595,289 @@ class StrategyGenerator:
         min_agreement = max(1, round(n * self.ratio))
         return StrategyConfig(indicators=inds, min_agreement=min_agreement)
 
+    def _bound(self) -> Optional[float]:
+        """Worst win rate in a full top-N: candidates that cannot beat it are pruned."""
+        if len(self.best) < self.top_n:
+            return None
+        return self.best[-1].win_rate
+
+    def _fold_bound(self, j: int) -> Optional[float]:
+        """_bound for fold j's train top-N."""
+        top = self.fold_best[j]
+        return top[-1].win_rate if len(top) >= self.top_n else None
+
+    def _ranked(self, top: List[StrategyResult], result: StrategyResult) -> List[StrategyResult]:
+        top.append(result)
+        top.sort(key=lambda r: (-r.win_rate, -r.total_trades))
+        return top[:self.top_n]
+
     def _update_best(self, result: StrategyResult):
-        self.best.append(result)
-        self.best.sort(key=lambda r: (-r.win_rate, -r.total_trades))
-        if len(self.best) > self.top_n:
-            self.best = self.best[:self.top_n]
+        self.best = self._ranked(self.best, result)
+
+    def _update_fold(self, j: int, result: StrategyResult):
+        self.fold_best[j] = self._ranked(self.fold_best[j], result)
+
+    def _score(self, strategy: StrategyConfig, floor: Optional[float]) -> tuple:
+        """
+        (result on the whole history or None, [train result or None per
+        fold]).  One outcome pass per expiry; each fold's train result is the
+        slice of those outcomes on its train ranges, pruned against that
+        fold's own top-N.
+        """
+        if not self.fold_ranges:
+            return backtest_many(self.candles, [strategy], self.trading, dataset=self.dataset,
+                                 record_trades=False, min_win_rate=floor,
+                                 expiries=self.expiries, sessions=self.sessions)[0], []
+        D = self.dataset
+        outs = [o for o in (_outcomes_in_sessions(o, D, self.sessions) for o in
+                            outcome_expiries(strategy, D, self.expiries, cache=False).values())
+                if o is not None]
+        result = _best_result(_simulate(strategy, o, D, self.trading, False, floor) for o in outs)
+        train = [_best_result(_simulate(strategy, _outcomes_in(o, ranges), D, self.trading,
+                                        False, self._fold_bound(j)) for o in outs)
+                 for j, (ranges, _) in enumerate(self.fold_ranges)]
+        return result, train
+
+    def _progress(self, progress_cb: Optional[Callable]):
+        if progress_cb:
+            elapsed  = time.time() - self.start_time
+            rate     = self.iterations / elapsed if elapsed > 0 else 0
+            best_wr  = self.best[0].win_rate if self.best else 0.0
+            progress_cb(self.iterations, len(self.best), best_wr, rate)
 
     def run(self, progress_cb: Optional[Callable] = None,
             max_iterations: Optional[int] = None):
         self.running    = True
         self.start_time = time.time()
 
+        if self.workers > 1:
+            self._run_parallel(progress_cb, max_iterations)
+        else:
+            self._run_serial(progress_cb, max_iterations)
+
+        if self.validation_mode:
+            self.validate()
+        if self.mc_sims:
+            self.robustness()
+        self.running = False
+
+    def _run_serial(self, progress_cb: Optional[Callable], max_iterations: Optional[int]):
+        """
+        The search loop in this thread.  self.running is checked before every
+        candidate and progress is reported every _REPORT_INTERVAL seconds, so
+        stop() and the progress bar respond within one backtest.
+        """
+        last = time.monotonic()
         while self.running:
             if max_iterations and self.iterations >= max_iterations:
                 break
             try:
-                strategy = self._random_strategy()
-                result   = backtest_strategy(self.candles, strategy, self.trading)
+                result, train = self._score(self._random_strategy(), self._bound())
                 if result is not None:
                     self._update_best(result)
+                for j, r in enumerate(train):
+                    if r is not None:
+                        self._update_fold(j, r)
             except Exception as ex:
                 logger.debug(f'Generator iter error: {ex}')
 
             self.iterations += 1
-
-            if progress_cb and self.iterations % 10 == 0:
-                elapsed  = time.time() - self.start_time
-                rate     = self.iterations / elapsed if elapsed > 0 else 0
-                best_wr  = self.best[0].win_rate if self.best else 0.0
-                progress_cb(self.iterations, len(self.best), best_wr, rate)
-
-        self.running = False
+            if time.monotonic() - last >= _REPORT_INTERVAL:
+                self._progress(progress_cb)
+                last = time.monotonic()
+        self._progress(progress_cb)
+
+    def _run_parallel(self, progress_cb: Optional[Callable], max_iterations: Optional[int]):
+        """The search loop on self.workers processes (see PARALLEL SEARCH)."""
+        ctx = pool_context()
+        shm, spec = share_frame(self.candles)
+        stop  = self._stop_event = ctx.Event()
+        bound = ctx.Value('d', -1.0, lock=False)      # worst top-N win rate, -1 = not full
+        out   = ctx.Queue()
+        params = self._worker_params()
+        base = random.getrandbits(64)      # seeding random before run() makes a run repeatable
+        n = self.workers
+        quotas = [max_iterations // n + (k < max_iterations % n) if max_iterations else 0
+                  for k in range(n)]
+        procs = [ctx.Process(target=_search_worker, daemon=True,
+                             args=(spec, params, f'{base}:{k}', quotas[k], stop, bound, out))
+                 for k in range(n) if not max_iterations or quotas[k]]
+
+        def absorb(msg):
+            count, found, fold_found = msg
+            self.iterations += count
+            for result in found:
+                self._update_best(result)
+            for j, results in enumerate(fold_found):
+                for result in results:
+                    self._update_fold(j, result)
+            floor = self._bound()
+            bound.value = floor if floor is not None else -1.0
+
+        try:
+            for p in procs:
+                p.start()
+            if not self.running:          # stop() before the event existed
+                stop.set()
+            while True:
+                try:
+                    absorb(out.get(timeout=0.1))
+                except queue.Empty:
+                    if not self.running:
+                        stop.set()
+                    if not any(p.is_alive() for p in procs):
+                        break
+                    continue
+                self._progress(progress_cb)
+                if not self.running:
+                    stop.set()
+            while True:                   # messages written just before a worker exited
+                try:
+                    absorb(out.get_nowait())
+                except queue.Empty:
+                    break
+            self._progress(progress_cb)
+        finally:
+            try:
+                stop.set()
+                self._stop_event = None
+            finally:
+                _join_workers(procs, shm)
+
+    def _worker_params(self) -> dict:
+        """Keyword arguments that rebuild this generator in a worker process."""
+        return dict(trading=self.trading, allowed_indicators=self.allowed,
+                    min_indicators=self.min_ind, max_indicators=self.max_ind,
+                    top_n=self.top_n, min_agreement_ratio=self.ratio,
+                    validation=self.validation_mode, folds=self.folds,
+                    expiries=self.expiries, monte_carlo_sims=0, sessions=self.sessions)
+
+    def validate(self) -> Optional[ValidationResult]:
+        """
+        Out-of-sample report (see OUT-OF-SAMPLE VALIDATION): every fold's
+        train top-N, found during the search, replayed on that fold's test
+        range only.  With workers > 1 the folds are replayed in that many
+        processes on the shared candles.  None when the generator runs
+        without validation.
+        """
+        if not self.fold_ranges:
+            return None
+        tasks = [(j, chosen) for j, chosen in enumerate(self.fold_best) if chosen]
+        rows = self._replay_parallel(tasks) if self.workers > 1 and len(tasks) > 1 else {}
+        memo = {}
+        for j, chosen in tasks:          # serial run, or folds a failed worker left out
+            if j not in rows:
+                rows[j] = self._fold_rows(j, chosen, memo)
+        folds = [rows.get(j, []) for j in range(len(self.fold_ranges))]
+        self.validation = ValidationResult(self.validation_mode, folds, self.iterations)
+        return self.validation
+
+    def _fold_rows(self, j: int, chosen: List[StrategyResult], memo: dict) -> List[FoldResult]:
+        """
+        Fold j's train top-N scored on its test range.  memo maps (strategy,
+        expiry) to whole-history outcomes across folds: k-fold train ranges
+        overlap, so the same winners recur and get one signal pass.
+        """
+        D = self.dataset
+        train, test = self.fold_ranges[j]
+        rows = []
+        for r in chosen:
+            key = (_strategy_key(r.config), r.expiry)
+            if key not in memo:
+                memo[key] = _outcomes_in_sessions(
+                    outcome_sequence(r.config, D, cache=False, min_trades=1, expiry=r.expiry),
+                    D, self.sessions)
+            row = FoldResult(j, train, test, r.config, r.indicators_desc, r.expiry,
+                             train_trades=r.total_trades, train_wins=r.wins)
+            rows.append(_fold_test(row, memo[key], D, self.trading))
+        return rows
+
+    def _replay_parallel(self, tasks: list) -> dict:
+        """{fold: _fold_rows} of the (fold, chosen) tasks, dealt round-robin to the workers."""
+        ctx = pool_context()
+        shm, spec = share_frame(self.candles)
+        out = ctx.Queue()
+        n = min(self.workers, len(tasks))
+        params = self._worker_params()
+        procs = [ctx.Process(target=_fold_worker, daemon=True,
+                             args=(spec, params, tasks[k::n], out))
+                 for k in range(n)]
+        rows = {}
+        try:
+            for p in procs:
+                p.start()
+            while len(rows) < len(tasks):
+                try:
+                    j, fold_rows = out.get(timeout=0.1)
+                except queue.Empty:
+                    if not any(p.is_alive() for p in procs):
+                        break
+                    continue
+                rows[j] = fold_rows
+            while True:                   # messages written just before a worker exited
+                try:
+                    j, fold_rows = out.get_nowait()
+                except queue.Empty:
+                    break
+                rows[j] = fold_rows
+        finally:
+            _join_workers(procs, shm)
+        return rows
+
+    def robustness(self, sims: Optional[int] = None, method: str = 'block') -> dict:
+        """
+        Monte Carlo money-management risk of the current top-N: each result's
+        win/loss sequence reshuffled `sims` times through the generator's
+        TradingConfig (see monte_carlo.monte_carlo).
+        """
+        if _monte_carlo is None:
+            return {}
+        sims = sims or self.mc_sims or 10000
+        out = {}
+        for r in self.best:
+            outcomes = _outcomes_in_sessions(outcome_sequence(r.config, self.dataset, expiry=r.expiry),
+                                             self.dataset, self.sessions)
+            if outcomes is not None:
+                mc = _monte_carlo.monte_carlo(outcomes.won, self.trading, sims, method)
+                if mc is not None:
+                    out[_strategy_key(r.config)] = mc
+        self.monte_carlo = out
+        return out
 
     def stop(self):
         self.running = False
+        if self._stop_event is not None:
+            self._stop_event.set()
+
+    def detail(self, strategy: StrategyConfig,
+               trading: Optional[TradingConfig] = None, expiry: int = 1) -> Optional[StrategyResult]:
+        """
+        Full result of strategy on the generator's candles (under trading,
+        default the generator's config, at the result's expiry): trade
+        records and the hour / weekday / session breakdown.  run() keeps
+        statistics only; this replays the same backtest (deterministic on the
+        shared dataset) for the result a user opens.
+        """
+        return backtest_strategy(self.candles, strategy, trading or self.trading,
+                                 dataset=self.dataset, expiry=expiry, sessions=self.sessions)
+
+    def trade_log(self, strategy: StrategyConfig,
+                  trading: Optional[TradingConfig] = None, expiry: int = 1) -> list:
+        """Trade records of detail()."""
+        result = self.detail(strategy, trading, expiry)
+        return result.trades if result is not None else []
+
+    def sweep(self, strategy: StrategyConfig, tradings: List[TradingConfig],
+              expiry: int = 1) -> list:
+        """sweep_trading on the generator's dataset (signals are evaluated once)."""
+        return sweep_trading(self.candles, strategy, tradings, dataset=self.dataset, expiry=expiry,
+                             sessions=self.sessions)
+
+    def expiry_stats(self, strategy: StrategyConfig, expiries=None) -> dict:
+        """backtest_expiries of one strategy on the generator's dataset (statistics only)."""
+        return backtest_expiries(self.candles, strategy, self.trading,
+                                 expiries or sorted(set(self.expiries) | {1, 2, 3, 5}),
+                                 dataset=self.dataset, sessions=self.sessions)
 
     def results_as_dicts(self) -> list:
         out = []
@@ -1675,6 +2906,13 @@ class StrategyGenerator:
                 'sim_max_drawdown':  r.sim_max_drawdown,
                 'indicators':        indicators,
                 'min_agreement':     r.config.min_agreement,
-                'trades':            r.trades,
+                'expiry':            r.expiry,
             })
+            if r.trades:   # generator results carry no trades; see detail()
+                out[-1]['trades'] = r.trades
+            if r.breakdown:
+                out[-1]['breakdown'] = r.breakdown
+            mc = self.monte_carlo.get(_strategy_key(r.config))
+            if mc is not None:
+                out[-1]['monte_carlo'] = mc.as_dict()
         return out
@@ -17,8 +17,19 @@ Sinyal hanya diambil saat SEMUA 4 kondisi terpenuhi → filter ketat = win rate
 
 import time
 import logging
+import threading
+from collections import OrderedDict
 from datetime import datetime, timezone
 
+from candle_frame import CandleFrame, as_frame
+from resample import resample
+from sessions import SessionTally
+
+try:
+    import scalper_np as _np_engine
+except ImportError:        # NumPy not installed → pure-Python path only
+    _np_engine = None
+
 logger = logging.getLogger(__name__)
 
 
@@ -106,6 +117,15 @@ def _calc_stoch(highs, lows, closes, k_period=14, k_smooth=3, d_smooth=3):
     return k_smooth_vals, d_smooth_vals
 
 
+def _max_run(flags: list, value: bool) -> int:
+    """Length of the longest run of `value` in flags."""
+    best = run = 0
+    for f in flags:
+        run = run + 1 if f == value else 0
+        best = max(best, run)
+    return best
+
+
 # ─── Strategy class ────────────────────────────────────────────────────────────
 
 class AtvScalperM1:
@@ -135,11 +155,13 @@ class AtvScalperM1:
     # EMA bounce tolerance (0.05%)
     BOUNCE_TOL = 0.0005
 
-    def _indicators(self, candles: list) -> dict:
-        closes = [c['close'] for c in candles]
-        highs  = [c['high']  for c in candles]
-        lows   = [c['low']   for c in candles]
-        opens  = [c['open']  for c in candles]
+    def _indicators(self, candles: CandleFrame) -> dict:
+        closes = candles.close
+        highs  = candles.high
+        lows   = candles.low
+        opens  = candles.open
+        stk, std = _calc_stoch(highs, lows, closes,
+                               self.STOCH_K, self.STOCH_KS, self.STOCH_DS)
         return {
             'opens':  opens,
             'closes': closes,
@@ -149,10 +171,8 @@ class AtvScalperM1:
             'ema8':   _calc_ema(closes, self.EMA_MID),
             'ema50':  _calc_ema(closes, self.EMA_SLOW),
             'rsi':    _calc_rsi(closes, self.RSI_PERIOD),
-            'stk':    _calc_stoch(highs, lows, closes,
-                                  self.STOCH_K, self.STOCH_KS, self.STOCH_DS)[0],
-            'std':    _calc_stoch(highs, lows, closes,
-                                  self.STOCH_K, self.STOCH_KS, self.STOCH_DS)[1],
+            'stk':    stk,
+            'std':    std,
         }
 
     def _signal_at(self, i: int, ind: dict) -> str | None:
@@ -198,42 +218,64 @@ class AtvScalperM1:
 
     # ── Public API ─────────────────────────────────────────────────────────────
 
-    def generate_signals(self, candles: list) -> list:
-        """Return list of signal dicts for all candles."""
-        ind     = self._indicators(candles)
+    def generate_signals(self, candles) -> list:
+        """Return list of signal dicts for all candles (CandleFrame or dicts)."""
+        candles = as_frame(candles)
+        times, opens, closes = candles.time, candles.open, candles.close
         signals = []
+        for i, direction in self._entries(candles):
+            signals.append({
+                'i':          i,
+                'time':       times[i],
+                'direction':  direction,
+                'open':       round(opens[i],  5),
+                'close':      round(closes[i], 5),
+                'next_open':  round(opens[i + 1],  5),
+                'next_close': round(closes[i + 1], 5),
+            })
+        return signals
+
+    def _entries(self, candles: CandleFrame):
+        """(i, 'call'|'put') for every signal bar, vectorised when NumPy is available."""
+        if _np_engine is not None:
+            vec = _np_engine.signal_vector(self, candles)
+            return [(int(i), 'call' if vec[i] > 0 else 'put') for i in vec.nonzero()[0]]
+        ind     = self._indicators(candles)
+        entries = []
         start   = self.EMA_SLOW + 10          # warm-up buffer
         for i in range(start, len(candles) - 1):
             direction = self._signal_at(i, ind)
             if direction:
-                signals.append({
-                    'i':          i,
-                    'time':       candles[i]['time'],
-                    'direction':  direction,
-                    'open':       round(candles[i]['open'],  5),
-                    'close':      round(candles[i]['close'], 5),
-                    'next_open':  round(candles[i + 1]['open'],  5),
-                    'next_close': round(candles[i + 1]['close'], 5),
-                })
-        return signals
+                entries.append((i, direction))
+        return entries
 
-    def backtest(self, candles: list, payout: float = 0.82) -> dict:
+    def backtest(self, candles, payout: float = 0.82, expiries=None) -> dict:
         """
-        Run backtest on candles list.
+        Run backtest on candles (CandleFrame or list of dicts).
         payout: broker payout (e.g. 0.82 = 82%). IQ Option typical: 75-92%.
         Returns a stats dict with full trade log (last 200 trades).
+        expiries: e.g. [1, 2, 3, 5] — the same signals are also scored at
+        each expiry (entry at the next open, exit at the close `expiry`
+        candles later) and result['expiries'] lists the stats per expiry.
+        Uses the vectorised scalper_np path when NumPy is installed.
         """
-        signals = self.generate_signals(candles)
+        candles = as_frame(candles)
+        if _np_engine is not None:
+            return _np_engine.backtest(self, candles, payout, expiries)
+        return self._backtest_py(candles, payout, expiries)
+
+    def _backtest_py(self, candles: CandleFrame, payout: float = 0.82, expiries=None) -> dict:
+        opens, closes, times = candles.open, candles.close, candles.time
 
         wins = losses = 0
         consec_w = consec_l = max_cw = max_cl = 0
-        trade_log = []
+        trades  = []
+        monthly: dict = {}
+        by_session = SessionTally()
 
-        for sig in signals:
-            i         = sig['i']
-            direction = sig['direction']
-            entry     = candles[i + 1]['open']
-            exit_px   = candles[i + 1]['close']
+        for i, direction in self._entries(candles):
+            entry   = opens[i + 1]
+            exit_px = closes[i + 1]
 
             won = ((direction == 'call' and exit_px > entry) or
                    (direction == 'put'  and exit_px < entry))
@@ -245,41 +287,67 @@ class AtvScalperM1:
                 losses += 1; consec_l += 1; consec_w = 0
                 max_cl = max(max_cl, consec_l)
 
-            trade_log.append({
-                'time':      datetime.fromtimestamp(sig['time'],
-                             tz=timezone.utc).strftime('%Y-%m-%d %H:%M'),
-                'direction': direction.upper(),
-                'entry':     round(entry,   5),
-                'exit':      round(exit_px, 5),
-                'result':    'WIN' if won else 'LOSS',
-                'pnl':       round(payout if won else -1.0, 2),
-            })
+            ym = '%04d-%02d' % time.gmtime(times[i])[:2]
+            w_l = monthly.setdefault(ym, [0, 0])
+            w_l[0 if won else 1] += 1
+            by_session.add(times[i + 1], won)
+            trades.append((times[i], direction, entry, exit_px, won))
+
+        monthly_stats = [self._month_stats(ym, w, w + l) for ym, (w, l) in sorted(monthly.items())]
+        trade_log = [self._trade_record(*t, payout) for t in trades[-200:]]
+        result = self._result(payout, wins, losses, max_cw, max_cl, monthly_stats,
+                              by_session.as_dict(payout), trade_log)
+        if expiries:
+            n, entries = len(candles), self._entries(candles)
+            result['expiries'] = []
+            for e in sorted(set(expiries)):
+                won = [(closes[i + e] > opens[i + 1]) if d == 'call' else (closes[i + e] < opens[i + 1])
+                       for i, d in entries if i + e < n]
+                result['expiries'].append(self._expiry_stats(
+                    e, payout, sum(won), len(won), _max_run(won, True), _max_run(won, False)))
+        return result
+
+    # ── Result shaping (shared by the Python and NumPy paths) ──────────────────
+
+    @staticmethod
+    def _expiry_stats(expiry, payout, wins, total, max_cw, max_cl) -> dict:
+        return {
+            'expiry':          expiry,
+            'total_signals':   total,
+            'wins':            wins,
+            'losses':          total - wins,
+            'win_rate':        round(wins / total * 100, 2) if total else 0,
+            'net_pnl_units':   round(wins * payout - (total - wins), 2),
+            'max_consec_win':  max_cw,
+            'max_consec_loss': max_cl,
+        }
 
+    @staticmethod
+    def _trade_record(t, direction, entry, exit_px, won, payout) -> dict:
+        return {
+            'time':      datetime.fromtimestamp(t, tz=timezone.utc).strftime('%Y-%m-%d %H:%M'),
+            'direction': direction.upper(),
+            'entry':     round(entry,   5),
+            'exit':      round(exit_px, 5),
+            'result':    'WIN' if won else 'LOSS',
+            'pnl':       round(payout if won else -1.0, 2),
+        }
+
+    @staticmethod
+    def _month_stats(ym, wins, total) -> dict:
+        return {
+            'month':    ym,
+            'wins':     wins,
+            'losses':   total - wins,
+            'total':    total,
+            'win_rate': round(wins / total * 100, 1) if total else 0,
+        }
+
+    def _result(self, payout, wins, losses, max_cw, max_cl, monthly_stats, breakdown,
+                trade_log) -> dict:
         total    = wins + losses
         win_rate = round(wins / total * 100, 2) if total else 0
         net_pnl  = round(wins * payout - losses, 2)
-
-        # Monthly breakdown
-        monthly: dict = {}
-        for t in trade_log:
-            ym = t['time'][:7]
-            if ym not in monthly:
-                monthly[ym] = {'wins': 0, 'losses': 0}
-            if t['result'] == 'WIN':
-                monthly[ym]['wins'] += 1
-            else:
-                monthly[ym]['losses'] += 1
-        monthly_stats = []
-        for ym, v in sorted(monthly.items()):
-            tot = v['wins'] + v['losses']
-            monthly_stats.append({
-                'month':    ym,
-                'wins':     v['wins'],
-                'losses':   v['losses'],
-                'total':    tot,
-                'win_rate': round(v['wins'] / tot * 100, 1) if tot else 0,
-            })
-
         return {
             'strategy':         self.NAME,
             'timeframe':        self.TIMEFRAME,
@@ -294,23 +362,143 @@ class AtvScalperM1:
             'max_consec_loss':  max_cl,
             'avg_signals_day':  0,       # filled by fetch function
             'monthly':          monthly_stats,
-            'trade_log':        trade_log[-200:],  # last 200 for UI
+            'breakdown':        breakdown,  # by hour / weekday / session of the entry bar
+            'trade_log':        trade_log,  # last 200 for UI
         }
 
 
 # ─── Data-fetching helper ──────────────────────────────────────────────────────
 
+# M1 history per asset from earlier fetches; higher timeframes are resampled
+# from it instead of being downloaded again.  A few assets at most: 24 months
+# of M1 is ~50 MB per asset.
+_M1_STORE: 'OrderedDict[str, CandleFrame]' = OrderedDict()
+_M1_STORE_ASSETS = 4
+_M1_LOCK = threading.Lock()
+
+
+_MONTH = 30.5 * 24 * 3600     # a backtest "month" (approximate), as the routes count it
+_DAY = 24 * 3600
+
+
+def closed_range(interval: int, months: float, now: float = None) -> tuple:
+    """
+    (start_ts, end_ts) of a backtest over the last `months`.  end_ts stops
+    just before the forming candle: every closed candle is in, and the one
+    whose values still change is not, so the same closed history always
+    gives the same candles.  start_ts is rounded down to UTC midnight, so
+    repeated runs on one day share their start (and their cached head).
+    """
+    now = time.time() if now is None else now
+    end_ts = int(now) // interval * interval - 1
+    start_ts = int(end_ts - months * _MONTH) // _DAY * _DAY
+    return start_ts, end_ts
+
+
+def has_stored_m1(asset: str, start_ts: float) -> bool:
+    """True when the M1 store already reaches back to start_ts for asset."""
+    with _M1_LOCK:
+        frame = _M1_STORE.get(asset)
+    return frame is not None and len(frame) > 0 and frame.time[0] <= start_ts + 60
+
+
+def _store_m1(asset: str, frame: CandleFrame) -> None:
+    with _M1_LOCK:
+        _M1_STORE[asset] = frame
+        _M1_STORE.move_to_end(asset)
+        while len(_M1_STORE) > _M1_STORE_ASSETS:
+            _M1_STORE.popitem(last=False)
+
+
+def _m1_history(robot, asset: str, start_ts: float, end_ts: float,
+                progress_cb=None, fetch: bool = True):
+    """
+    M1 candles of asset between start_ts and end_ts, served from the store
+    when it covers start_ts (only the minutes after its last candle are
+    downloaded; that candle is re-fetched since it may have been still
+    forming).  Otherwise downloads the range when fetch is set, or returns None.
+    """
+    with _M1_LOCK:
+        stored = _M1_STORE.get(asset)
+    if stored is not None and len(stored) and stored.time[0] <= start_ts + 60:
+        last = stored.time[-1]
+        if end_ts > last:
+            tail = _fetch_range(robot, asset, 60, last, end_ts, progress_cb)
+            if len(tail):
+                stored = CandleFrame.concat([stored.between(0, last - 1), tail])
+                _store_m1(asset, stored)
+        return stored.between(start_ts, end_ts).copy()
+    if not fetch:
+        return None
+    frame = _fetch_range(robot, asset, 60, start_ts, end_ts, progress_cb)
+    if len(frame):
+        _store_m1(asset, frame)
+    return frame
+
+
 def fetch_candles_range(robot, asset: str, interval: int,
                         start_ts: float, end_ts: float,
-                        progress_cb=None) -> list:
+                        progress_cb=None, from_m1: bool = False) -> CandleFrame:
     """
-    Fetch all M1 candles between start_ts and end_ts using IQ Option API.
-    Walks backwards in time in chunks of 1 000 candles.
+    All candles of `interval` seconds between start_ts and end_ts.
+    M1 requests go through the M1 store; whole-minute intervals are resampled
+    from it when it already covers the range, or always when from_m1 is set
+    (one M1 download for several timeframes of the same asset).  Anything else
+    is fetched from IQ Option at that interval.
     progress_cb(pct, msg) is called periodically.
-    Returns sorted list of candle dicts.
+    Returns a CandleFrame sorted by time (one row per timestamp).
+    """
+    if interval % 60 == 0:
+        m1 = _m1_history(robot, asset, start_ts, end_ts, progress_cb,
+                         fetch=interval == 60 or from_m1)
+        if m1 is not None:
+            return m1 if interval == 60 else resample(m1, interval)
+    return _fetch_range(robot, asset, interval, start_ts, end_ts, progress_cb)
+
+
+def iter_candle_chunks(robot, asset: str, interval: int,
+                       start_ts: float, end_ts: float, chunk: int = 1000):
+    """
+    The candles of fetch_candles_range as consecutive CandleFrames, oldest
+    first, for streaming backtests: at most `chunk` candles are held at a
+    time.  Served from the M1 store when it covers the range, otherwise
+    downloaded walking forward through the range.  A download that still
+    fails after one retry raises: the chunks already yielded stop short of
+    end_ts, so the caller must not treat the stream as complete.
+    """
+    if interval % 60 == 0:
+        m1 = _m1_history(robot, asset, start_ts, end_ts, fetch=False)
+        if m1 is not None:
+            frame = m1 if interval == 60 else resample(m1, interval)
+            for lo in range(0, len(frame), chunk):
+                yield frame[lo:lo + chunk]
+            return
+
+    span = (chunk - 1) * interval
+    cursor = start_ts
+    while cursor <= end_ts:
+        to = min(cursor + span, end_ts)
+        try:
+            raw = robot.api.get_candles(asset, interval, chunk, to)
+        except Exception as ex:
+            logger.warning(f"get_candles error (retrying): {ex}")
+            time.sleep(2)
+            raw = robot.api.get_candles(asset, interval, chunk, to)
+        frame = CandleFrame.from_iq(raw or []).sorted_unique().between(cursor, to)
+        if len(frame):
+            yield frame
+        cursor = to + 1
+        time.sleep(0.35)   # be polite to the API
+
+
+def _fetch_range(robot, asset: str, interval: int,
+                 start_ts: float, end_ts: float, progress_cb=None) -> CandleFrame:
+    """
+    Download candles between start_ts and end_ts from the IQ Option API,
+    walking backwards in time in chunks of 1 000 candles.
     """
     CHUNK = 1000
-    all_candles: list = []
+    chunks: list = []
     current_end = end_ts
     total_seconds = end_ts - start_ts
     fetched = 0
@@ -332,31 +520,12 @@ def fetch_candles_range(robot, asset: str, interval: int,
         if not raw:
             break
 
-        chunk = []
-        for c in raw:
-            t = int(c.get('from', c.get('id', 0)))
-            if t < start_ts:
-                continue
-            chunk.append({
-                'time':   t,
-                'open':   float(c.get('open', 0)),
-                'high':   float(c.get('max', c.get('high', 0))),
-                'low':    float(c.get('min', c.get('low', 0))),
-                'close':  float(c.get('close', 0)),
-                'volume': int(c.get('volume', 0)),
-            })
-
-        if not chunk:
+        chunk = CandleFrame.from_iq(raw, start_ts)
+        if not len(chunk):
             break
 
-        chunk.sort(key=lambda x: x['time'])
-        oldest_in_chunk = chunk[0]['time']
-
-        # Merge (avoid duplicates by timestamp)
-        existing_times = {c['time'] for c in all_candles}
-        for c in chunk:
-            if c['time'] not in existing_times:
-                all_candles.append(c)
+        oldest_in_chunk = min(chunk.time)
+        chunks.append(chunk)   # duplicates across chunks are dropped once, below
 
         fetched += len(chunk)
         pct = min(99, int((end_ts - oldest_in_chunk) / total_seconds * 100))
@@ -371,9 +540,7 @@ def fetch_candles_range(robot, asset: str, interval: int,
         current_end = oldest_in_chunk - 1
         time.sleep(0.35)   # be polite to the API
 
-    all_candles.sort(key=lambda x: x['time'])
-
-    # Filter to exact range
-    all_candles = [c for c in all_candles if start_ts <= c['time'] <= end_ts]
-    logger.info(f"Total candles after fetch: {len(all_candles)}")
-    return all_candles
+    # Sort, de-duplicate by timestamp and cut to the exact range
+    frame = CandleFrame.concat(chunks).sorted_unique().between(start_ts, end_ts).copy()
+    logger.info(f"Total candles after fetch: {len(frame)}")
+    return frame
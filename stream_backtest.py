@@ -0,0 +1,203 @@
+"""
+Streaming Backtests
+===================
+Backtests that consume candles chunk by chunk (strategy_scalper.
+iter_candle_chunks, or slices of a local frame) and keep only constant
+state: indicator recurrences carried across chunk boundaries, the one signal
+waiting for its trade bar, running statistics and the last few trade
+records.  Memory no longer grows with the history length, so multi-year M1
+backtests run in a small container, and progress follows the simulation.
+
+    ScalperStream      AtvScalperM1.backtest, same result dict
+
+    bt = ScalperStream(payout=0.82)
+    for chunk in iter_candle_chunks(robot, asset, 60, start_ts, end_ts):
+        bt.feed(chunk)
+    result = bt.result()
+
+It follows the whole-history engine step by step (same seeds, same
+recurrences), so results are identical; tests/test_stream_backtest.py
+compares them.
+
+A ScalperStream's whole state (indicator recurrences, pending signal,
+statistics, monthly breakdown, trade tail) fits in a small JSON dict, so a
+finished backtest can be extended when new candles arrive instead of being
+re-run:
+
+    saved = bt.checkpoint()                       # store with the result
+    bt = ScalperStream.resume(saved)
+    bt.feed(candles_after(saved['last_time']))
+"""
+
+import time
+from collections import deque
+from typing import Optional
+
+from candle_frame import as_frame
+from indicators_stream import _ema
+from sessions import SessionTally
+from strategy_scalper import AtvScalperM1
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# ATV SCALPER
+# ══════════════════════════════════════════════════════════════════════════════
+
+class _ScalperRsi:
+    """_calc_rsi: mean of the first `p` gains / losses, then Wilder smoothing."""
+
+    def __init__(self, p):
+        self.p = p
+        self.n = 0
+        self.prev = None
+        self.g = self.l = 0.0
+
+    def step(self, c):
+        prev, self.prev = self.prev, c
+        if prev is None:
+            return None
+        d = c - prev
+        g, l = max(d, 0.0), max(-d, 0.0)
+        p = self.p
+        self.n += 1
+        if self.n < p:
+            self.g += g
+            self.l += l
+            return None
+        if self.n == p:
+            self.g = (self.g + g) / p
+            self.l = (self.l + l) / p
+        else:
+            self.g = (self.g * (p - 1) + g) / p
+            self.l = (self.l * (p - 1) + l) / p
+        return 100.0 if self.l == 0 else 100 - 100 / (1 + self.g / self.l)
+
+
+class _ScalperStoch:
+    """_calc_stoch: raw %K over k bars, %K / %D as plain means of the last ks / ds values."""
+
+    def __init__(self, k, ks, ds):
+        self.highs, self.lows = deque(maxlen=k), deque(maxlen=k)
+        self.raw, self.kvals = deque(maxlen=ks), deque(maxlen=ds)
+
+    def step(self, hi, lo, c):
+        self.highs.append(hi)
+        self.lows.append(lo)
+        if len(self.highs) < self.highs.maxlen:
+            return None, None
+        h, l = max(self.highs), min(self.lows)
+        self.raw.append(50.0 if h == l else 100 * (c - l) / (h - l))
+        if len(self.raw) < self.raw.maxlen:
+            return None, None
+        k = sum(self.raw) / len(self.raw)
+        self.kvals.append(k)
+        if len(self.kvals) < self.kvals.maxlen:
+            return k, None
+        return k, sum(self.kvals) / len(self.kvals)
+
+
+class ScalperStream:
+    """AtvScalperM1.backtest over candles fed in chunks."""
+
+    _KEYS = ('ema3', 'ema8', 'ema50', 'rsi', 'stk', 'std', 'closes', 'opens')
+    CHECKPOINT_VERSION = 2       # bump when checkpoint() gains or changes fields
+
+    def __init__(self, strategy: Optional[AtvScalperM1] = None, payout: float = 0.82):
+        self.s = s = strategy or AtvScalperM1()
+        self.payout = payout
+        self._ema3, self._ema8, self._ema50 = _ema(s.EMA_FAST), _ema(s.EMA_MID), _ema(s.EMA_SLOW)
+        self._rsi = _ScalperRsi(s.RSI_PERIOD)
+        self._stoch = _ScalperStoch(s.STOCH_K, s.STOCH_KS, s.STOCH_DS)
+        self._start = s.EMA_SLOW + 10
+        self.bars = 0
+        self.last_time = None
+        self._prev = None            # indicator values of the previous bar
+        self._pending = None         # (time, direction) waiting for its trade bar
+        self.wins = self.losses = 0
+        self._cw = self._cl = self.max_cw = self.max_cl = 0
+        self._monthly: dict = {}
+        self._sessions = SessionTally()
+        self._trades = deque(maxlen=200)
+
+    def feed(self, candles) -> bool:
+        """Consume the next candles (oldest first).  Always True: the scalper never stops early."""
+        candles = as_frame(candles)
+        s = self.s
+        for t, o, h, l, c in zip(candles.time, candles.open, candles.high,
+                                 candles.low, candles.close):
+            if self._pending is not None:
+                self._settle(*self._pending, o, c, t)
+                self._pending = None
+            stk, std = self._stoch.step(h, l, c)
+            cur = dict(zip(self._KEYS, (self._ema3.step(c), self._ema8.step(c),
+                                        self._ema50.step(c), self._rsi.step(c),
+                                        stk, std, c, o)))
+            if self.bars >= self._start:
+                ind = {k: (self._prev[k], cur[k]) for k in self._KEYS}
+                direction = s._signal_at(1, ind)
+                if direction:
+                    self._pending = (t, direction)
+            self._prev = cur
+            self.bars += 1
+            self.last_time = t
+        return True
+
+    def _settle(self, t, direction, entry, exit_px, trade_time):
+        won = ((direction == 'call' and exit_px > entry) or
+               (direction == 'put' and exit_px < entry))
+        if won:
+            self.wins += 1; self._cw += 1; self._cl = 0
+            self.max_cw = max(self.max_cw, self._cw)
+        else:
+            self.losses += 1; self._cl += 1; self._cw = 0
+            self.max_cl = max(self.max_cl, self._cl)
+        ym = '%04d-%02d' % time.gmtime(t)[:2]
+        w_l = self._monthly.setdefault(ym, [0, 0])
+        w_l[0 if won else 1] += 1
+        self._sessions.add(trade_time, won)
+        self._trades.append((t, direction, entry, exit_px, won))
+
+    def checkpoint(self) -> dict:
+        """JSON-serialisable state; resume() continues exactly where feed() stopped."""
+        rsi, stoch = self._rsi, self._stoch
+        return {
+            'version':   self.CHECKPOINT_VERSION,
+            'payout':    self.payout,
+            'ema':       [[e.n, e.s, e.y] for e in (self._ema3, self._ema8, self._ema50)],
+            'rsi':       [rsi.n, rsi.prev, rsi.g, rsi.l],
+            'stoch':     [list(stoch.highs), list(stoch.lows), list(stoch.raw), list(stoch.kvals)],
+            'bars':      self.bars,
+            'last_time': self.last_time,
+            'prev':      self._prev,
+            'pending':   self._pending,
+            'stats':     [self.wins, self.losses, self._cw, self._cl, self.max_cw, self.max_cl],
+            'monthly':   self._monthly,
+            'sessions':  self._sessions.counts,
+            'trades':    list(self._trades),
+        }
+
+    @classmethod
+    def resume(cls, state: dict, strategy: Optional[AtvScalperM1] = None) -> 'ScalperStream':
+        """A stream restored from checkpoint() (for the same strategy parameters)."""
+        bt = cls(strategy, payout=state['payout'])
+        for e, (n, s, y) in zip((bt._ema3, bt._ema8, bt._ema50), state['ema']):
+            e.n, e.s, e.y = n, s, y
+        bt._rsi.n, bt._rsi.prev, bt._rsi.g, bt._rsi.l = state['rsi']
+        for dq, values in zip((bt._stoch.highs, bt._stoch.lows, bt._stoch.raw, bt._stoch.kvals),
+                              state['stoch']):
+            dq.extend(values)
+        bt.bars, bt.last_time, bt._prev = state['bars'], state['last_time'], state['prev']
+        bt._pending = tuple(state['pending']) if state['pending'] else None
+        (bt.wins, bt.losses, bt._cw, bt._cl,
+         bt.max_cw, bt.max_cl) = state['stats']
+        bt._monthly = {ym: list(w_l) for ym, w_l in state['monthly'].items()}
+        bt._sessions = SessionTally(state['sessions'])
+        bt._trades.extend(tuple(t) for t in state['trades'])
+        return bt
+
+    def result(self) -> dict:
+        s = self.s
+        monthly_stats = [s._month_stats(ym, w, w + l) for ym, (w, l) in sorted(self._monthly.items())]
+        trade_log = [s._trade_record(*t, self.payout) for t in self._trades]
+        return s._result(self.payout, self.wins, self.losses, self.max_cw, self.max_cl,
+                         monthly_stats, self._sessions.as_dict(self.payout), trade_log)
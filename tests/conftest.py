@@ -0,0 +1,53 @@
+"""Shared fixtures: deterministic synthetic candles for the parity suites."""
+
+import random
+from functools import lru_cache
+
+import pytest
+
+import strategy_generator as sg
+
+
+@lru_cache(maxsize=None)
+def _synthetic_candles(n: int, seed: int) -> tuple:
+    rnd = random.Random(seed)
+    px, out = 1.1, []
+    for k in range(n):
+        o = px
+        c = o + rnd.gauss(0, 0.0004)
+        out.append({
+            'time':   1_700_000_000 + 60 * k,
+            'open':   o,
+            'high':   max(o, c) + abs(rnd.gauss(0, 0.0002)),
+            'low':    min(o, c) - abs(rnd.gauss(0, 0.0002)),
+            'close':  c,
+            'volume': rnd.randint(1, 100),
+        })
+        px = c
+    return tuple(out)
+
+
+@pytest.fixture(scope='session')
+def make_candles():
+    """make_candles(n, seed=7) -> list of M1 candle dicts (random walk)."""
+    def make(n: int, seed: int = 7) -> list:
+        return [dict(c) for c in _synthetic_candles(n, seed)]
+    return make
+
+
+@pytest.fixture(scope='session')
+def candles(make_candles):
+    """600 synthetic M1 candles, enough warm-up for every catalog indicator."""
+    return make_candles(600)
+
+
+@pytest.fixture(scope='session')
+def param_sets():
+    """param_sets(iid, trials=3) -> catalog defaults plus seeded random params."""
+    def sets(iid: str, trials: int = 3) -> list:
+        cat = sg.INDICATOR_CATALOG[iid]
+        rnd = random.Random(iid)
+        return [dict(cat['defaults'])] + [
+            {k: rnd.randint(lo, hi) for k, (lo, hi) in cat['params'].items()}
+            for _ in range(trials)]
+    return sets
@@ -0,0 +1,107 @@
+"""Multi-asset batch runner on the shared process pool."""
+
+import os
+import time
+
+import batch_backtest as bb
+import strategy_generator as sg
+from candle_frame import as_frame
+from result_cache import ResultCache
+from strategy_scalper import closed_range
+
+
+def _die(candles):
+    os._exit(1)
+
+
+def _wait_for(cond, timeout=10.0):
+    end = time.monotonic() + timeout
+    while not cond() and time.monotonic() < end:
+        time.sleep(0.02)
+    return cond()
+
+
+def test_dead_worker_resets_the_shared_pool(make_candles):
+    frame = as_frame(make_candles(300))
+    reports = []
+    broken = bb.get_pool()
+    bb.run_batch([('EURUSD-OTC', 60)], lambda a, i: frame, _die,
+                 lambda t, r, e: reports.append((t, r, e)))
+    assert _wait_for(lambda: reports)
+    assert reports[0][2].startswith('Error')
+    assert _wait_for(lambda: bb._POOL is not broken)
+
+    reports.clear()
+    bb.run_batch([('EURUSD-OTC', 60)], lambda a, i: frame, bb.ScalperTask(),
+                 lambda t, r, e: reports.append((t, r, e)))
+    assert _wait_for(lambda: reports)
+    assert reports[0][2] is None and reports[0][1]['candles_tested'] == 300
+
+
+def test_should_stop_skips_remaining_targets(make_candles):
+    frame = as_frame(make_candles(300))
+    fetched, reports = [], []
+
+    def fetch(asset, interval):
+        fetched.append(asset)
+        return frame
+
+    bb.run_batch([(f'A{k}', 60) for k in range(5)], fetch, bb.ScalperTask(),
+                 lambda t, r, e: reports.append(t), should_stop=lambda: bool(fetched))
+    assert fetched == ['A0']
+    assert _wait_for(lambda: reports == [('A0', 60)])
+
+
+def _no_pool():
+    raise AssertionError('submitted to the pool')
+
+
+def test_repeat_strategy_batch_is_answered_from_the_cache(make_candles, tmp_path, monkeypatch):
+    frame = as_frame(make_candles(3000))
+    cache = ResultCache(str(tmp_path / 'results.sqlite3'))
+    strategy = sg.StrategyConfig([sg.IndicatorConfig('RSI', {'period': 7})], min_agreement=1)
+    task = bb.StrategyTask(strategy, sg.TradingConfig())
+    first, second = [], []
+    bb.run_batch([('EURUSD-OTC', 60)], lambda a, i: frame, task,
+                 lambda t, r, e: first.append(r), cache=cache)
+    assert _wait_for(lambda: first and len(cache) == 1)
+
+    monkeypatch.setattr(bb, 'get_pool', _no_pool)
+    bb.run_batch([('EURUSD-OTC', 60)], lambda a, i: frame, task,
+                 lambda t, r, e: second.append((r, e)), cache=cache)
+    assert second == [(first[0], None)]
+
+
+def test_repeat_scalper_batch_resumes_from_the_cached_checkpoint(make_candles, tmp_path,
+                                                                 monkeypatch):
+    rows = make_candles(2950)                 # ends before the next UTC midnight
+    cache = ResultCache(str(tmp_path / 'results.sqlite3'))
+    task = bb.ScalperTask(payout=0.8)
+    frame = as_frame(rows[:2800])
+    assert len(bb._head(frame)) and len(bb._head(frame)) < len(frame)
+    first = []
+    bb.run_batch([('EURUSD-OTC', 60)], lambda a, i: frame, task,
+                 lambda t, r, e: first.append(r), cache=cache)
+    assert _wait_for(lambda: first and len(cache) == 1)     # the checkpoint, not the result
+    assert first[0] == task(frame)
+
+    # later the same day: more closed candles, same head — no pool, same result as a full run
+    monkeypatch.setattr(bb, 'get_pool', _no_pool)
+    longer = as_frame(rows)
+    assert bb._head(longer).time[-1] == bb._head(frame).time[-1]
+    for candles in (frame, longer):
+        again = []
+        bb.run_batch([('EURUSD-OTC', 60)], lambda a, i: candles, task,
+                     lambda t, r, e: again.append((r, e)), cache=cache)
+        assert again == [(task(candles), None)]
+
+
+def test_closed_range_excludes_the_forming_candle():
+    forming = 1_700_000_040           # open time of the forming M1 candle
+    now = forming + 37
+    start, end = closed_range(60, 1, now)
+    assert end == forming - 1                 # the last closed candle opened at forming - 60
+    assert start % 86400 == 0 and start <= end - 30.5 * 86400
+    assert closed_range(60, 1, now + 20) == (start, end)      # same forming candle
+    assert closed_range(60, 1, now + 30)[1] == forming + 59   # it has closed
+    assert closed_range(300, 1, now)[1] == forming // 300 * 300 - 1
@@ -0,0 +1,52 @@
+"""CandleFrame views and columns."""
+
+from array import array
+
+import numpy as np
+import pytest
+
+from candle_frame import COLUMNS, CandleFrame, as_frame
+
+
+def test_full_frame_column_is_the_buffer(candles):
+    frame = as_frame(candles)
+    assert isinstance(frame.close, array)
+    assert frame.close is frame.column('close')
+
+
+def test_view_columns_share_the_buffer(candles):
+    frame = as_frame(candles)
+    view = frame[-250:]
+    for name in COLUMNS:
+        col = view.column(name)
+        assert isinstance(col, memoryview)
+        assert col.tolist() == [c[name] for c in candles[-250:]]
+    closes = np.asarray(view.close)
+    assert not closes.flags.owndata
+    assert np.shares_memory(closes, np.asarray(frame.close))
+
+
+def test_view_column_indexing_and_slicing(candles):
+    view = as_frame(candles)[100:200]
+    assert len(view.close) == 100
+    assert view.close[0] == candles[100]['close']
+    assert view.close[-1] == candles[199]['close']
+    assert view.time[10:12].tolist() == [candles[110]['time'], candles[111]['time']]
+
+
+def test_concat_and_copy_of_views(candles):
+    frame = as_frame(candles)
+    joined = CandleFrame.concat([frame[:300], frame[300:]])
+    assert joined.to_dict() == frame.to_dict()
+    assert isinstance(frame[10:20].copy().close, array)
+
+
+def test_append_blocked_while_view_column_held(candles):
+    frame = CandleFrame.from_candles(candles[:10])
+    held = frame[2:5].close
+    with pytest.raises(BufferError):
+        frame.append(candles[10])
+    assert len({len(frame.column(name)) for name in COLUMNS}) == 1
+    held.release()
+    frame.append(candles[10])
+    assert len(frame) == 11
@@ -0,0 +1,166 @@
+"""StrategyGenerator search loop."""
+
+import random
+import threading
+import time
+from multiprocessing import shared_memory
+
+import pytest
+
+import strategy_generator as sg
+
+
+def test_serial_run_honours_max_iterations(make_candles):
+    random.seed(1)
+    gen = sg.StrategyGenerator(make_candles(3000), sg.TradingConfig(), top_n=5)
+    calls = []
+    gen.run(progress_cb=lambda *a: calls.append(a), max_iterations=30)
+    assert gen.iterations == 30
+    assert calls and calls[-1][0] == 30
+    assert len(gen.best) <= 5
+
+
+def test_serial_stop_is_prompt(make_candles):
+    random.seed(2)
+    gen = sg.StrategyGenerator(make_candles(20000), sg.TradingConfig())
+    calls = []
+    worker = threading.Thread(target=gen.run, kwargs={'progress_cb': lambda *a: calls.append(a)})
+    worker.start()
+    time.sleep(1.0)
+    stopped = time.monotonic()
+    gen.stop()
+    worker.join(timeout=30)
+    assert not worker.is_alive()
+    assert time.monotonic() - stopped < 2.0
+    assert len(calls) >= 2          # time-based reports while running, plus the final one
+
+
+def test_validation_folds_cover_the_candles():
+    wf = sg.validation_folds(600, 'walk_forward', 5)
+    assert [f[1] for f in wf] == [(100, 200), (200, 300), (300, 400), (400, 500), (500, 600)]
+    assert all(train == [(test[0] - 100, test[0])] for train, test in wf)
+    kf = sg.validation_folds(600, 'kfold', 3)
+    assert kf[1] == ([(0, 200), (400, 600)], (200, 400))
+
+
+def test_validation_selects_on_train_and_scores_on_test(make_candles):
+    random.seed(3)
+    gen = sg.StrategyGenerator(make_candles(6000), sg.TradingConfig(), top_n=5,
+                               validation='kfold', folds=3, monte_carlo_sims=0)
+    gen.run(max_iterations=150)
+    report = gen.validation
+    assert report is not None and report.candidates == 150
+    assert len(report.folds) == 3
+    for j, fold in enumerate(report.folds):
+        assert fold, f'fold {j} selected nothing'
+        # fold winners come from the train range: their train stats are the search's
+        assert [f.config for f in fold] == [r.config for r in gen.fold_best[j]]
+        for f, r in zip(fold, gen.fold_best[j]):
+            assert (f.train_trades, f.train_wins) == (r.total_trades, r.wins)
+            assert f.test == gen.fold_ranges[j][1]
+    # a random walk has no edge: what looks good in-sample does not carry over
+    assert report.train_win_rate > report.test_win_rate
+    assert report.test_win_rate < gen.best[0].win_rate
+    assert report.as_dict()['folds'][0]['selected'] == len(report.folds[0])
+
+
+class _FailingSecondStart:
+    """pool_context() stand-in whose second Process fails to start."""
+
+    def __init__(self, ctx):
+        self._ctx, self.made = ctx, 0
+
+    def __getattr__(self, name):
+        return getattr(self._ctx, name)
+
+    def Process(self, *args, **kwargs):
+        p = self._ctx.Process(*args, **kwargs)
+        self.made += 1
+        if self.made == 2:
+            def start():
+                raise OSError('cannot start worker')
+            p.start = start
+        return p
+
+
+def test_parallel_start_failure_releases_shared_memory(make_candles, monkeypatch):
+    ctx = sg.pool_context()
+    monkeypatch.setattr(sg, 'pool_context', lambda: _FailingSecondStart(ctx))
+    blocks = []
+    real_share = sg.share_frame
+
+    def share(frame):
+        shm, spec = real_share(frame)
+        blocks.append(shm.name)
+        return shm, spec
+    monkeypatch.setattr(sg, 'share_frame', share)
+
+    gen = sg.StrategyGenerator(make_candles(3000), sg.TradingConfig(), workers=2,
+                               monte_carlo_sims=0)
+    with pytest.raises(OSError, match='cannot start worker'):
+        gen.run(max_iterations=20)
+    with pytest.raises(FileNotFoundError):
+        shared_memory.SharedMemory(name=blocks[0])
+
+
+@pytest.mark.parametrize('mode', sg.VALIDATION_MODES)
+def test_train_trades_settle_before_the_test_range(mode):
+    n, expiry = 600, 3
+    outcomes = sg.Outcomes(list(range(n - expiry)), [1] * (n - expiry), [True] * (n - expiry), expiry)
+    for train, (t0, t1) in sg.validation_folds(n, mode, 3):
+        kept = sg._outcomes_in(outcomes, train)
+        assert kept.bars
+        for bar in kept.bars:
+            assert any(lo <= bar + 1 and bar + expiry < hi for lo, hi in train)
+            # neither the entry nor the exit candle is a test bar
+            assert not (t0 <= bar + 1 < t1 or t0 <= bar + expiry < t1)
+        if t0 > 0:
+            assert t0 - expiry - 1 in kept.bars     # settles on the last train bar
+            assert t0 - expiry not in kept.bars     # would settle on the first test bar
+
+
+def test_validation_with_longer_expiry_never_trains_on_test_bars(make_candles):
+    random.seed(4)
+    no_stops = sg.TradingConfig(stop_loss=1e9, stop_win=1e9)   # train results keep every trade
+    gen = sg.StrategyGenerator(make_candles(4000), no_stops, top_n=3,
+                               validation='kfold', folds=3, expiries=[3], monte_carlo_sims=0)
+    gen.run(max_iterations=60)
+    assert all(gen.fold_best)
+    for j, (train, (t0, t1)) in enumerate(gen.fold_ranges):
+        for r in gen.fold_best[j]:
+            outcomes = sg.outcome_sequence(r.config, gen.dataset, min_trades=1, expiry=3)
+            kept = sg._outcomes_in(outcomes, train)
+            assert r.total_trades == len(kept)
+            assert all(not (t0 <= b + 3 < t1) for b in kept.bars)
+
+
+def test_parallel_replay_matches_serial(make_candles):
+    random.seed(5)
+    gen = sg.StrategyGenerator(make_candles(4000), sg.TradingConfig(), top_n=4,
+                               validation='walk_forward', folds=3, monte_carlo_sims=0)
+    gen.run(max_iterations=80)
+    serial = gen.validation.as_dict()
+    gen.workers = 2
+    assert gen.validate().as_dict() == serial
+
+
+def test_backtest_strategy_fold_report(make_candles):
+    candles = make_candles(3000)
+    strategy = sg.StrategyConfig([sg.IndicatorConfig('RSI', {'period': 14})], min_agreement=1)
+    trading = sg.TradingConfig()
+    report = sg.backtest_strategy(candles, strategy, trading, validation='walk_forward',
+                                  folds=4, expiry=2)
+    assert isinstance(report, sg.ValidationResult) and report.candidates == 1
+    assert [len(fold) for fold in report.folds] == [1, 1, 1, 1]
+    D = sg.build_dataset(candles)
+    outcomes = sg.outcome_sequence(strategy, D, min_trades=1, expiry=2)
+    for (train, test), [row] in zip(sg.validation_folds(len(candles), 'walk_forward', 4),
+                                    report.folds):
+        assert (row.train, row.test, row.expiry) == (train, test, 2)
+        tr, te = sg._outcomes_in(outcomes, train), sg._outcomes_in(outcomes, [test])
+        assert (row.train_trades, row.train_wins) == (len(tr), sum(tr.won))
+        assert (row.test_trades, row.test_wins) == (len(te), sum(te.won))
+    assert report.test_trades > 0
+    # without validation: the usual whole-history result
+    assert isinstance(sg.backtest_strategy(candles, strategy, sg.TradingConfig(stop_loss=1e9)),
+                      sg.StrategyResult)
@@ -0,0 +1,41 @@
+"""IndicatorStream O(1) updates vs get_signal_at on the full history."""
+
+import random
+
+import strategy_generator as sg
+from indicators_stream import IndicatorStream
+
+
+def test_stream_matches_rebuilt_dataset(make_candles):
+    n, warm, revisions = 300, 80, 2
+    candles = make_candles(n)
+    inds = [sg.IndicatorConfig(iid, dict(cat['defaults']))
+            for iid, cat in sg.INDICATOR_CATALOG.items()]
+    rnd = random.Random(7)
+    stream = IndicatorStream(candles[:warm])
+    failures = {}
+
+    def compare(i, history, forming):
+        D = sg.build_dataset(history, engine='python')
+        for ind in inds:
+            if ind.indicator_id in failures:
+                continue
+            expected = sg.get_signal_at(i, ind.indicator_id, ind.params, D)
+            got = stream.signal(ind, forming=forming)
+            if got != expected:
+                failures[ind.indicator_id] = (f'bar {i} {"forming" if forming else "closed"} '
+                                              f'stream={got} get_signal_at={expected}')
+
+    # every candle arrives as `revisions` partial versions, then its final one
+    for k in range(warm, n):
+        final = candles[k]
+        for _ in range(revisions):
+            part = dict(final, close=final['open'] + (final['close'] - final['open']) * rnd.random())
+            part['high'] = max(part['open'], part['close'])
+            part['low'] = min(part['open'], part['close'])
+            stream.update(part)
+            compare(k, candles[:k] + [part], True)
+        stream.update(final)
+        compare(k, candles[:k + 1], True)
+        compare(k - 1, candles[:k + 1], False)
+    assert not failures, failures
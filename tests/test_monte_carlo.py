@@ -0,0 +1,50 @@
+"""Monte Carlo money-management walk."""
+
+import random
+
+import numpy as np
+import pytest
+
+import monte_carlo as mc
+import strategy_generator as sg
+
+TRADINGS = [
+    sg.TradingConfig(),
+    sg.TradingConfig(stop_win=1e9, stop_loss=1e9),
+    sg.TradingConfig(modal=50, amount=5, martingale_steps=4, stop_loss=1e9, stop_win=80),
+]
+
+
+@pytest.fixture(scope='module')
+def sequences(make_candles):
+    """(strategy, outcomes, dataset) for ten random generator candidates with trades."""
+    random.seed(3)
+    gen = sg.StrategyGenerator(make_candles(20000, seed=3), sg.TradingConfig())
+    out = []
+    while len(out) < 10:
+        strategy = gen._random_strategy()
+        outcomes = sg.outcome_sequence(strategy, gen.dataset)
+        if outcomes is not None:
+            out.append((strategy, outcomes, gen.dataset))
+    return out
+
+
+@pytest.mark.parametrize('trading', TRADINGS, ids=['default', 'no-stops', 'martingale'])
+def test_walk_on_original_order_matches_simulate(sequences, trading):
+    for strategy, outcomes, D in sequences:
+        ref = sg._simulate(strategy, outcomes, D, trading, record_trades=False, min_trades=1)
+        seq = np.asarray(outcomes.won, dtype=bool)
+        balance, max_dd, _, _ = mc._walk(trading, lambda t: seq[t:t + 1].repeat(4), 4, len(seq))
+        assert round(float(balance[0]), 2) == ref.sim_final_balance
+        assert round(float(max_dd[0]), 2) == ref.sim_max_drawdown
+
+
+@pytest.mark.parametrize('method', mc.METHODS)
+def test_percentiles_are_ordered_and_seeded(sequences, method):
+    won = sequences[0][1].won
+    a = mc.monte_carlo(won, sg.TradingConfig(), sims=2000, method=method, seed=1)
+    b = mc.monte_carlo(won, sg.TradingConfig(), sims=2000, method=method, seed=1)
+    assert a == b
+    finals = [a.final_balance[p] for p in mc.PERCENTILES]
+    assert finals == sorted(finals)
+    assert 0 <= a.ruin_probability <= 100
@@ -0,0 +1,68 @@
+"""Portfolio backtest of several strategies on one balance."""
+
+import random
+
+import pytest
+
+import portfolio
+import strategy_generator as sg
+from portfolio import PortfolioStrategy, portfolio_backtest
+
+TRADINGS = [
+    sg.TradingConfig(),
+    sg.TradingConfig(stop_win=1e9, stop_loss=1e9),
+    sg.TradingConfig(modal=40, amount=5, martingale_steps=4, stop_loss=1e9, stop_win=60),
+]
+
+
+@pytest.fixture(scope='module')
+def book(make_candles):
+    """(frames, datasets, members): eight strategies alternating assets A and B."""
+    frames = {('A', 60): make_candles(20000, seed=5), ('B', 60): make_candles(20000, seed=6)}
+    datasets = {key: sg.build_dataset(c) for key, c in frames.items()}
+    random.seed(5)
+    gen = sg.StrategyGenerator(frames[('A', 60)], sg.TradingConfig())
+    members = []
+    while len(members) < 8:
+        strategy = gen._random_strategy()
+        if sg.outcome_sequence(strategy, datasets[('A', 60)]) is None:
+            continue
+        members.append(PortfolioStrategy(strategy, 'AB'[len(members) % 2], name=str(len(members))))
+    return frames, datasets, members
+
+
+@pytest.mark.parametrize('trading', TRADINGS, ids=['default', 'no-stops', 'martingale'])
+def test_single_strategy_matches_simulate(book, trading):
+    frames, datasets, members = book
+    D = datasets[('A', 60)]
+    for member in members[::2]:                     # the asset-A strategies
+        want = sg._simulate(member.strategy, sg.outcome_sequence(member.strategy, D), D, trading,
+                            record_trades=False, min_trades=1)
+        got = portfolio_backtest([member], frames, trading, 'all', datasets=datasets)
+        # after ruin _simulate books zero-stake trades; the portfolio skips them
+        counts = want.sim_final_balance > 0
+        assert (got.total_trades if counts else 0, got.wins if counts else 0,
+                got.final_balance, got.max_drawdown) == \
+               (want.total_trades if counts else 0, want.wins if counts else 0,
+                want.sim_final_balance, want.sim_max_drawdown)
+
+
+def test_sorted_merge_matches_heapq(book, monkeypatch):
+    _, datasets, members = book
+    streams = {k: portfolio._trade_stream(m, datasets[(m.asset, m.interval)])
+               for k, m in enumerate(members)}
+    sorted_order = list(portfolio._merged(streams))
+    monkeypatch.setattr(portfolio, 'np', None)
+    assert list(portfolio._merged(streams)) == sorted_order
+
+
+@pytest.mark.parametrize('overlap, cap', [('single', 1), ('per_asset', 2),
+                                          ('per_strategy', 8), ('all', 0)])
+def test_overlap_rules_and_totals(book, overlap, cap):
+    frames, datasets, members = book
+    res = portfolio_backtest(members, frames, sg.TradingConfig(stop_win=1e9, stop_loss=1e9),
+                             overlap, datasets=datasets)
+    if cap:
+        assert res.max_concurrent <= cap
+    assert sum(s['trades'] for s in res.per_strategy) == res.total_trades
+    assert round(sum(s['profit'] for s in res.per_strategy), 2) == res.profit
@@ -0,0 +1,51 @@
+"""Higher-timeframe candles resampled from M1."""
+
+import random
+
+import pytest
+
+import resample as rs
+from candle_frame import CandleFrame, as_frame
+
+
+@pytest.fixture(scope='module')
+def gappy(make_candles):
+    n = 50000
+    rows = make_candles(n)
+    rng = random.Random(7)
+    rows = [c for c in rows if rng.random() > 0.02]          # scattered missing minutes
+    return rows[:n // 3] + rows[n // 3 + 5000:]               # one long gap
+
+
+def _direct(rows, interval):
+    expected = {}
+    for c in rows:
+        b = c['time'] - c['time'] % interval
+        e = expected.get(b)
+        if e is None:
+            expected[b] = dict(c, time=b)
+        else:
+            e['high'] = max(e['high'], c['high'])
+            e['low'] = min(e['low'], c['low'])
+            e['close'] = c['close']
+            e['volume'] += c['volume']
+    return [expected[b] for b in sorted(expected)]
+
+
+@pytest.mark.parametrize('name', list(rs.TIMEFRAMES))
+def test_numpy_and_python_match_direct_buckets(gappy, name):
+    interval = rs.TIMEFRAMES[name]
+    frame = as_frame(gappy)
+    cols = rs._resample_py(frame, interval)
+    py = CandleFrame._view(cols, 0, len(cols['time']))
+    got = rs.resample(frame, interval, trim=False)
+    assert got.to_dict() == py.to_dict()
+    assert got.to_records() == _direct(gappy, interval)
+
+
+def test_trim_drops_partial_leading_bucket(gappy):
+    frame = as_frame(gappy)[7:]          # starts mid-bucket
+    full = rs.resample(frame, 900, trim=False)
+    trimmed = rs.resample(frame, 900)
+    assert frame.time[0] % 900
+    assert trimmed.to_records() == full.to_records()[1:]
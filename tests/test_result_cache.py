@@ -0,0 +1,74 @@
+"""Persistent backtest result cache: keys, LRU eviction, invalidation."""
+
+import pytest
+
+import result_cache
+import strategy_generator as sg
+from candle_frame import as_frame
+from result_cache import ResultCache, dataset_fingerprint, result_key
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ResultCache(str(tmp_path / 'results.sqlite3'))
+
+
+def test_get_put_round_trip(cache):
+    assert cache.get('k') is None
+    cache.put('k', {'win_rate': 61.5, 'monthly': [{'month': '2024-01', 'wins': 3}]})
+    assert cache.get('k') == {'win_rate': 61.5, 'monthly': [{'month': '2024-01', 'wins': 3}]}
+    cache.put('k', {'win_rate': 40.0})
+    assert cache.get('k') == {'win_rate': 40.0} and len(cache) == 1
+
+
+def test_survives_reopening(tmp_path):
+    path = str(tmp_path / 'results.sqlite3')
+    ResultCache(path).put('k', {'a': 1})
+    assert ResultCache(path).get('k') == {'a': 1}
+
+
+def test_lru_eviction_under_max_bytes(tmp_path, monkeypatch):
+    clock = iter(range(1, 1000))
+    monkeypatch.setattr(result_cache.time, 'time', lambda: next(clock))
+    value = {'pad': 'x' * 90}                 # ~100 bytes of JSON each
+    cache = ResultCache(str(tmp_path / 'results.sqlite3'), max_bytes=350)
+    for k in 'abc':
+        cache.put(k, value)
+    assert cache.get('a') == value            # a is now the most recently used
+    cache.put('d', value)                     # over the bound: b (least recent) goes
+    assert cache.get('b') is None
+    assert all(cache.get(k) == value for k in 'acd')
+    assert cache.nbytes <= 350
+    cache.put('big', {'pad': 'x' * 400})      # larger than the whole cache: not stored
+    assert cache.get('big') is None and len(cache) == 3
+
+
+def test_fingerprint_changes_with_any_candle_value(make_candles):
+    candles = make_candles(200)
+    base = dataset_fingerprint(as_frame(candles), 'EURUSD', 60)
+    assert dataset_fingerprint(as_frame(make_candles(200)), 'EURUSD', 60) == base
+    assert dataset_fingerprint(as_frame(candles), 'GBPUSD', 60) != base
+    assert dataset_fingerprint(as_frame(candles[:-1]), 'EURUSD', 60) != base
+    for field in ('open', 'high', 'low', 'close', 'volume'):
+        changed = [dict(c) for c in candles]
+        changed[100][field] += 1e-5
+        assert dataset_fingerprint(as_frame(changed), 'EURUSD', 60) != base, field
+
+
+def test_changed_candles_miss(cache, make_candles):
+    candles = make_candles(200)
+    key = result_key(dataset_fingerprint(as_frame(candles), 'EURUSD', 60), 'AtvScalperM1', 0.82)
+    cache.put(key, {'win_rate': 55.0})
+    changed = [dict(c) for c in candles]
+    changed[-1]['close'] += 1e-5
+    moved = result_key(dataset_fingerprint(as_frame(changed), 'EURUSD', 60), 'AtvScalperM1', 0.82)
+    assert cache.get(moved) is None
+    assert cache.get(key) == {'win_rate': 55.0}
+
+
+def test_result_key_is_canonical():
+    a = sg.StrategyConfig([sg.IndicatorConfig('MACD', {'fast': 12, 'slow': 26, 'signal': 9})], 1)
+    b = sg.StrategyConfig([sg.IndicatorConfig('MACD', {'signal': 9, 'slow': 26, 'fast': 12})], 1)
+    fp = 'EURUSD|60|0|0|0|x'
+    assert result_key(fp, a, sg.TradingConfig()) == result_key(fp, b, sg.TradingConfig())
+    assert result_key(fp, a, sg.TradingConfig()) != result_key(fp, a, sg.TradingConfig(payout=0.8))
@@ -0,0 +1,36 @@
+"""Resuming a ScalperStream from a saved checkpoint."""
+
+import json
+
+import pytest
+
+from candle_frame import as_frame
+from stream_backtest import ScalperStream
+from strategy_scalper import AtvScalperM1
+
+
+@pytest.fixture(scope='module')
+def frame(make_candles):
+    return as_frame(make_candles(6000))
+
+
+def _cuts(frame):
+    """Half-way, plus bars where a signal is still waiting for its trade bar."""
+    n = len(frame)
+    probe, cuts = ScalperStream(), [n // 2]
+    for i in range(n):
+        probe.feed(frame[i:i + 1])
+        if probe._pending is not None and i > n // 3 and len(cuts) < 4:
+            cuts.append(i + 1)
+    return cuts
+
+
+def test_resume_through_json_matches_one_run(frame):
+    expected = AtvScalperM1()._backtest_py(frame)
+    for cut in _cuts(frame):
+        bt = ScalperStream()
+        bt.feed(frame[:cut])
+        bt = ScalperStream.resume(json.loads(json.dumps(bt.checkpoint())))
+        assert bt.last_time == frame.time[cut - 1]
+        bt.feed(frame[cut:])
+        assert bt.result() == expected, f'cut at bar {cut}'
@@ -0,0 +1,29 @@
+"""Vectorised AtvScalperM1 vs the pure-Python scalper path."""
+
+import pytest
+
+import scalper_np
+import strategy_scalper as ss
+from candle_frame import as_frame
+
+
+@pytest.fixture(scope='module')
+def frame(make_candles):
+    return as_frame(make_candles(20000))
+
+
+def test_signal_vector_matches_signal_at(frame):
+    strategy = ss.AtvScalperM1()
+    vec = scalper_np.signal_vector(strategy, frame)
+    ind = strategy._indicators(frame)
+    for i in range(strategy.EMA_SLOW + 10, len(frame) - 1):
+        expected = {'call': 1, 'put': -1, None: 0}[strategy._signal_at(i, ind)]
+        assert vec[i] == expected, f'bar {i}'
+
+
+def test_backtest_matches_python(frame):
+    strategy = ss.AtvScalperM1()
+    fast = scalper_np.backtest(strategy, frame, expiries=[1, 2, 3, 5])
+    slow = strategy._backtest_py(frame, expiries=[1, 2, 3, 5])
+    for key in slow:
+        assert fast[key] == slow[key], key
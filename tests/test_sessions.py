@@ -0,0 +1,58 @@
+"""Hour / weekday / session breakdowns."""
+
+import random
+from datetime import datetime, timezone
+
+import pytest
+
+import sessions
+
+
+@pytest.fixture(scope='module')
+def trades():
+    rng = random.Random(7)
+    n = 20000
+    times = sorted(rng.randrange(1_600_000_000, 1_700_000_000) for _ in range(n))
+    bars = sorted(rng.sample(range(n), n // 4))
+    won = [rng.random() < 0.55 for _ in bars]
+    return times, bars, won
+
+
+@pytest.fixture(params=['numpy', 'python'])
+def engine(request, monkeypatch):
+    if request.param == 'python':
+        monkeypatch.setattr(sessions, 'np', None)
+    return request.param
+
+
+def _datetime_breakdown(times, bars, won):
+    expected = sessions.SessionTally()
+    for i, ok in zip(bars, won):
+        dt = datetime.fromtimestamp(times[i], tz=timezone.utc)
+        bits = 0
+        for k, (lo, hi) in enumerate(sessions.SESSIONS.values()):
+            if (lo <= dt.hour < hi) if lo < hi else (dt.hour >= lo or dt.hour < hi):
+                bits |= 1 << k
+        expected._add(dt.hour, dt.weekday(), bits, ok)
+    return expected.as_dict(0.82)
+
+
+def test_tally_matches_datetime_buckets(trades):
+    times, bars, won = trades
+    streamed = sessions.SessionTally()
+    for i, ok in zip(bars, won):
+        streamed.add(times[i], ok)
+    assert streamed.as_dict(0.82) == _datetime_breakdown(times, bars, won)
+
+
+def test_breakdown_matches_datetime_buckets(trades, engine):
+    times, bars, won = trades
+    got = sessions.breakdown(bars, won, 0.82, sessions.time_buckets(times))
+    assert got == _datetime_breakdown(times, bars, won)
+
+
+def test_in_sessions(trades, engine):
+    times, bars, _ = trades
+    mask = sessions.session_mask(['London', 'New York'])
+    want = [8 <= times[i] // 3600 % 24 < 22 for i in bars]        # London 08-17 ∪ New York 13-22
+    assert sessions.in_sessions(bars, sessions.time_buckets(times), mask) == want
@@ -0,0 +1,40 @@
+"""Whole-array signal vectors and bitset entry masks vs bar-by-bar voting."""
+
+import random
+
+import numpy as np
+import pytest
+
+import signals_np
+import strategy_generator as sg
+
+
+@pytest.mark.parametrize('iid', list(sg.INDICATOR_CATALOG))
+def test_signal_vector_matches_get_signal_at(iid, candles, param_sets):
+    n = len(candles)
+    for params in param_sets(iid):
+        D = sg.build_dataset(candles, engine='python')
+        vec = signals_np.signal_vector(sg.IndicatorConfig(iid, params), D)
+        assert vec.dtype == np.int8 and len(vec) == n
+        for i in range(n):
+            assert vec[i] == sg.get_signal_at(i, iid, params, D), f'{params} bar {i}'
+
+
+def test_entry_bits_match_vote_counts(candles):
+    D = sg.build_dataset(candles)
+    n = len(candles)
+    rnd = random.Random(7)
+    ids = list(sg.INDICATOR_CATALOG)
+    for _ in range(120):
+        k = rnd.randint(1, 7)
+        strategy = sg.StrategyConfig(
+            [sg.IndicatorConfig(iid, dict(sg.INDICATOR_CATALOG[iid]['defaults']))
+             for iid in rnd.sample(ids, k)],
+            min_agreement=rnd.randint(0, k + 1))
+        call, put = signals_np.vote_counts(strategy, D)
+        m = strategy.min_agreement
+        expected = np.zeros(n, dtype=np.int8)
+        expected[(put >= m) & (put > call)] = -1
+        expected[(call >= m) & (call > put)] = 1
+        assert np.array_equal(signals_np.entry_vector(strategy, D), expected), \
+            f'{[i.indicator_id for i in strategy.indicators]} m={m}'
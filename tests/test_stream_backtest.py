@@ -0,0 +1,51 @@
+"""Chunked streaming backtests vs the whole-history engine."""
+
+from types import SimpleNamespace
+
+import pytest
+
+from candle_frame import as_frame
+import strategy_scalper
+from stream_backtest import ScalperStream
+from strategy_scalper import AtvScalperM1
+
+CHUNK = 777
+
+
+@pytest.fixture(scope='module')
+def frame(make_candles):
+    return as_frame(make_candles(6000))
+
+
+def test_scalper_stream_matches_backtest(frame):
+    bt = ScalperStream()
+    for lo in range(0, len(frame), CHUNK):
+        bt.feed(frame[lo:lo + CHUNK])
+    assert bt.result() == AtvScalperM1()._backtest_py(frame)
+
+
+class _FlakyApi:
+    """get_candles answers the first window, then keeps failing."""
+
+    def __init__(self, candles):
+        self.candles, self.calls = candles, 0
+
+    def get_candles(self, asset, interval, count, to):
+        self.calls += 1
+        if self.calls > 1:
+            raise ConnectionError('socket closed')
+        return [{'from': c['time'], 'open': c['open'], 'max': c['high'],
+                 'min': c['low'], 'close': c['close'], 'volume': c['volume']}
+                for c in self.candles if c['time'] <= to][-count:]
+
+
+def test_iter_candle_chunks_raises_when_download_fails(make_candles, monkeypatch):
+    monkeypatch.setattr(strategy_scalper.time, 'sleep', lambda s: None)
+    candles = make_candles(100)
+    robot = SimpleNamespace(api=_FlakyApi(candles))
+    start, end = candles[0]['time'], candles[-1]['time']
+    chunks = strategy_scalper.iter_candle_chunks(robot, 'FLAKY-TEST', 60, start, end, chunk=40)
+    assert len(next(chunks)) == 40
+    with pytest.raises(ConnectionError):
+        next(chunks)
+    assert robot.api.calls == 3